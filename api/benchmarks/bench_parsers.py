@@ -0,0 +1,69 @@
+"""
+Compare HTML parser backends for the screener.in section tables.
+
+Run from the ``api`` directory:
+
+    python benchmarks/bench_parsers.py [--repeat 20]
+
+Every backend in ``financials.scrapers.PARSER_BACKENDS`` is timed over the
+saved fixture pages and its output is checked against the original
+full-page ``html.parser`` + ``parse_table`` implementation.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from financials.scrapers import PARSER_BACKENDS, SECTIONS, parse_sections, parse_table  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "screener"
+
+
+def full_page(html, section_ids):
+    soup = BeautifulSoup(html, 'html.parser')
+    return {sec_id: parse_table(soup, sec_id) for sec_id in section_ids}
+
+
+def timed(fn, html, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html, list(SECTIONS.values()))
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = sorted(p for p in FIXTURES.glob("*.html") if not p.stem.endswith("_peers"))
+    failed = False
+    for page in pages:
+        html = page.read_text(encoding="utf-8")
+        expected = full_page(html, SECTIONS.values())
+        print(f"{page.name} ({len(html) / 1024:.0f} KiB)")
+        median, best = timed(full_page, html, args.repeat)
+        print(f"  {'baseline (full page)':<22} median {median * 1000:8.2f} ms   min {best * 1000:8.2f} ms")
+        for name in PARSER_BACKENDS:
+            try:
+                output = parse_sections(html, SECTIONS.values(), backend=name)
+            except ImportError as e:
+                print(f"  {name:<22} skipped ({e})")
+                continue
+            identical = output == expected
+            failed |= not identical
+            median, best = timed(PARSER_BACKENDS[name], html, args.repeat)
+            print(f"  {name:<22} median {median * 1000:8.2f} ms   min {best * 1000:8.2f} ms"
+                  f"   {'identical' if identical else 'OUTPUT DIFFERS'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare the single-pass sentiment scorer with the original substring scanner.
+
+Run from the ``api`` directory:
+
+    python benchmarks/bench_sentiment.py [--headlines 5000]
+
+Headlines are generated deterministically from a financial-news vocabulary,
+then labelled by the original per-word ``in`` scan and by
+``SentimentScorer.label_many``; throughput and label agreement are reported.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sentiment.scoring import NEGATIVE_TERMS, POSITIVE_TERMS, SentimentScorer  # noqa: E402
+
+FILLER = (
+    "shares of the company on Monday after quarterly results update management said "
+    "board executive outlook guidance investors analysts market index sector update "
+    "reliance tcs infosys hdfc bank nifty sensex the a in on for with as of to"
+).split()
+
+
+def legacy_sentiment_score(text):
+    """The original NewsSentimentAnalyzer._sentiment_score implementation."""
+    positive_words = list(POSITIVE_TERMS)
+    negative_words = list(NEGATIVE_TERMS)
+    text_lower = text.lower()
+    positive_count = sum(1 for word in positive_words if word in text_lower)
+    negative_count = sum(1 for word in negative_words if word in text_lower)
+    if positive_count > negative_count:
+        return "positive"
+    elif negative_count > positive_count:
+        return "negative"
+    return "neutral"
+
+
+def make_headlines(count, seed=42):
+    rng = random.Random(seed)
+    vocabulary = FILLER * 3 + list(POSITIVE_TERMS) + list(NEGATIVE_TERMS) + ["not", "never"]
+    return [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(12, 40))).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+def throughput(fn, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--headlines", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = make_headlines(args.headlines)
+    scorer = SentimentScorer()
+
+    legacy = throughput(lambda batch: [legacy_sentiment_score(t) for t in batch], texts, args.repeat)
+    compiled = throughput(scorer.label_many, texts, args.repeat)
+    agreement = sum(a == b for a, b in zip(map(legacy_sentiment_score, texts), scorer.label_many(texts))) / len(texts)
+
+    print(f"{len(texts)} headlines")
+    print(f"  legacy substring scan   {legacy:12,.0f} texts/s")
+    print(f"  single-pass scorer      {compiled:12,.0f} texts/s   ({compiled / legacy:.1f}x)")
+    print(f"  label agreement         {agreement:12.1%}  (differences come from whole-word matching and negation)")
+
+
+if __name__ == "__main__":
+    main()
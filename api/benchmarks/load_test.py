@@ -0,0 +1,147 @@
+"""
+Load test the API in sync (WSGI) and async (ASGI) mode against local stand-ins.
+
+Run from the ``api`` directory (needs gunicorn, uvicorn and httpx):
+
+    python benchmarks/load_test.py [--endpoint sentiment] [--requests 400]
+        [--concurrency 100] [--latency 0.2] [--workers 4]
+
+For each mode a server is started on a scratch database: gunicorn with
+``--workers`` sync workers for WSGI, and a single uvicorn process with
+API_ASYNC_VIEWS=true for ASGI. Both talk to stand-in upstreams that add
+``--latency`` seconds per call. Every request uses a distinct ticker so the
+result caches do not hide upstream waits. Requests/sec and p50/p99 latency
+are printed per mode.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import standins  # noqa: E402
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(mode, port, workers):
+    if mode == "sync":
+        return [sys.executable, "-m", "gunicorn", "core.wsgi:application", "--workers", str(workers),
+                "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+    return [sys.executable, "-m", "uvicorn", "core.asgi:application", "--port", str(port),
+            "--log-level", "warning", "--no-access-log"]
+
+
+def wait_for(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def request_path(endpoint, i):
+    if endpoint == "sentiment":
+        return f"/api/sentiment/analyze-sentiment/?ticker_or_company=LOAD{i}"
+    return f"/api/financials/financial_data/LOAD{i}/"
+
+
+async def run_load(base, endpoint, total, concurrency, offset):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(request_path(endpoint, offset + i))
+                except httpx.TransportError:
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoint", choices=["sentiment", "financials"], default="sentiment")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2, help="Upstream latency in seconds.")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers in sync mode.")
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    args = parser.parse_args()
+
+    newsapi = standins.start_newsapi(args.latency)
+    screener = standins.start_screener(args.latency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DJANGO_DB_PATH=str(Path(tmp) / "load.sqlite3"),
+            NEWS_API_KEY=os.getenv("NEWS_API_KEY", "load-test"),
+            NEWS_API_BASE_URL=standins.base_url(newsapi, "/v2/everything"),
+            SCREENER_BASE_URL=standins.base_url(screener),
+            SCRAPER_BROWSER_FALLBACK="false",
+            SCRAPER_HOST_RATE_LIMIT="0",
+        )
+        subprocess.run([sys.executable, "manage.py", "migrate", "-v0"], cwd=API_DIR, env=env, check=True)
+
+        print(f"{args.endpoint}: {args.requests} requests, concurrency {args.concurrency}, "
+              f"upstream latency {args.latency * 1000:.0f} ms")
+        for offset, mode in enumerate(args.modes):
+            port = free_port()
+            mode_env = dict(env, API_ASYNC_VIEWS="true" if mode == "async" else "false")
+            server = subprocess.Popen(server_command(mode, port, args.workers), cwd=API_DIR, env=mode_env)
+            try:
+                base = f"http://127.0.0.1:{port}"
+                wait_for(base + "/")
+                result = asyncio.run(run_load(base, args.endpoint, args.requests, args.concurrency,
+                                              offset * args.requests))
+            finally:
+                server.terminate()
+                server.wait()
+            label = f"{mode} ({'gunicorn x%d' % args.workers if mode == 'sync' else 'uvicorn x1'})"
+            print(f"  {label:<20} {result['rps']:8.1f} req/s   p50 {result['p50'] * 1000:8.1f} ms"
+                  f"   p99 {result['p99'] * 1000:8.1f} ms   errors {result['errors']}")
+
+    newsapi.shutdown()
+    screener.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Local stand-ins for the upstream services, for benchmarks and load tests.
+
+``start_newsapi`` serves NewsAPI-shaped JSON and ``start_screener`` serves the
+saved screener.in fixture pages for any ticker; both can add artificial
+latency. The NewsAPI stand-in shifts the fixture's publish times so the
+newest article was published when it started, and honours ``from``; tests
+can queue error responses for it to serve first (``faults``), and can list
+screener paths to answer with 404 (``missing``). They are
+minimal ASGI apps run by uvicorn on a background thread, so they keep up
+with hundreds of concurrent keep-alive clients. Point
+NEWS_API_BASE_URL / SCREENER_BASE_URL at ``base_url(server)`` and call
+``server.shutdown()`` when done.
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+import re
+import socket
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import uvicorn
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+NEWSAPI_FIXTURE = json.loads((FIXTURES / "newsapi" / "everything.json").read_text(encoding="utf-8"))
+COMPANY_PAGE = (FIXTURES / "screener" / "TCS.html").read_bytes()
+PEERS_PAGE = (FIXTURES / "screener" / "TCS_peers.html").read_bytes()
+
+_COMPANY = re.compile(r"^/company/([^/]+)/(consolidated/)?$")
+_PEERS = re.compile(r"^/api/company/\d+/peers/$")
+
+
+async def _send(send, status, body, content_type, headers=None):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())]
+                   + [(name.lower().encode(), str(value).encode()) for name, value in (headers or {}).items()],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def _published(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def newsapi_app(latency=0.0, faults=None):
+    """
+    ``faults`` is an optional deque of ``(status, headers)`` error responses,
+    served one per request (in order) before the app answers normally again.
+    """
+    fixture = NEWSAPI_FIXTURE["articles"]
+    shift = datetime.now(timezone.utc).replace(microsecond=0) - max(_published(a["publishedAt"]) for a in fixture)
+    published = [_published(a["publishedAt"]) + shift for a in fixture]
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await asyncio.sleep(latency)
+        if faults:
+            status, headers = faults.popleft()
+            body = json.dumps({"status": "error", "code": "unexpectedError", "message": f"Stand-in fault {status}"})
+            await _send(send, status, body.encode(), "application/json", headers)
+            return
+        params = parse_qs(scope["query_string"].decode())
+        query = params.get("q", [""])[0]
+        page_size = int(params.get("pageSize", ["100"])[0])
+        since = params.get("from", [None])[0]
+        since = since and datetime.fromisoformat(since).replace(tzinfo=timezone.utc)
+        # Make article URLs unique per query so per-URL caches behave as in production.
+        articles = [
+            dict(a, url=f"{a['url']}?q={query}", publishedAt=t.strftime("%Y-%m-%dT%H:%M:%SZ"))
+            for a, t in zip(fixture, published) if not since or t >= since
+        ][:page_size]
+        body = json.dumps(dict(NEWSAPI_FIXTURE, articles=articles)).encode()
+        await _send(send, 200, body, "application/json")
+    return app
+
+
+def screener_app(latency=0.0, missing=()):
+    """``missing`` is a collection of paths answered with 404, e.g. a ticker's peers endpoint."""
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await asyncio.sleep(latency)
+        path = scope["path"]
+        if path in missing:
+            await _send(send, 404, b"Not found", "text/plain")
+        elif _COMPANY.match(path):
+            await _send(send, 200, COMPANY_PAGE, "text/html; charset=utf-8")
+        elif _PEERS.match(path):
+            await _send(send, 200, PEERS_PAGE, "text/html; charset=utf-8")
+        else:
+            await _send(send, 404, b"Not found", "text/plain")
+    return app
+
+
+class StandIn:
+    """An ASGI app served by uvicorn on a daemon thread."""
+
+    def __init__(self, app, port=0):
+        if not port:
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+        self.server_port = port
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                                access_log=False, lifespan="off", backlog=2048)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def shutdown(self):
+        self._server.should_exit = True
+        self._thread.join()
+
+
+def base_url(server, path=""):
+    return f"http://127.0.0.1:{server.server_port}{path}"
+
+
+def start_newsapi(latency=0.0, port=0, faults=None):
+    return StandIn(newsapi_app(latency, faults), port)
+
+
+def start_screener(latency=0.0, port=0, missing=()):
+    return StandIn(screener_app(latency, missing), port)
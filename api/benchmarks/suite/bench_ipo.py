@@ -0,0 +1,98 @@
+"""
+IPO table parsing and the upsert build loop (``scraper/``).
+
+No ipopremium.in page is saved, so the table is generated: ``ROWS``
+rows shaped like the site's, mainboard and SME, embedded in page filler.
+The upsert benchmarks need ``mongomock`` and are skipped without it.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import ipo_analytics
+import ipo_data_scraper as scraper
+
+ROWS = 300
+TODAY = datetime(2025, 6, 2)
+
+
+def ipo_cells(i):
+    opens = date(2025, 1, 6) + timedelta(days=i % 150)
+    fmt = "%b %d, %Y"
+    return [
+        f"Company {i} Limited" + (" SME" if i % 3 == 0 else ""),
+        f"{i % 40} ({(i % 40) / 2:.1f}%)" if i % 7 else "-",
+        opens.strftime(fmt),
+        (opens + timedelta(days=2)).strftime(fmt),
+        f"{95 + i % 50} to {100 + i % 50}",
+        str(100 + i % 20 * 10),
+        (opens + timedelta(days=3)).strftime(fmt),
+        (opens + timedelta(days=6)).strftime(fmt),
+    ]
+
+
+def ipo_page(rows=ROWS):
+    body = "".join("<tr>" + "".join(f"<td>{c}</td>" for c in ipo_cells(i)) + "</tr>" for i in range(rows))
+    filler = "<div class='news'><p>Grey market premium update</p></div>" * 200
+    return (f"<html><body>{filler}<table id='table_ajax'><thead><tr><th>IPO</th></tr></thead>"
+            f"<tbody>{body}</tbody></table>{filler}</body></html>")
+
+
+@pytest.fixture(scope="module")
+def html():
+    return ipo_page()
+
+
+@pytest.fixture(scope="module")
+def documents(html):
+    return [ipo_analytics.enrich(doc, TODAY) for doc in scraper.parse_ipo_rows(html, limit=None)]
+
+
+def bench_parse_ipo_rows(benchmark, html):
+    documents = benchmark(scraper.parse_ipo_rows, html, 0, None)
+    assert len(documents) == ROWS
+
+
+def bench_enrich(benchmark, html):
+    parsed = scraper.parse_ipo_rows(html, limit=None)
+    benchmark(lambda: [ipo_analytics.enrich(dict(doc), TODAY) for doc in parsed])
+
+
+def bench_row_hash(benchmark, documents):
+    benchmark(lambda: [scraper.row_hash(doc) for doc in documents])
+
+
+@pytest.fixture
+def collection():
+    mongomock = pytest.importorskip("mongomock")
+    db = mongomock.MongoClient().get_database(scraper.DB_NAME)
+    scraper.ensure_indexes(db.ipo_data)
+    return db.ipo_data
+
+
+def bench_sync_insert(benchmark, collection, documents):
+    """Every row new: one lookup query and one bulk_write of upserts."""
+    def reset():
+        collection.delete_many({})
+
+    counts = benchmark.pedantic(scraper.sync_ipo_data, args=(collection, documents), setup=reset, rounds=20)
+    assert counts["inserted"] == ROWS
+
+
+def bench_sync_unchanged(benchmark, collection, documents):
+    """Nothing changed since the last run: hashes compared, no writes."""
+    scraper.sync_ipo_data(collection, documents)
+    counts = benchmark(scraper.sync_ipo_data, collection, documents)
+    assert counts["unchanged"] == ROWS
+
+
+def bench_sync_with_history(benchmark, collection, documents):
+    """Every row new, with premium samples appended to the GMP history."""
+    history = scraper.history_collection(collection)
+
+    def reset():
+        collection.delete_many({})
+        history.delete_many({})
+
+    benchmark.pedantic(scraper.sync_ipo_data, args=(collection, documents, history, TODAY),
+                       setup=reset, rounds=20)
@@ -0,0 +1,29 @@
+"""Section table parsing over the saved screener.in company page."""
+import pytest
+from bs4 import BeautifulSoup
+
+from financials.scrapers import PARSER_BACKENDS, SECTIONS, parse_sections, parse_table
+from financials.normalize import normalize_company
+
+
+def bench_parse_table(benchmark, company_html):
+    """Full-page html.parser soup plus one parse_table per section (the browser path)."""
+    def parse():
+        soup = BeautifulSoup(company_html, "html.parser")
+        return {key: parse_table(soup, sec_id) for key, sec_id in SECTIONS.items()}
+
+    tables = benchmark(parse)
+    assert tables["quarters"]
+
+
+@pytest.mark.parametrize("backend", list(PARSER_BACKENDS))
+def bench_parse_sections(benchmark, company_html, backend):
+    tables = benchmark(parse_sections, company_html, SECTIONS.values(), backend)
+    assert tables["quarters"]
+
+
+def bench_normalize_company(benchmark, company_html):
+    tables = parse_sections(company_html, SECTIONS.values())
+    data = {key: tables[sec_id] for key, sec_id in SECTIONS.items()}
+    columnar = benchmark(normalize_company, data)
+    assert columnar["quarters"]
@@ -0,0 +1,87 @@
+"""
+Screening over the in-memory matrices (``financials.screening``).
+
+The universe is ``TICKERS`` copies of the saved company page's ratios, P&L
+and quarters tables with deterministic per-ticker values, loaded straight
+into a ``Universe`` and installed as the process-wide one, marked fresh, so
+the benchmarks time evaluation rather than the database.
+"""
+import random
+import time
+
+import pytest
+
+from financials import screening
+from financials.scrapers import parse_sections
+
+TICKERS = 5000
+WHERE = "ROCE > 20 and 3y sales CAGR > 15"
+
+
+def vary(table, rnd):
+    rows = [
+        [row[0]] + [(f"{rnd.uniform(-10, 60):.0f}%" if "%" in row[0] else f"{rnd.uniform(100, 5000):,.0f}") if cell else cell
+                    for cell in row[1:]]
+        for row in table["rows"]
+    ]
+    return {"headers": table["headers"], "rows": rows}
+
+
+@pytest.fixture(scope="module")
+def tables(company_html):
+    parsed = parse_sections(company_html, screening.SCREEN_SECTIONS)
+    rnd = random.Random(0)
+    return [(f"T{i:05d}", section, vary(parsed[section], rnd))
+            for i in range(TICKERS) for section in screening.SCREEN_SECTIONS]
+
+
+@pytest.fixture(scope="module")
+def universe(tables):
+    universe = screening.Universe()
+    for ticker, section, table in tables:
+        universe.update(ticker, section, table)
+    universe._refreshed = time.monotonic()
+    screening._universes[universe.view] = universe
+    yield universe
+    screening._universes.pop(universe.view, None)
+
+
+def run(universe, node):
+    with universe.lock:
+        return universe.evaluate(node, len(universe.tickers), {})
+
+
+def bench_parse_expression(benchmark):
+    benchmark(screening.parse_expression.__wrapped__, WHERE)
+
+
+def bench_update_ticker(benchmark, universe, tables):
+    ticker, _, _ = tables[0]
+    sections = [(section, table) for t, section, table in tables[:len(screening.SCREEN_SECTIONS)]]
+
+    def update():
+        with universe.lock:
+            for section, table in sections:
+                universe.update(ticker, section, table)
+    benchmark(update)
+
+
+def bench_filter(benchmark, universe):
+    mask = benchmark(run, universe, screening.parse_condition(WHERE))
+    assert 0 < mask.sum() < TICKERS
+
+
+def bench_filter_growth_and_average(benchmark, universe):
+    node = screening.parse_condition("5y avg OPM > 20 and quarterly sales yoy > 10 and TTM net profit > 1000")
+    benchmark(run, universe, node)
+
+
+def bench_screen_sorted(benchmark, universe):
+    result = benchmark(screening.screen, WHERE, sort=[("ROCE", True), ("3y sales CAGR", True)],
+                       limit=50, max_age=float("inf"))
+    assert len(result["results"]) == 50
+
+
+def bench_screen_ranked(benchmark, universe):
+    benchmark(screening.screen, WHERE, rank=[("ROCE", True), ("5y avg OPM", True), ("debtor days", False)],
+              limit=50, max_age=float("inf"))
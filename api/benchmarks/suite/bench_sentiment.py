@@ -0,0 +1,60 @@
+"""analyze_sentiment over the recorded NewsAPI response."""
+import pytest
+
+from sentiment import views
+from sentiment.models import NewsArticle, NewsQuery
+from sentiment.views import NewsSentimentAnalyzer
+
+ROUNDS = 50
+
+
+def clear_caches():
+    views.news_cache.clear()
+    views.article_sentiment_cache.clear()
+
+
+def clear_all():
+    clear_caches()
+    NewsQuery.objects.all().delete()
+    NewsArticle.objects.all().delete()
+
+
+@pytest.fixture
+def analyzer(django_db):
+    clear_all()
+    yield NewsSentimentAnalyzer()
+    clear_all()
+
+
+def bench_score_articles_cold(benchmark, analyzer, newsapi_articles):
+    """Scoring and result assembly for 50 articles, none seen before."""
+    result = benchmark.pedantic(analyzer._build_result, args=(newsapi_articles, "TCS", None, 7, 50),
+                                setup=views.article_sentiment_cache.clear, rounds=ROUNDS)
+    assert result["sentiment_summary"]["total_articles"] > 0
+
+
+def bench_score_articles_warm(benchmark, analyzer, newsapi_articles):
+    """The same, with every article's sentiment already cached by URL."""
+    analyzer._build_result(newsapi_articles, "TCS", None, 7, 50)
+    benchmark(analyzer._build_result, newsapi_articles, "TCS", None, 7, 50)
+
+
+def bench_analyze_sentiment_cold(benchmark, analyzer):
+    """Full window fetched from the local NewsAPI stand-in, scored and stored."""
+    result = benchmark.pedantic(analyzer.analyze_sentiment, args=("TCS",), kwargs={"max_articles": 50},
+                                setup=clear_all, rounds=ROUNDS)
+    assert result["articles"]
+
+
+def bench_analyze_sentiment_stored(benchmark, analyzer):
+    """Response caches empty but the window stored: delta fetch plus an indexed read."""
+    analyzer.analyze_sentiment("TCS", max_articles=50)
+    result = benchmark.pedantic(analyzer.analyze_sentiment, args=("TCS",), kwargs={"max_articles": 50},
+                                setup=clear_caches, rounds=ROUNDS)
+    assert result["articles"]
+
+
+def bench_analyze_sentiment_warm(benchmark, analyzer):
+    """NewsAPI response and article sentiments served from the in-process caches."""
+    analyzer.analyze_sentiment("TCS", max_articles=50)
+    benchmark(analyzer.analyze_sentiment, "TCS", max_articles=50)
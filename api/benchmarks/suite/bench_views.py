@@ -0,0 +1,54 @@
+"""End-to-end view latency through the Django test client and the local stand-ins."""
+import itertools
+
+import pytest
+from django.test import Client
+
+from sentiment import views as sentiment_views
+from sentiment.models import NewsArticle, NewsQuery
+
+ROUNDS = 30
+
+_tickers = itertools.count()
+
+
+@pytest.fixture
+def client(django_db):
+    return Client()
+
+
+def bench_financial_data_cold(benchmark, client):
+    """A ticker never seen before: HTTP scrape, parse, snapshot write."""
+    def request():
+        return client.get(f"/api/financials/financial_data/BENCH{next(_tickers)}/")
+
+    response = benchmark.pedantic(request, rounds=ROUNDS)
+    assert response.status_code == 200
+    assert response["X-Cache"] == "MISS"
+
+
+@pytest.mark.parametrize("layout", ["rows", "columnar"])
+def bench_financial_data_warm(benchmark, client, layout):
+    url = f"/api/financials/financial_data/TCS/?layout={layout}"
+    client.get(url)
+    response = benchmark(client.get, url)
+    assert response["X-Cache"] == "HIT"
+
+
+def bench_sentiment_cold(benchmark, client):
+    def clear():
+        sentiment_views.news_cache.clear()
+        sentiment_views.article_sentiment_cache.clear()
+        NewsQuery.objects.all().delete()
+        NewsArticle.objects.all().delete()
+
+    response = benchmark.pedantic(client.get, args=("/api/sentiment/analyze-sentiment/?ticker_or_company=TCS",),
+                                  setup=clear, rounds=ROUNDS)
+    assert response.status_code == 200
+
+
+def bench_sentiment_warm(benchmark, client):
+    url = "/api/sentiment/analyze-sentiment/?ticker_or_company=TCS"
+    client.get(url)
+    response = benchmark(client.get, url)
+    assert response.status_code == 200
@@ -0,0 +1,71 @@
+"""
+Shared setup for the benchmark suite.
+
+Stand-ins for screener.in and NewsAPI (see ``benchmarks/standins.py``) are
+started before Django is configured, so every benchmark runs offline against
+the saved fixtures. The scraper directory is put on ``sys.path`` for the IPO
+benchmarks.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS = Path(__file__).resolve().parent.parent
+API_DIR = BENCHMARKS.parent
+SCRAPER_DIR = API_DIR.parent / "scraper"
+FIXTURES = BENCHMARKS / "fixtures"
+
+for path in (API_DIR, BENCHMARKS, SCRAPER_DIR):
+    sys.path.insert(0, str(path))
+
+import standins  # noqa: E402
+
+_screener = standins.start_screener()
+_newsapi = standins.start_newsapi()
+
+os.environ.update({
+    "DJANGO_SETTINGS_MODULE": "core.settings",
+    "SCREENER_BASE_URL": standins.base_url(_screener),
+    "NEWS_API_BASE_URL": standins.base_url(_newsapi, "/v2/everything"),
+    "NEWS_API_KEY": os.getenv("NEWS_API_KEY", "benchmark"),
+    "SCRAPER_FETCH_MODE": "http",
+    "SCRAPER_BROWSER_FALLBACK": "false",
+    "SCRAPER_HOST_RATE_LIMIT": "0",
+    "SCRAPE_JOBS_WORKERS": "0",
+    "API_PROFILING_ENABLED": "false",
+})
+
+import django  # noqa: E402
+
+django.setup()
+
+
+@pytest.fixture(scope="session")
+def django_db():
+    """A throwaway test database for benchmarks that go through the views."""
+    from django.test.runner import DiscoverRunner
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    yield
+    runner.teardown_databases(old_config)
+    teardown_test_environment()
+
+
+@pytest.fixture(scope="session")
+def company_html():
+    return (FIXTURES / "screener" / "TCS.html").read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="session")
+def newsapi_articles():
+    return standins.NEWSAPI_FIXTURE["articles"]
+
+
+def pytest_sessionfinish(session, exitstatus):
+    _screener.shutdown()
+    _newsapi.shutdown()
@@ -0,0 +1,167 @@
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds; scrapes can take tens of seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Spans recorded during the current request, for the Server-Timing header.
+_request_spans = contextvars.ContextVar("request_spans", default=None)
+
+
+class Histogram:
+    """Thread-safe cumulative histogram with Prometheus semantics, keyed by label values."""
+
+    def __init__(self, name, help, labelnames, buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, [list(s[0]), s[1], s[2]]) for labels, s in self._series.items())
+        for labels, (counts, total, count) in series:
+            base = _labels(self.labelnames, labels)
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le=bound)} {n}')
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le="+Inf")} {count}')
+            lines.append(f"{self.name}_sum{base} {total:.6f}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n")
+
+
+def _labels(names, values, **extra):
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds", "API request latency.", ("route", "method", "status"),
+)
+SPAN_LATENCY = Histogram(
+    "api_span_duration_seconds", "Latency of instrumented hot-path operations.", ("span",),
+)
+
+_collectors = []
+_caches = {}
+
+
+def register_collector(fn):
+    """
+    Register ``fn`` to contribute to /metrics. It returns an iterable of
+    ``(name, type, help, [(labels_dict, value), ...])`` tuples and is called
+    on every scrape, so it should only read counters that already exist.
+    """
+    _collectors.append(fn)
+    return fn
+
+
+def register_cache(name, counts):
+    """
+    Report a cache's hits, misses and hit ratio under ``cache="<name>"``.
+    ``counts`` is called on every scrape and returns ``(hits, misses)``.
+    """
+    _caches[name] = counts
+
+
+def _cache_metrics():
+    counts = {name: fn() for name, fn in sorted(_caches.items())}
+    yield ("api_cache_hits_total", "counter", "Cache lookups that found an entry.",
+           [({"cache": name}, hits) for name, (hits, _) in counts.items()])
+    yield ("api_cache_misses_total", "counter", "Cache lookups that found nothing.",
+           [({"cache": name}, misses) for name, (_, misses) in counts.items()])
+    yield ("api_cache_hit_ratio", "gauge", "Hits over lookups since the process started.",
+           [({"cache": name}, round(hits / (hits + misses), 6) if hits + misses else 0)
+            for name, (hits, misses) in counts.items()])
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    lines = REQUEST_LATENCY.render() + SPAN_LATENCY.render()
+    for collector in [_cache_metrics] + _collectors:
+        for name, kind, help, samples in collector():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels.keys(), labels.values())} {value}")
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def span(name):
+    """Time a block: recorded in the span histogram and the request's Server-Timing header."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SPAN_LATENCY.observe(elapsed, name)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+
+
+def timed(name):
+    """Decorator form of ``span`` for sync and async functions."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_request():
+    """Begin collecting spans for the current request; returns a token for ``end_request``."""
+    spans = []
+    return spans, _request_spans.set(spans)
+
+
+def end_request(token):
+    _request_spans.reset(token)
+
+
+def server_timing(spans, total):
+    """Server-Timing header value: one entry per span name (summed), plus the total."""
+    totals = {}
+    for name, elapsed in spans:
+        duration, count = totals.get(name, (0.0, 0))
+        totals[name] = (duration + elapsed, count + 1)
+    entries = [
+        f'{name};dur={duration * 1000:.1f}' + (f';desc="x{count}"' if count > 1 else "")
+        for name, (duration, count) in totals.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.TimingMiddleware",
+    "core.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -75,6 +78,15 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "core.wsgi.application"
 
+ASGI_APPLICATION = "core.asgi.application"
+
+# Serve the financial data and sentiment endpoints with async views. Enable
+# this when running under an ASGI server (e.g. `uvicorn core.asgi:application`).
+API_ASYNC_VIEWS = os.getenv("API_ASYNC_VIEWS", "false").lower() == "true"
+
+# Threads async views may use for blocking scrape work.
+API_ASYNC_SCRAPE_WORKERS = int(os.getenv("API_ASYNC_SCRAPE_WORKERS", "8"))
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -82,11 +94,54 @@ WSGI_APPLICATION = "core.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.getenv("DJANGO_DB_PATH", BASE_DIR / "db.sqlite3"),
+        # WAL lets job status polls read while scrape workers write.
+        # IMMEDIATE makes every atomic() block take the write lock when it
+        # starts, so concurrent transactions that read before writing wait up
+        # to `timeout` seconds for each other instead of failing at once with
+        # "database is locked" when they try to upgrade a read to a write.
+        "OPTIONS": {
+            "timeout": 20,
+            "init_command": "PRAGMA journal_mode=WAL;",
+            "transaction_mode": "IMMEDIATE",
+        },
+        # File-backed, so tests that write from several threads get real
+        # SQLite locking rather than shared-cache table locks.
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; set REDIS_URL (or CACHE_DIR for a file cache) to
+# share cached results between worker processes.
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+elif os.getenv("CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_DIR"),
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "financial-dashboard",
+            "OPTIONS": {"MAX_ENTRIES": 1000},
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -127,3 +182,151 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Financials scraper
+# Bounded pool of warm headless Chrome sessions used by financials.scrapers
+
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+
+SCRAPER_BROWSER_POOL_SIZE = int(os.getenv("SCRAPER_BROWSER_POOL_SIZE", "2"))
+
+SCRAPER_BROWSER_MAX_PAGES = int(os.getenv("SCRAPER_BROWSER_MAX_PAGES", "50"))
+
+SCRAPER_BROWSER_CHECKOUT_TIMEOUT = float(os.getenv("SCRAPER_BROWSER_CHECKOUT_TIMEOUT", "30"))
+
+# "http" fetches screener.in pages directly and only renders sections that come
+# back empty in the browser; "browser" always renders the full page.
+SCRAPER_FETCH_MODE = os.getenv("SCRAPER_FETCH_MODE", "http")
+
+SCRAPER_BROWSER_FALLBACK = os.getenv("SCRAPER_BROWSER_FALLBACK", "true").lower() == "true"
+
+SCREENER_BASE_URL = os.getenv("SCREENER_BASE_URL", "https://www.screener.in")
+
+SCRAPER_HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "10"))
+
+SCRAPER_HTTP_POOL_SIZE = int(os.getenv("SCRAPER_HTTP_POOL_SIZE", "10"))
+
+# HTML parser used for screener.in tables: "selectolax", "lxml" or "html.parser".
+SCRAPER_PARSER_BACKEND = os.getenv("SCRAPER_PARSER_BACKEND", "selectolax")
+
+# Requests per second allowed to a single upstream host (0 disables the limit).
+SCRAPER_HOST_RATE_LIMIT = float(os.getenv("SCRAPER_HOST_RATE_LIMIT", "2"))
+
+SCRAPER_HOST_BURST = int(os.getenv("SCRAPER_HOST_BURST", "4"))
+
+# Threads shared by all scrapes for fetches that run alongside the main page
+# (the other statement view, peers, browser fallbacks).
+SCRAPER_FETCH_WORKERS = int(os.getenv("SCRAPER_FETCH_WORKERS", "8"))
+
+# Batch endpoint
+FINANCIALS_BATCH_CONCURRENCY = int(os.getenv("FINANCIALS_BATCH_CONCURRENCY", "4"))
+
+FINANCIALS_BATCH_MAX_TICKERS = int(os.getenv("FINANCIALS_BATCH_MAX_TICKERS", "200"))
+
+# Screening endpoint: seconds between incremental refreshes of the in-memory
+# matrices from the stored sections.
+FINANCIALS_SCREEN_REFRESH_INTERVAL = float(os.getenv("FINANCIALS_SCREEN_REFRESH_INTERVAL", "60"))
+
+FINANCIALS_SCREEN_MAX_RESULTS = int(os.getenv("FINANCIALS_SCREEN_MAX_RESULTS", "1000"))
+
+# Background scrape jobs
+# Worker threads started in each web process; set to 0 and run
+# `manage.py run_scrape_workers` to process jobs in separate processes.
+SCRAPE_JOBS_WORKERS = int(os.getenv("SCRAPE_JOBS_WORKERS", "2"))
+
+# Seconds idle workers and long-polls wait between database checks.
+SCRAPE_JOBS_POLL_INTERVAL = float(os.getenv("SCRAPE_JOBS_POLL_INTERVAL", "1"))
+
+# Longest ?wait= a job status request may hold the connection for.
+SCRAPE_JOBS_MAX_WAIT = int(os.getenv("SCRAPE_JOBS_MAX_WAIT", "25"))
+
+SCRAPE_JOBS_MAX_ATTEMPTS = int(os.getenv("SCRAPE_JOBS_MAX_ATTEMPTS", "3"))
+
+# A job that found the browser pool busy is retried after this many seconds,
+# doubling with each attempt up to SCRAPE_JOBS_RETRY_BACKOFF_MAX.
+SCRAPE_JOBS_RETRY_BACKOFF = float(os.getenv("SCRAPE_JOBS_RETRY_BACKOFF", "5"))
+SCRAPE_JOBS_RETRY_BACKOFF_MAX = float(os.getenv("SCRAPE_JOBS_RETRY_BACKOFF_MAX", "120"))
+
+SCRAPE_JOBS_HEARTBEAT_INTERVAL = 15
+
+# Running jobs without a heartbeat for this long are requeued.
+SCRAPE_JOBS_STALE_AFTER = int(os.getenv("SCRAPE_JOBS_STALE_AFTER", "120"))
+
+# Seconds finished jobs are kept.
+SCRAPE_JOBS_RETENTION = int(os.getenv("SCRAPE_JOBS_RETENTION", str(7 * 86400)))
+
+# Financials result cache
+# Seconds each scraped section stays fresh; stale entries are served while a
+# background scrape refreshes them.
+FINANCIALS_CACHE_SECTION_TTLS = {
+    "shareholding": 6 * 3600,
+    "ratios": 6 * 3600,
+    "peers": 24 * 3600,
+    "quarters": 24 * 3600,
+    "profit-loss": 7 * 86400,
+    "cashflow": 7 * 86400,
+    "balance-sheet": 30 * 86400,
+    "default": 24 * 3600,
+}
+
+# How long a stale entry may still be served before it is dropped entirely.
+FINANCIALS_CACHE_MAX_STALE = int(os.getenv("FINANCIALS_CACHE_MAX_STALE", str(90 * 86400)))
+
+# Memory cap for the in-process LRU in front of the shared cache.
+FINANCIALS_CACHE_MAX_BYTES = int(os.getenv("FINANCIALS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+FINANCIALS_CACHE_REFRESH_WORKERS = int(os.getenv("FINANCIALS_CACHE_REFRESH_WORKERS", "2"))
+
+FINANCIALS_CACHE_REFRESH_LOCK_TIMEOUT = 300
+
+# NewsAPI client
+NEWS_API_BASE_URL = os.getenv("NEWS_API_BASE_URL", "https://newsapi.org/v2/everything")
+
+NEWS_API_CONNECT_TIMEOUT = float(os.getenv("NEWS_API_CONNECT_TIMEOUT", "3.05"))
+
+NEWS_API_READ_TIMEOUT = float(os.getenv("NEWS_API_READ_TIMEOUT", "10"))
+
+NEWS_API_MAX_RETRIES = int(os.getenv("NEWS_API_MAX_RETRIES", "2"))
+
+NEWS_API_BACKOFF_BASE = float(os.getenv("NEWS_API_BACKOFF_BASE", "0.5"))
+
+NEWS_API_BACKOFF_MAX = float(os.getenv("NEWS_API_BACKOFF_MAX", "8"))
+
+NEWS_API_POOL_SIZE = int(os.getenv("NEWS_API_POOL_SIZE", "10"))
+
+# Upper bound on in-flight NewsAPI requests from one async (ASGI) process.
+NEWS_API_ASYNC_MAX_CONNECTIONS = int(os.getenv("NEWS_API_ASYNC_MAX_CONNECTIONS", "200"))
+
+# Consecutive failures that open the circuit, and seconds before a trial call.
+NEWS_API_BREAKER_THRESHOLD = int(os.getenv("NEWS_API_BREAKER_THRESHOLD", "5"))
+
+NEWS_API_BREAKER_RESET = float(os.getenv("NEWS_API_BREAKER_RESET", "30"))
+
+# News sentiment caching
+# NewsAPI responses keyed on (query, date window, page size).
+SENTIMENT_NEWS_CACHE_TTL = int(os.getenv("SENTIMENT_NEWS_CACHE_TTL", "600"))
+
+SENTIMENT_NEWS_CACHE_SIZE = int(os.getenv("SENTIMENT_NEWS_CACHE_SIZE", "512"))
+
+# How long the last good response is kept for use while NewsAPI is degraded.
+SENTIMENT_NEWS_FALLBACK_TTL = int(os.getenv("SENTIMENT_NEWS_FALLBACK_TTL", str(86400)))
+
+# Per-article sentiment keyed on article URL.
+SENTIMENT_ARTICLE_CACHE_TTL = int(os.getenv("SENTIMENT_ARTICLE_CACHE_TTL", str(7 * 86400)))
+
+SENTIMENT_ARTICLE_CACHE_SIZE = int(os.getenv("SENTIMENT_ARTICLE_CACHE_SIZE", "20000"))
+
+# Batch sentiment endpoint
+SENTIMENT_BATCH_CONCURRENCY = int(os.getenv("SENTIMENT_BATCH_CONCURRENCY", "8"))
+
+SENTIMENT_BATCH_MAX_ITEMS = int(os.getenv("SENTIMENT_BATCH_MAX_ITEMS", "100"))
+
+# Instrumentation
+# Serve Prometheus metrics at /metrics.
+API_METRICS_ENABLED = os.getenv("API_METRICS_ENABLED", "true").lower() == "true"
+
+# Allow ?profile=1 / X-Profile to run a request under a profiler; dumps go to API_PROFILE_DIR.
+API_PROFILING_ENABLED = os.getenv("API_PROFILING_ENABLED", "false").lower() == "true"
+
+API_PROFILE_DIR = os.getenv("API_PROFILE_DIR", str(BASE_DIR / "profiles"))
@@ -1,4 +1,14 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
 
+from .instrumentation import render_metrics
+
 def home(request):
     return render(request, 'index.html')
+
+def metrics(request):
+    """Prometheus text exposition of request/span latency and cache hit ratios."""
+    if not settings.API_METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,3 +1,18 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import FinancialSection, ScrapeJob
+
+
+@admin.register(FinancialSection)
+class FinancialSectionAdmin(admin.ModelAdmin):
+    list_display = ("ticker", "view", "section", "scraped_at", "changed_at")
+    list_filter = ("view", "section")
+    search_fields = ("ticker",)
+    readonly_fields = ("content_hash",)
+
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = ("ticker", "status", "priority", "attempts", "created_at", "finished_at")
+    list_filter = ("status", "priority")
+    search_fields = ("ticker",)
@@ -0,0 +1,60 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+
+from .browser import PoolExhausted
+from .cache import get_financials_cache
+from .normalize import normalize_company
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Shared worker pool bounding concurrent scrapes across all batch requests."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.FINANCIALS_BATCH_CONCURRENCY,
+                thread_name_prefix="financials-batch",
+            )
+        return _executor
+
+
+def fetch_one(ticker, sections=None, columnar=False):
+    """Fetch one ticker through the cache and return its NDJSON record."""
+    try:
+        data, cache_status = get_financials_cache().get(ticker, sections or None)
+    except PoolExhausted as e:
+        return {"ticker": ticker, "status": "error", "error": f"Scraper is busy: {e}"}
+    except Exception as e:
+        logger.exception("Batch fetch failed for %s", ticker)
+        return {"ticker": ticker, "status": "error", "error": str(e)}
+    if not data:
+        return {"ticker": ticker, "status": "error", "error": "Could not retrieve data for the given ticker"}
+    if columnar:
+        data = normalize_company(data)
+    return {"ticker": ticker, "status": "ok", "cache": cache_status, "data": data}
+
+
+def iter_batch(tickers, sections=None, columnar=False):
+    """
+    Yield one NDJSON line per ticker, in completion order.
+
+    Pending scrapes are cancelled if the consumer stops iterating (for
+    example when the client disconnects).
+    """
+    executor = get_executor()
+    futures = [executor.submit(fetch_one, ticker, sections, columnar) for ticker in tickers]
+    try:
+        for future in as_completed(futures):
+            yield json.dumps(future.result()) + "\n"
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,266 @@
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+
+from core.instrumentation import register_collector, span, timed
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhausted(Exception):
+    """Raised when no browser session becomes free within the checkout timeout."""
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+
+
+@timed("driver_install")
+def resolve_driver_path():
+    """
+    Resolve the chromedriver binary path.
+
+    Uses the CHROMEDRIVER_PATH setting when present, otherwise asks
+    webdriver-manager to download/locate a matching driver.
+    """
+    path = getattr(settings, "CHROMEDRIVER_PATH", None)
+    if path:
+        return path
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def _chrome_factory(driver_path):
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    return webdriver.Chrome(service=ChromeService(driver_path), options=options)
+
+
+class DriverPool:
+    """
+    A bounded pool of warm headless Chrome sessions.
+
+    Sessions are created lazily up to ``size``, handed out with ``checkout``
+    and returned with ``checkin``. A session is recycled after ``max_pages``
+    page loads or as soon as it raises a WebDriverException. When every
+    session is busy, callers wait up to ``checkout_timeout`` seconds and then
+    get a PoolExhausted error instead of launching another browser.
+    """
+
+    def __init__(self, size=2, max_pages=50, checkout_timeout=30.0, driver_path=None, factory=None):
+        self.size = size
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        self._driver_path = driver_path
+        self._factory = factory
+        self._idle = []
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "recycled": 0,
+            "crashed": 0,
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "page_loads": 0,
+            "page_load_seconds_total": 0.0,
+            "page_load_seconds_max": 0.0,
+        }
+
+    @timed("browser_launch")
+    def _new_driver(self):
+        if self._factory is None:
+            # Resolve the binary once for the lifetime of the pool.
+            if self._driver_path is None:
+                self._driver_path = resolve_driver_path()
+            driver_path = self._driver_path
+            self._factory = lambda: _chrome_factory(driver_path)
+        return _PooledDriver(self._factory())
+
+    @staticmethod
+    def _is_healthy(pooled):
+        try:
+            pooled.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _quit(pooled):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            logger.debug("Error while quitting browser session", exc_info=True)
+
+    @timed("browser_checkout")
+    def checkout(self, timeout=None):
+        """Take a session from the pool, creating one if below capacity."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolExhausted("Browser pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    pooled = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolExhausted(f"No browser session available after {timeout:.1f}s")
+                self._cond.wait(remaining)
+
+        if pooled is not None and not self._is_healthy(pooled):
+            self._quit(pooled)
+            with self._cond:
+                self._stats["crashed"] += 1
+            pooled = None
+        if pooled is None:
+            try:
+                pooled = self._new_driver()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["created"] += 1
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+        return pooled
+
+    def checkin(self, pooled, discard=False):
+        """Return a session to the pool, recycling it if it is worn out or broken."""
+        recycle = discard or self._closed or pooled.pages >= self.max_pages
+        if recycle:
+            self._quit(pooled)
+        with self._cond:
+            if recycle:
+                self._total -= 1
+                self._stats["crashed" if discard else "recycled"] += 1
+            else:
+                self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        pooled = self.checkout(timeout)
+        discard = False
+        try:
+            yield pooled
+        except WebDriverException:
+            discard = True
+            raise
+        finally:
+            self.checkin(pooled, discard=discard)
+
+    def fetch(self, url, timeout=None):
+        """Load ``url`` in a pooled session and return the rendered page source."""
+        with self.session(timeout) as pooled:
+            start = time.monotonic()
+            with span("page_load"):
+                pooled.driver.get(url)
+                html = pooled.driver.page_source
+            elapsed = time.monotonic() - start
+            pooled.pages += 1
+        with self._cond:
+            self._stats["page_loads"] += 1
+            self._stats["page_load_seconds_total"] += elapsed
+            self._stats["page_load_seconds_max"] = max(self._stats["page_load_seconds_max"], elapsed)
+        logger.debug("Loaded %s in %.3fs", url, elapsed)
+        return html
+
+    def stats(self):
+        """Snapshot of pool occupancy, checkout wait times and page-load latency."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "open": self._total,
+                "idle": len(self._idle),
+                "in_use": self._total - len(self._idle),
+            })
+        checkouts = stats["checkouts"] or 1
+        page_loads = stats["page_loads"] or 1
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / checkouts
+        stats["page_load_seconds_avg"] = stats["page_load_seconds_total"] / page_loads
+        return stats
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide driver pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(
+                size=settings.SCRAPER_BROWSER_POOL_SIZE,
+                max_pages=settings.SCRAPER_BROWSER_MAX_PAGES,
+                checkout_timeout=settings.SCRAPER_BROWSER_CHECKOUT_TIMEOUT,
+                driver_path=resolve_driver_path(),
+            )
+            atexit.register(_pool.close)
+        return _pool
+
+
+def pool_stats():
+    """
+    Stats of the process-wide pool without creating it: all zero (with the
+    configured size) until the first browser fetch.
+    """
+    pool = _pool
+    if pool is None:
+        # Drivers are resolved on first checkout, so an unused pool is free.
+        pool = DriverPool(
+            size=settings.SCRAPER_BROWSER_POOL_SIZE,
+            max_pages=settings.SCRAPER_BROWSER_MAX_PAGES,
+            checkout_timeout=settings.SCRAPER_BROWSER_CHECKOUT_TIMEOUT,
+        )
+    return pool.stats()
+
+
+@register_collector
+def _pool_metrics():
+    if _pool is None:
+        return
+    stats = _pool.stats()
+    yield ("api_browser_sessions", "gauge", "Browser sessions in the pool by state.",
+           [({"state": "in_use"}, stats["in_use"]), ({"state": "idle"}, stats["idle"])])
+    yield ("api_browser_checkout_timeouts_total", "counter", "Checkouts that gave up waiting for a session.",
+           [({}, stats["timeouts"])])
@@ -0,0 +1,258 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core.caching import LRUCache, SingleFlight
+from core.instrumentation import register_cache, register_collector
+from .scrapers import STANDALONE, VIEWS, select_sections
+
+logger = logging.getLogger(__name__)
+
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+
+
+class FinancialsCache:
+    """
+    Per-ticker cache for scraped financial tables, one entry per statement
+    view (standalone or consolidated).
+
+    Entries live in a byte-capped in-process LRU backed by a Django cache
+    alias, so workers can share results through Redis or the file cache.
+    Each section carries its own freshness TTL, and an entry may hold only
+    the sections requested so far. Fresh sections are served as is; stale
+    ones are served immediately while a single background scrape refreshes
+    them; missing ones are first looked up with ``snapshot_reader`` (the
+    database copy, with its original scrape times) and otherwise scraped,
+    blocking on a scrape shared by all concurrent callers.
+    """
+
+    def __init__(self, loader, snapshot_reader=None, alias="default", section_ttls=None,
+                 max_stale=None, max_bytes=None, refresh_workers=None):
+        self.loader = loader
+        self.snapshot_reader = snapshot_reader
+        self.alias = alias
+        self.section_ttls = section_ttls or settings.FINANCIALS_CACHE_SECTION_TTLS
+        self.max_stale = max_stale or settings.FINANCIALS_CACHE_MAX_STALE
+        self.local = LRUCache(max_bytes or settings.FINANCIALS_CACHE_MAX_BYTES)
+        self.flight = SingleFlight()
+        self._executor = ThreadPoolExecutor(
+            max_workers=refresh_workers or settings.FINANCIALS_CACHE_REFRESH_WORKERS,
+            thread_name_prefix="financials-refresh",
+        )
+        self._stats_lock = threading.Lock()
+        self.stats = {HIT: 0, STALE: 0, MISS: 0, "refreshes": 0, "refresh_errors": 0}
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def make_key(ticker, view=STANDALONE):
+        key = f"financials:{ticker.upper()}"
+        return key if view == STANDALONE else f"{key}:{view}"
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _read(self, key):
+        entry = self.local.get(key)
+        if entry is None:
+            entry = self.backend.get(key)
+            if entry is not None:
+                self.local.set(key, entry, ttl=self.max_stale)
+        return entry
+
+    def _read_snapshot(self, ticker, view):
+        if self.snapshot_reader is None:
+            return None
+        snapshot = self.snapshot_reader(ticker, view=view)
+        if snapshot is None:
+            return None
+        return {
+            "data": snapshot["data"],
+            "fetched_at": {section: ts.timestamp() for section, ts in snapshot["scraped_at"].items()},
+        }
+
+    def _lookup(self, ticker, view, sections):
+        """
+        The entry for one view of ``ticker``. Entries may hold only some
+        sections; one lacking any of ``sections`` is completed from the
+        snapshot store where it has them.
+        """
+        key = self.make_key(ticker, view)
+        entry = self._read(key)
+        if entry is not None and all(section in entry["data"] for section in sections):
+            return entry
+        snapshot = self._read_snapshot(ticker, view)
+        if snapshot is None:
+            return entry
+        if entry is not None:
+            # Cached sections are at least as recent as the stored ones.
+            snapshot = {
+                "data": {**snapshot["data"], **entry["data"]},
+                "fetched_at": {**snapshot["fetched_at"], **entry["fetched_at"]},
+            }
+        self._write(key, snapshot)
+        return snapshot
+
+    def _write(self, key, entry):
+        # The in-process copy expires too, so max_stale bounds both tiers.
+        self.local.set(key, entry, ttl=self.max_stale)
+        self.backend.set(key, entry, timeout=self.max_stale)
+
+    def stale_sections(self, entry, now=None):
+        now = now or time.time()
+        default_ttl = self.section_ttls.get("default", 86400)
+        return [
+            section for section, fetched_at in entry["fetched_at"].items()
+            if now - fetched_at > self.section_ttls.get(section, default_ttl)
+        ]
+
+    def _load(self, ticker, views, sections):
+        """Scrape ``sections`` of ``views`` in one loader call and merge them into their entries."""
+        results = self.loader(ticker, views=views, sections=sections)
+        now = time.time()
+        for view, data in results.items():
+            if data:
+                key = self.make_key(ticker, view)
+                entry = self._read(key) or {"data": {}, "fetched_at": {}}
+                self._write(key, {
+                    "data": {**entry["data"], **data},
+                    "fetched_at": {**entry["fetched_at"], **dict.fromkeys(data, now)},
+                })
+        return results
+
+    def _refresh(self, ticker, view, sections):
+        key = self.make_key(ticker, view)
+        lock_key = f"{key}:refreshing"
+        # cache.add is atomic, so only one worker process refreshes a ticker.
+        if not self.backend.add(lock_key, 1, timeout=settings.FINANCIALS_CACHE_REFRESH_LOCK_TIMEOUT):
+            return
+        try:
+            self.flight.do((ticker, view), lambda: self._load(ticker, [view], sections))
+            self._count("refreshes")
+        except Exception:
+            self._count("refresh_errors")
+            logger.exception("Background refresh failed for %s", ticker)
+        finally:
+            self.backend.delete(lock_key)
+
+    def get_views(self, ticker, views=(STANDALONE,), sections=None):
+        """
+        Return ``({view: data}, status)`` for statement ``views`` of ``ticker``,
+        each limited to ``sections`` (default all of SECTIONS).
+
+        ``status`` is one of HIT, STALE or MISS. Sections missing from the
+        cache and snapshot store are scraped for all views that lack them in
+        one loader call, which fetches the views' pages concurrently. A view's
+        ``data`` is None when the loader found nothing; such results are not
+        cached. Stale sections are served and refreshed in the background.
+        """
+        ticker = ticker.upper()
+        sections = select_sections(sections)
+        entries = {view: self._lookup(ticker, view, sections) for view in views}
+        data = {view: dict(entry["data"]) if entry else None for view, entry in entries.items()}
+
+        missing = {}
+        for view, entry in entries.items():
+            absent = [section for section in sections if entry is None or section not in entry["data"]]
+            if absent:
+                missing[view] = absent
+        status = HIT
+        if missing:
+            load_views = list(missing)
+            load_sections = select_sections(set().union(*missing.values()))
+            loaded = self.flight.do((ticker, *load_views, *load_sections),
+                                    lambda: self._load(ticker, load_views, load_sections))
+            for view in load_views:
+                if loaded.get(view):
+                    data[view] = {**(data[view] or {}), **loaded[view]}
+            status = MISS
+
+        for view, entry in entries.items():
+            stale = self.stale_sections(entry) if entry is not None else []
+            if set(stale) & set(sections):
+                # The page is fetched anyway, so refresh every stale section it holds.
+                if not self.flight.in_flight((ticker, view)):
+                    self._executor.submit(self._refresh, ticker, view, stale)
+                if status == HIT:
+                    status = STALE
+        self._count(status)
+        return {
+            view: {section: data[view].get(section) for section in sections} if data[view] else None
+            for view in views
+        }, status
+
+    def get(self, ticker, sections=None, view=STANDALONE):
+        """Return ``(data, status)`` for one statement view; see ``get_views``."""
+        results, status = self.get_views(ticker, (view,), sections)
+        return results[view], status
+
+    def peek(self, ticker, sections=None, view=STANDALONE):
+        """Like ``get`` but never scrapes: return None instead of blocking on a miss."""
+        ticker = ticker.upper()
+        keys = select_sections(sections)
+        entry = self._lookup(ticker, view, keys)
+        if entry is None or not all(section in entry["data"] for section in keys):
+            return None
+        return self.get(ticker, sections, view)
+
+    def load(self, ticker, sections=None, view=STANDALONE):
+        """Scrape ``ticker`` now (joining any scrape already in flight) and cache the result."""
+        ticker = ticker.upper()
+        keys = select_sections(sections)
+        return self.flight.do((ticker, view, *keys), lambda: self._load(ticker, [view], keys))[view]
+
+    def invalidate(self, ticker):
+        for view in VIEWS:
+            key = self.make_key(ticker, view)
+            self.local.delete(key)
+            self.backend.delete(key)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_financials_cache():
+    """Return the process-wide cache in front of the snapshot store and scraper."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from .store import load_snapshot, scrape_views_and_store
+            _cache = FinancialsCache(scrape_views_and_store, snapshot_reader=load_snapshot)
+        return _cache
+
+
+
+def _tier_counts():
+    if _cache is None:
+        return 0, 0
+    return _cache.stats[HIT] + _cache.stats[STALE], _cache.stats[MISS]
+
+
+def _local_counts():
+    if _cache is None:
+        return 0, 0
+    return _cache.local.hits, _cache.local.misses
+
+
+# Lookups answered by any tier (fresh or stale), and by the in-process LRU alone.
+register_cache("financials", _tier_counts)
+register_cache("financials_local", _local_counts)
+
+
+@register_collector
+def _cache_metrics():
+    stats = _cache.stats if _cache is not None else dict.fromkeys((HIT, STALE, MISS, "refreshes", "refresh_errors"), 0)
+    yield ("api_financials_cache_lookups_total", "counter", "Financials cache lookups by outcome.",
+           [({"outcome": outcome}, stats[outcome]) for outcome in (HIT, STALE, MISS)])
+    yield ("api_financials_cache_refreshes_total", "counter", "Background refreshes of stale entries.",
+           [({"result": "ok"}, stats["refreshes"]), ({"result": "error"}, stats["refresh_errors"])])
@@ -0,0 +1,339 @@
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .browser import PoolExhausted
+from .models import ScrapeJob
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"interactive": ScrapeJob.PRIORITY_INTERACTIVE, "batch": ScrapeJob.PRIORITY_BATCH}
+
+# Notified whenever a worker in this process finishes a job, so long-polls
+# return immediately instead of waiting for their next database check.
+_finished = threading.Condition()
+
+
+def priority_name(priority):
+    return next((name for name, value in PRIORITIES.items() if value == priority), str(priority))
+
+
+def submit(ticker, priority=ScrapeJob.PRIORITY_INTERACTIVE):
+    """
+    Queue a scrape of ``ticker`` and return ``(job, created)``.
+
+    If the ticker already has a queued or running job, that job is returned
+    instead, and a queued one is moved up when the new request has a higher
+    priority (a lower number).
+    """
+    ticker = ticker.upper()
+    for _ in range(3):
+        job = ScrapeJob.objects.filter(ticker=ticker, status__in=ScrapeJob.ACTIVE).first()
+        if job is not None:
+            if priority < job.priority and job.status == ScrapeJob.QUEUED:
+                ScrapeJob.objects.filter(pk=job.pk, status=ScrapeJob.QUEUED).update(priority=priority)
+                job.priority = priority
+            created = False
+        else:
+            try:
+                with transaction.atomic():
+                    job = ScrapeJob.objects.create(ticker=ticker, priority=priority)
+            except IntegrityError:
+                # Another request queued the same ticker in between; join its job.
+                continue
+            created = True
+        wake_workers()
+        return job, created
+    raise RuntimeError(f"Could not queue a scrape job for {ticker}")
+
+
+def submit_many(tickers, priority=ScrapeJob.PRIORITY_BATCH):
+    """Queue several tickers; returns the jobs in input order."""
+    return [submit(ticker, priority)[0] for ticker in dict.fromkeys(t.upper() for t in tickers)]
+
+
+def claim(worker):
+    """
+    Atomically take the highest-priority queued job for ``worker``, skipping
+    jobs waiting out a retry delay.
+
+    The conditional UPDATE only succeeds for one claimant, so this is safe
+    across threads and processes sharing the database. Returns None when the
+    queue is empty.
+    """
+    while True:
+        job = (
+            ScrapeJob.objects.filter(status=ScrapeJob.QUEUED)
+            .filter(Q(not_before__isnull=True) | Q(not_before__lte=timezone.now()))
+            .order_by("priority", "created_at", "pk")
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = ScrapeJob.objects.filter(pk=job.pk, status=ScrapeJob.QUEUED).update(
+            status=ScrapeJob.RUNNING, worker=worker, attempts=job.attempts + 1,
+            started_at=now, heartbeat_at=now,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def retry_delay(attempts):
+    """Seconds to wait before another attempt after ``attempts`` tries found the browser pool busy."""
+    return min(settings.SCRAPE_JOBS_RETRY_BACKOFF * 2 ** (attempts - 1), settings.SCRAPE_JOBS_RETRY_BACKOFF_MAX)
+
+
+def run(job, loader=None):
+    """
+    Scrape the job's ticker through the financials cache and record the outcome.
+
+    Results land in the snapshot table and the cache, where the financial data
+    endpoint serves them. A busy browser pool puts the job back in the queue,
+    to be retried after a growing delay, until it has been tried
+    ``SCRAPE_JOBS_MAX_ATTEMPTS`` times.
+    """
+    if loader is None:
+        from .cache import get_financials_cache
+        loader = get_financials_cache().load
+
+    status, error = ScrapeJob.SUCCEEDED, ""
+    try:
+        if not loader(job.ticker):
+            status, error = ScrapeJob.FAILED, "Could not retrieve data for the given ticker"
+    except PoolExhausted as e:
+        if job.attempts < settings.SCRAPE_JOBS_MAX_ATTEMPTS:
+            not_before = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+            ScrapeJob.objects.filter(pk=job.pk).update(status=ScrapeJob.QUEUED, worker="", error=str(e),
+                                                       not_before=not_before)
+            return
+        status, error = ScrapeJob.FAILED, f"Scraper is busy: {e}"
+    except Exception as e:
+        logger.exception("Scrape job %s for %s failed", job.pk, job.ticker)
+        status, error = ScrapeJob.FAILED, str(e)
+
+    ScrapeJob.objects.filter(pk=job.pk).update(status=status, error=error, finished_at=timezone.now())
+    with _finished:
+        _finished.notify_all()
+
+
+def requeue_stale(stale_after=None):
+    """
+    Put back running jobs whose worker stopped sending heartbeats (for
+    example because its process was killed). Jobs that have used up their
+    attempts are failed instead. Returns the number of jobs touched.
+    """
+    stale_after = stale_after or settings.SCRAPE_JOBS_STALE_AFTER
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = ScrapeJob.objects.filter(status=ScrapeJob.RUNNING, heartbeat_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=settings.SCRAPE_JOBS_MAX_ATTEMPTS).update(
+        status=ScrapeJob.FAILED, error="Worker stopped responding", finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=ScrapeJob.QUEUED, worker="")
+    return failed + requeued
+
+
+def prune(retention=None):
+    """Delete finished jobs older than ``retention`` seconds."""
+    retention = retention or settings.SCRAPE_JOBS_RETENTION
+    cutoff = timezone.now() - timedelta(seconds=retention)
+    deleted, _ = ScrapeJob.objects.filter(finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def wait(job_id, timeout):
+    """
+    Long-poll: return the job once it has finished or ``timeout`` seconds
+    have passed, whichever comes first. Returns None for an unknown job.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        job = ScrapeJob.objects.filter(pk=job_id).first()
+        remaining = deadline - time.monotonic()
+        if job is None or job.done or remaining <= 0:
+            return job
+        # Jobs run by other processes are only seen on the next database check.
+        with _finished:
+            _finished.wait(min(remaining, settings.SCRAPE_JOBS_POLL_INTERVAL))
+
+
+def serialize(job):
+    """JSON representation returned by the job endpoints."""
+    record = {
+        "id": job.pk,
+        "ticker": job.ticker,
+        "status": job.status,
+        "priority": priority_name(job.priority),
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.error:
+        record["error"] = job.error
+    return record
+
+
+def metrics(now=None):
+    """Queue depth, in-flight jobs, throughput and latency of the job queue."""
+    now = now or timezone.now()
+    active = ScrapeJob.objects.filter(status__in=ScrapeJob.ACTIVE)
+    depth = {name: 0 for name in PRIORITIES}
+    running = 0
+    oldest_queued = None
+    for status, priority, created_at in active.values_list("status", "priority", "created_at"):
+        if status == ScrapeJob.RUNNING:
+            running += 1
+            continue
+        name = priority_name(priority)
+        depth[name] = depth.get(name, 0) + 1
+        oldest_queued = created_at if oldest_queued is None else min(oldest_queued, created_at)
+
+    recent = ScrapeJob.objects.filter(finished_at__gte=now - timedelta(hours=1)).values_list(
+        "status", "created_at", "started_at", "finished_at",
+    )
+    completed = {"1m": 0, "5m": 0, "60m": 0}
+    failed_last_hour = 0
+    waits, durations = [], []
+    for status, created_at, started_at, finished_at in recent:
+        age = (now - finished_at).total_seconds()
+        completed["60m"] += 1
+        completed["5m"] += age <= 300
+        completed["1m"] += age <= 60
+        failed_last_hour += status == ScrapeJob.FAILED
+        if started_at:
+            waits.append((started_at - created_at).total_seconds())
+            durations.append((finished_at - started_at).total_seconds())
+
+    def mean(values):
+        return round(sum(values) / len(values), 3) if values else None
+
+    return {
+        "queued": depth,
+        "queue_depth": sum(depth.values()),
+        "running": running,
+        "oldest_queued_seconds": round((now - oldest_queued).total_seconds(), 3) if oldest_queued else None,
+        "completed": completed,
+        "throughput_per_minute": {"1m": completed["1m"], "5m": round(completed["5m"] / 5, 3), "60m": round(completed["60m"] / 60, 3)},
+        "failed_last_hour": failed_last_hour,
+        "mean_wait_seconds": mean(waits),
+        "mean_run_seconds": mean(durations),
+        "local_workers": _pool.stats() if _pool is not None else None,
+    }
+
+
+class WorkerPool:
+    """
+    Threads that claim and run scrape jobs from the database queue.
+
+    Any number of pools (in the web process or started with
+    ``manage.py run_scrape_workers``) can serve the same queue. Idle workers
+    sleep until ``wake`` is called or ``poll_interval`` passes. A heartbeat
+    thread marks this pool's running jobs alive and periodically requeues
+    jobs abandoned by dead workers and prunes old finished ones.
+    """
+
+    def __init__(self, size, poll_interval=None, heartbeat_interval=None, loader=None):
+        self.size = size
+        self.poll_interval = poll_interval or settings.SCRAPE_JOBS_POLL_INTERVAL
+        self.heartbeat_interval = heartbeat_interval or settings.SCRAPE_JOBS_HEARTBEAT_INTERVAL
+        self.loader = loader
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.processed = 0
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.size):
+                thread = threading.Thread(target=self._work, args=(f"{self.name}/{i}",),
+                                          name=f"scrape-job-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._housekeep, name="scrape-job-heartbeat", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stats(self):
+        return {"name": self.name, "size": self.size, "processed": self.processed}
+
+    def _work(self, worker):
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                job = claim(worker)
+            except Exception:
+                logger.exception("Could not claim a scrape job")
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            run(job, self.loader)
+            with self._lock:
+                self.processed += 1
+
+    def _housekeep(self):
+        last_prune = 0.0
+        while not self._stop.wait(self.heartbeat_interval):
+            close_old_connections()
+            try:
+                ScrapeJob.objects.filter(status=ScrapeJob.RUNNING, worker__startswith=f"{self.name}/").update(
+                    heartbeat_at=timezone.now(),
+                )
+                requeue_stale()
+                if time.monotonic() - last_prune > 3600:
+                    prune()
+                    last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Scrape job housekeeping failed")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return this process's worker pool, starting it on first use, or None when
+    ``SCRAPE_JOBS_WORKERS`` is 0 (jobs are then run by ``run_scrape_workers``).
+
+    The job views start it; commands that only queue jobs do not, so their
+    short-lived processes never pick up work.
+    """
+    global _pool
+    if settings.SCRAPE_JOBS_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(settings.SCRAPE_JOBS_WORKERS)
+            _pool.start()
+        return _pool
+
+
+def wake_workers():
+    """Wake this process's idle workers, if it has started any."""
+    if _pool is not None:
+        _pool.wake()
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+
+from financials.jobs import submit_many
+from financials.scrapers import scrape_company
+from financials.store import bulk_save_snapshots
+
+
+class Command(BaseCommand):
+    help = "Scrape financials for many tickers and store only the sections that changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tickers", nargs="*", help="Tickers to refresh.")
+        parser.add_argument("--file", help="File with one ticker per line.")
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent scrapes (default: 4).")
+        parser.add_argument("--chunk-size", type=int, default=200,
+                            help="Tickers per database write (default: 200).")
+        parser.add_argument("--enqueue", action="store_true",
+                            help="Queue batch-priority scrape jobs for the job workers instead of scraping here.")
+
+    def handle(self, *args, **options):
+        tickers = [t.strip().upper() for t in options["tickers"]]
+        if options["file"]:
+            with open(options["file"]) as f:
+                tickers += [line.strip().upper() for line in f if line.strip()]
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            raise CommandError("Provide tickers as arguments or with --file.")
+
+        if options["enqueue"]:
+            jobs = submit_many(tickers)
+            self.stdout.write(self.style.SUCCESS(f"Queued {len(jobs)} scrape jobs."))
+            return
+
+        totals = {"created": 0, "updated": 0, "unchanged": 0}
+        failed = []
+        pending = {}
+
+        def flush():
+            counts = bulk_save_snapshots(pending)
+            for key in totals:
+                totals[key] += counts[key]
+            pending.clear()
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = {executor.submit(scrape_company, ticker): ticker for ticker in tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    failed.append(ticker)
+                    self.stderr.write(f"{ticker}: {e}")
+                    continue
+                if not data:
+                    failed.append(ticker)
+                    self.stderr.write(f"{ticker}: no data")
+                    continue
+                pending[ticker] = data
+                if len(pending) >= options["chunk_size"]:
+                    flush()
+        if pending:
+            flush()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {len(tickers) - len(failed)} tickers: {totals['created']} sections created, "
+            f"{totals['updated']} updated, {totals['unchanged']} unchanged, {len(failed)} failed."
+        ))
@@ -0,0 +1,31 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from financials.jobs import WorkerPool, requeue_stale
+
+
+class Command(BaseCommand):
+    help = "Run background scrape job workers until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Concurrent scrape jobs (default: 2).")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} abandoned jobs.")
+
+        pool = WorkerPool(options["workers"])
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        pool.start()
+        self.stdout.write(self.style.SUCCESS(f"{pool.name}: {options['workers']} scrape workers running."))
+        try:
+            stop.wait()
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write("Stopping after running jobs finish...")
+        pool.stop()
+        self.stdout.write(self.style.SUCCESS(f"Stopped; processed {pool.processed} jobs."))
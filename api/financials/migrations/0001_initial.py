@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinancialSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=32)),
+                ('section', models.CharField(max_length=32)),
+                ('headers', models.JSONField(default=list)),
+                ('rows', models.JSONField(default=list)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('scraped_at', models.DateTimeField(help_text='Last time the section was scraped.')),
+                ('changed_at', models.DateTimeField(help_text='Last time the scraped content differed from the stored copy.')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('ticker', 'section'), name='unique_ticker_section')],
+            },
+        ),
+    ]
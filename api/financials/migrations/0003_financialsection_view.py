@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financials', '0002_scrapejob'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='financialsection',
+            name='unique_ticker_section',
+        ),
+        migrations.AddField(
+            model_name='financialsection',
+            name='view',
+            field=models.CharField(choices=[('standalone', 'standalone'), ('consolidated', 'consolidated')], default='standalone', max_length=16),
+        ),
+        migrations.AddConstraint(
+            model_name='financialsection',
+            constraint=models.UniqueConstraint(fields=('ticker', 'view', 'section'), name='unique_ticker_view_section'),
+        ),
+    ]
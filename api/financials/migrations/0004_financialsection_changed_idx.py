@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financials', '0003_financialsection_view'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='financialsection',
+            index=models.Index(fields=['changed_at'], name='financial_section_changed_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financials', '0004_financialsection_changed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapejob',
+            name='not_before',
+            field=models.DateTimeField(blank=True, help_text='A requeued job is not claimed before this time.', null=True),
+        ),
+    ]
@@ -1,3 +1,81 @@
 from django.db import models
 
-# Create your models here.
+
+class FinancialSection(models.Model):
+    """One parsed screener.in table (e.g. ``quarters``) for one ticker and statement view."""
+
+    STANDALONE = "standalone"
+    CONSOLIDATED = "consolidated"
+    VIEW_CHOICES = [(v, v) for v in (STANDALONE, CONSOLIDATED)]
+
+    ticker = models.CharField(max_length=32)
+    view = models.CharField(max_length=16, choices=VIEW_CHOICES, default=STANDALONE)
+    section = models.CharField(max_length=32)
+    headers = models.JSONField(default=list)
+    rows = models.JSONField(default=list)
+    content_hash = models.CharField(max_length=64)
+    scraped_at = models.DateTimeField(help_text="Last time the section was scraped.")
+    changed_at = models.DateTimeField(help_text="Last time the scraped content differed from the stored copy.")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ticker", "view", "section"], name="unique_ticker_view_section"),
+        ]
+        indexes = [
+            # Incremental refreshes of the screening matrices.
+            models.Index(fields=["changed_at"], name="financial_section_changed_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.ticker} {self.view} {self.section}"
+
+    def as_table(self):
+        return {"headers": self.headers, "rows": self.rows}
+
+
+class ScrapeJob(models.Model):
+    """A queued scrape of one ticker, run by the background job workers."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [(s, s) for s in (QUEUED, RUNNING, SUCCEEDED, FAILED)]
+    ACTIVE = (QUEUED, RUNNING)
+
+    # Lower numbers run first.
+    PRIORITY_INTERACTIVE = 0
+    PRIORITY_BATCH = 10
+
+    ticker = models.CharField(max_length=32)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.SmallIntegerField(default=PRIORITY_INTERACTIVE)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=64, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last sign of life from the running worker.")
+    not_before = models.DateTimeField(null=True, blank=True, help_text="A requeued job is not claimed before this time.")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # At most one queued or running job per ticker; new submissions join it.
+            models.UniqueConstraint(
+                fields=["ticker"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="unique_active_scrape_job",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "priority", "created_at"], name="scrape_job_claim_idx"),
+            models.Index(fields=["finished_at"], name="scrape_job_finished_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.ticker} {self.status}"
+
+    @property
+    def done(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
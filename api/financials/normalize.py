@@ -0,0 +1,99 @@
+import math
+import re
+
+NAN = float("nan")
+
+# Currency markers, units and grouping that wrap numbers in screener.in tables.
+_STRIP = re.compile(r"(₹|Rs\.?|Cr\.?|crores?|,|\s)", re.IGNORECASE)
+_NUMBER = re.compile(r"^[+-]?(\d+(\.\d*)?|\.\d+)$")
+_BLANKS = {"", "-", "--", "—", "NA", "N/A", "n/a"}
+
+
+def parse_number(text):
+    """
+    Convert a display string such as "1,23,456", "12%", "-3.5" or
+    "₹ 2,345 Cr." into a float, returning NaN for blanks and non-numbers.
+
+    Amounts stay in the table's own unit (screener.in reports Rs. crores) and
+    percentages stay in percent, so "12%" becomes 12.0.
+    """
+    if text is None:
+        return NAN
+    value = str(text).strip()
+    if value in _BLANKS:
+        return NAN
+    negative = value.startswith("(") and value.endswith(")")
+    if negative:
+        value = value[1:-1]
+    value = value.replace("−", "-").rstrip("%")
+    value = _STRIP.sub("", value)
+    if not _NUMBER.match(value):
+        return NAN
+    number = float(value)
+    return -number if negative else number
+
+
+def clean_label(text):
+    """Drop the expand marker screener.in appends to row labels ("Sales+")."""
+    return text.rstrip("+").strip()
+
+
+def _json_number(value):
+    if math.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def to_columnar(table, index_header=None, as_numpy=False):
+    """
+    Convert a ``parse_table`` result into typed columns.
+
+    By default rows are metrics and headers are periods, so the result is
+    ``{"index": [periods], "columns": {metric: [values]}}``. When
+    ``index_header`` names a header (e.g. "Name" for the peers table), rows
+    are records instead: that column becomes the index and every other
+    header becomes a column.
+
+    Missing values are None, or NaN when ``as_numpy`` is set, in which case
+    each column is a float64 NumPy array.
+    """
+    if table is None:
+        return None
+    headers, rows = table["headers"], table["rows"]
+
+    if index_header and index_header in headers:
+        position = headers.index(index_header)
+        index = [row[position] if position < len(row) else "" for row in rows]
+        columns = {}
+        for i, header in enumerate(headers):
+            if i == position:
+                continue
+            columns[header] = [parse_number(row[i]) if i < len(row) else NAN for row in rows]
+    else:
+        index = headers[1:]
+        columns = {}
+        for row in rows:
+            if not row:
+                continue
+            values = [parse_number(cell) for cell in row[1:]]
+            values += [NAN] * (len(index) - len(values))
+            columns[clean_label(row[0])] = values[:len(index)]
+
+    if as_numpy:
+        import numpy as np
+        columns = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+    else:
+        columns = {name: [_json_number(v) for v in values] for name, values in columns.items()}
+    return {"index": index, "columns": columns}
+
+
+# Sections whose rows are records (one company per row) rather than metrics.
+RECORD_SECTIONS = {"peers": "Name"}
+
+
+def normalize_company(data, as_numpy=False):
+    """Apply ``to_columnar`` to every section of a ``scrape_company`` result."""
+    return {
+        section: to_columnar(table, RECORD_SECTIONS.get(section), as_numpy=as_numpy)
+        for section, table in data.items()
+    }
@@ -1,20 +1,166 @@
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+import contextvars
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from core.instrumentation import timed
+from .browser import get_pool
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = {
+    "peers": "peers",
+    "quarters": "quarters",
+    "profit-loss": "profit-loss",
+    "balance-sheet": "balance-sheet",
+    "cashflow": "cashflow",
+    "ratios": "ratios",
+    "shareholding": "shareholding",
+}
+
+# screener.in shows standalone statements at /company/<ticker>/ and the
+# consolidated ones at /company/<ticker>/consolidated/.
+STANDALONE = "standalone"
+CONSOLIDATED = "consolidated"
+VIEWS = (STANDALONE, CONSOLIDATED)
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_local = threading.local()
+
+
+def select_sections(sections=None):
+    """
+    SECTIONS keys to scrape, in page order: all of them when ``sections`` is
+    None, else the given keys. Unknown keys raise ValueError.
+    """
+    if sections is None:
+        return list(SECTIONS)
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown sections {', '.join(sorted(unknown))}; choose from {', '.join(SECTIONS)}")
+    return [key for key in SECTIONS if key in sections]
+
+
+def company_url(ticker, view=STANDALONE):
+    suffix = "consolidated/" if view == CONSOLIDATED else ""
+    return f"{settings.SCREENER_BASE_URL}/company/{ticker}/{suffix}"
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` requests per second with bursts of ``burst``."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def throttle(url):
+    """Block until a request to ``url``'s host is allowed by the per-host rate limit."""
+    host = urlsplit(url).netloc
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = RateLimiter(settings.SCRAPER_HOST_RATE_LIMIT, settings.SCRAPER_HOST_BURST)
+    limiter.acquire()
+
+
+def get_http_session():
+    """Return this thread's keep-alive session for screener.in requests."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings.SCRAPER_HTTP_POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(HTTP_HEADERS)
+        _local.session = session
+    return session
+
+
+_fetch_executor = None
+_fetch_executor_lock = threading.Lock()
+
+
+def get_fetch_executor():
+    """
+    Shared pool for the extra page fetches of a scrape (other views, peers,
+    browser fallbacks). Its tasks never wait on each other, so it cannot
+    deadlock when every worker is busy.
+    """
+    global _fetch_executor
+    with _fetch_executor_lock:
+        if _fetch_executor is None:
+            _fetch_executor = ThreadPoolExecutor(
+                max_workers=settings.SCRAPER_FETCH_WORKERS,
+                thread_name_prefix="scraper-fetch",
+            )
+        return _fetch_executor
+
+
+def _submit(fn, *args):
+    # Run in a copy of the caller's context so spans reach its Server-Timing header.
+    return get_fetch_executor().submit(contextvars.copy_context().run, fn, *args)
+
+
+@timed("http_fetch")
+def get_html(url):
+    """
+    Fetch a page over plain HTTP.
+
+    Returns None when the page does not exist (HTTP 404).
+    """
+    throttle(url)
+    response = get_http_session().get(url, timeout=settings.SCRAPER_HTTP_TIMEOUT)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.text
+
+@timed("browser_fetch")
+def get_rendered_html(url):
+    """Load ``url`` in a pooled headless browser and return the rendered HTML."""
+    throttle(url)
+    return get_pool().fetch(url)
+
+@timed("get_soup")
 def get_soup(url):
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
-    driver.get(url)
-    html = driver.page_source
-    driver.quit()
-    return BeautifulSoup(html, 'html.parser')
+    return BeautifulSoup(get_rendered_html(url), 'html.parser')
 
+@timed("parse_table")
 def parse_table(soup, section_id):
     sec = soup.find('section', id=section_id)
     if not sec:
@@ -30,19 +176,177 @@ def parse_table(soup, section_id):
             rows.append(cols)
     return {"headers": headers, "rows": rows}
 
-def scrape_company(ticker):
-    url = f"https://www.screener.in/company/{ticker}/"
-    soup = get_soup(url)
-    data = {}
-    mapping = {
-        "peers": "peers",
-        "quarters": "quarters",
-        "profit-loss": "profit-loss",
-        "balance-sheet": "balance-sheet",
-        "cashflow": "cashflow",
-        "ratios": "ratios",
-        "shareholding": "shareholding",
-    }
-    for key, sec_id in mapping.items():
-        data[key] = parse_table(soup, sec_id)
-    return data
+
+def _parse_sections_bs4(html, section_ids, features):
+    # Only build the targeted <section> subtrees instead of the whole page.
+    strainer = SoupStrainer('section', id=list(section_ids))
+    soup = BeautifulSoup(html, features, parse_only=strainer)
+    return {sec_id: parse_table(soup, sec_id) for sec_id in section_ids}
+
+
+def _parse_sections_selectolax(html, section_ids):
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    result = {}
+    for sec_id in section_ids:
+        sec = tree.css_first(f'section[id="{sec_id}"]')
+        table = sec.css_first('table') if sec else None
+        if table is None:
+            result[sec_id] = None
+            continue
+        headers = [th.text(strip=True) for th in table.css('th')]
+        rows = []
+        for tr in table.css('tr'):
+            cols = [td.text(strip=True) for td in tr.css('td')]
+            if cols:
+                rows.append(cols)
+        result[sec_id] = {"headers": headers, "rows": rows}
+    return result
+
+
+PARSER_BACKENDS = {
+    "html.parser": lambda html, ids: _parse_sections_bs4(html, ids, 'html.parser'),
+    "lxml": lambda html, ids: _parse_sections_bs4(html, ids, 'lxml'),
+    "selectolax": _parse_sections_selectolax,
+}
+
+
+@timed("parse_sections")
+def parse_sections(html, section_ids, backend=None):
+    """
+    Parse the tables of the given ``<section>`` ids out of a page.
+
+    ``backend`` is one of PARSER_BACKENDS and defaults to the
+    SCRAPER_PARSER_BACKEND setting. Every backend returns the same
+    ``{section_id: parse_table result}`` mapping.
+    """
+    backend = backend or settings.SCRAPER_PARSER_BACKEND
+    try:
+        parse = PARSER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown parser backend {backend!r}; choose from {', '.join(PARSER_BACKENDS)}")
+    return parse(html, list(section_ids))
+
+
+def _is_empty(table):
+    return not table or not table["rows"]
+
+
+_WAREHOUSE_ID = re.compile(r'data-warehouse-id="(\d+)"')
+
+
+@timed("fetch_peers")
+def _fetch_peers(html):
+    """
+    Fetch the peer comparison table from the AJAX endpoint the page itself uses.
+
+    screener.in renders an empty ``#peers`` section and fills it from
+    ``/api/company/<warehouse id>/peers/``.
+    """
+    match = _WAREHOUSE_ID.search(html)
+    if not match:
+        return None
+    warehouse_id = match.group(1)
+    try:
+        html = get_html(f"{settings.SCREENER_BASE_URL}/api/company/{warehouse_id}/peers/")
+    except requests.RequestException as e:
+        logger.warning("Peers fetch failed for warehouse id %s: %s", warehouse_id, e)
+        return None
+    if not html:
+        return None
+    return parse_sections(f'<section id="peers">{html}</section>', ["peers"])["peers"]
+
+
+def _scrape_http(ticker, keys, views):
+    """
+    Scrape ``keys`` of each of ``views`` without a browser, falling back per section.
+
+    The first view's page is fetched on this thread and the others alongside
+    it. Peers come from an AJAX endpoint, fetched while the rest of the page
+    is parsed. Sections that are still empty are re-read from browser-rendered
+    copies of their pages. A view is None when screener.in has no page for it.
+    """
+    others = {view: _submit(get_html, company_url(ticker, view)) for view in views[1:]}
+    results, peers = {}, {}
+    for view in views:
+        html = others[view].result() if view in others else get_html(company_url(ticker, view))
+        if html is None:
+            results[view] = None
+            continue
+        if "peers" in keys:
+            peers[view] = _submit(_fetch_peers, html)
+        tables = parse_sections(html, [SECTIONS[key] for key in keys])
+        results[view] = {key: tables[SECTIONS[key]] for key in keys}
+
+    for view, future in peers.items():
+        if _is_empty(results[view]["peers"]):
+            results[view]["peers"] = future.result() or results[view]["peers"]
+
+    missing = {}
+    for view, data in results.items():
+        empty = [key for key, table in (data or {}).items() if _is_empty(table)]
+        if empty:
+            missing[view] = empty
+    if missing and settings.SCRAPER_BROWSER_FALLBACK:
+        rendered = {view: _submit(get_rendered_html, company_url(ticker, view)) for view in missing}
+        for view, empty in missing.items():
+            logger.info("Falling back to browser for %s %s sections: %s", ticker, view, ", ".join(empty))
+            tables = parse_sections(rendered[view].result(), [SECTIONS[key] for key in empty])
+            for key in empty:
+                results[view][key] = tables[SECTIONS[key]]
+    return results
+
+
+def _scrape_browser(ticker, keys, views):
+    pages = {view: _submit(get_rendered_html, company_url(ticker, view)) for view in views}
+    results = {}
+    for view in views:
+        tables = parse_sections(pages[view].result(), [SECTIONS[key] for key in keys])
+        results[view] = {key: tables[SECTIONS[key]] for key in keys}
+    return results
+
+
+def scrape_company_http(ticker, sections=None, view=STANDALONE):
+    """
+    Scrape a company page without a browser, falling back per section.
+
+    Sections that come back empty from the static HTML (and, for peers, from
+    the AJAX endpoint) are re-read from a browser-rendered copy of the page.
+    Returns None when screener.in has no page for the ticker.
+    """
+    return _scrape_http(ticker, select_sections(sections), [view])[view]
+
+
+def scrape_company_browser(ticker, sections=None, view=STANDALONE):
+    return _scrape_browser(ticker, select_sections(sections), [view])[view]
+
+
+def scrape_company_views(ticker, views=VIEWS, sections=None, mode=None):
+    """
+    Scrape ``sections`` (default all) of several statement views of
+    ``ticker`` in one call, fetching their pages concurrently.
+
+    Returns ``{view: data}`` with ``data`` as returned by ``scrape_company``.
+    """
+    keys = select_sections(sections)
+    views = list(dict.fromkeys(views))
+    mode = mode or settings.SCRAPER_FETCH_MODE
+    if mode == "http":
+        try:
+            return _scrape_http(ticker, keys, views)
+        except requests.RequestException as e:
+            logger.warning("HTTP fetch failed for %s, using browser: %s", ticker, e)
+    return _scrape_browser(ticker, keys, views)
+
+
+def scrape_company(ticker, mode=None, sections=None, view=STANDALONE):
+    """
+    Scrape the financial sections of ``ticker``: all of SECTIONS, or only
+    the ``sections`` keys given, which are the only ones located and parsed.
+
+    ``view`` is ``"standalone"`` (the default company page) or
+    ``"consolidated"``. ``mode`` is ``"http"`` (static HTML with browser
+    fallback) or ``"browser"``; it defaults to the SCRAPER_FETCH_MODE setting.
+    """
+    return scrape_company_views(ticker, [view], sections=sections, mode=mode)[view]
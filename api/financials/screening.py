@@ -0,0 +1,581 @@
+"""
+Vectorized stock screening over the stored financial tables.
+
+The ``ratios``, ``profit-loss`` and ``quarters`` tables of every ticker in
+``FinancialSection`` are held in memory as float64 NumPy arrays indexed by
+(ticker, metric, lag), where lag 0 is the latest period. Filters such as
+``ROCE > 20 and 3y sales CAGR > 15`` and rankings are evaluated as
+whole-array operations, so a screen over thousands of tickers takes
+milliseconds. Refreshes are incremental: only sections whose content hash
+changed since the last refresh are read back and parsed again.
+
+Expressions combine comparisons (``> >= < <= == !=``) with ``and``, ``or``,
+``not`` and parentheses, over numbers and metric references with ``+ - * /``.
+A metric reference is the row label of a table, matched case-insensitively
+without ``%``, ``+`` and ``in Rs`` (``ROCE``, ``OPM``, ``EPS``, ``Net Profit``),
+optionally with:
+
+- ``<n>y <metric> CAGR`` / ``<n>y <metric> growth``: compound annual or total
+  growth over n years, in percent
+- ``<n>y avg <metric>``: mean of the latest n periods
+- ``<metric> <n>y ago``: the value n years back
+- ``quarterly <metric>``, ``<n>q`` (quarters instead of years) and
+  ``quarterly <metric> yoy``: the latest quarter, and its growth over the same
+  quarter a year earlier
+- ``TTM <metric>``: the trailing twelve months column of the P&L
+
+Plain metrics are looked up in ``ratios``, then ``profit-loss``. A comparison
+involving a missing value is unknown rather than false, as in SQL: it never
+matches, and neither does its negation (``not ROCE > 20`` skips tickers
+without a ROCE).
+"""
+import difflib
+import functools
+import re
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Max
+from django.utils import timezone
+
+from core.instrumentation import span
+from .models import FinancialSection
+from .normalize import clean_label, to_columnar
+
+SCREEN_SECTIONS = ("ratios", "profit-loss", "quarters")
+ANNUAL_SECTIONS = ("ratios", "profit-loss")
+QUARTERS = "quarters"
+# Pseudo-section holding the TTM column of the P&L.
+TTM = "ttm"
+
+# Rows written by transactions still open at the last refresh may carry an
+# older changed_at, so every refresh re-checks the hashes of recent changes.
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+ALIASES = {
+    "revenue": "sales",
+    "profit": "net profit",
+    "pat": "net profit",
+    "operating margin": "opm",
+    "ebitda": "operating profit",
+}
+
+COMPARISONS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+ARITHMETIC = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide}
+KEYWORDS = {"and", "or", "not"}
+
+_UNITS = re.compile(r"%|\+|\bin rs\.?$")
+_PERIOD = re.compile(r"(\d+)([yq])")
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>\d+(?:\.\d+)?)%?(?![\w.])"
+    r"|(?P<op>>=|<=|==|!=|>|<|[-+*/()])"
+    r"|(?P<word>[^\s<>=!+*/()-]+))"
+)
+
+
+def metric_key(label):
+    """Lookup key of a table row label: "ROCE %" -> "roce", "EPS in Rs+" -> "eps"."""
+    return " ".join(_UNITS.sub(" ", clean_label(label).lower()).split())
+
+
+# Expressions
+
+def _tokens(text):
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unexpected {text[pos:].strip()[:10]!r} in {text!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        yield kind, match.group(kind)
+
+
+def _is_condition(node):
+    return node[0] in ("cmp", "and", "or", "not")
+
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = list(_tokens(text))
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def accept(self, kind, *values):
+        token_kind, value = self.peek()
+        if token_kind == kind and (value.lower() if kind == "word" else value) in values:
+            self.pos += 1
+            return value
+        return None
+
+    def fail(self, message):
+        raise ValueError(f"{message} in {self.text!r}")
+
+    def parse(self):
+        node = self.or_()
+        if self.pos < len(self.tokens):
+            self.fail(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def condition(self, node):
+        if not _is_condition(node):
+            self.fail("Expected a comparison")
+        return node
+
+    def value(self, node):
+        if _is_condition(node):
+            self.fail("Expected a value, not a condition")
+        return node
+
+    def or_(self):
+        node = self.and_()
+        while self.accept("word", "or"):
+            node = ("or", self.condition(node), self.condition(self.and_()))
+        return node
+
+    def and_(self):
+        node = self.not_()
+        while self.accept("word", "and"):
+            node = ("and", self.condition(node), self.condition(self.not_()))
+        return node
+
+    def not_(self):
+        if self.accept("word", "not"):
+            return ("not", self.condition(self.not_()))
+        return self.comparison()
+
+    def comparison(self):
+        node = self.sum_()
+        op = self.accept("op", *COMPARISONS)
+        if op:
+            node = ("cmp", op, self.value(node), self.value(self.sum_()))
+        return node
+
+    def sum_(self):
+        node = self.product()
+        while True:
+            op = self.accept("op", "+", "-")
+            if not op:
+                return node
+            node = ("arith", op, self.value(node), self.value(self.product()))
+
+    def product(self):
+        node = self.unary()
+        while True:
+            op = self.accept("op", "*", "/")
+            if not op:
+                return node
+            node = ("arith", op, self.value(node), self.value(self.unary()))
+
+    def unary(self):
+        if self.accept("op", "-"):
+            return ("neg", self.value(self.unary()))
+        return self.atom()
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == "number":
+            return ("num", float(value))
+        if kind == "op" and value == "(":
+            node = self.or_()
+            if not self.accept("op", ")"):
+                self.fail("Missing ')'")
+            return node
+        if kind == "word" and value.lower() not in KEYWORDS:
+            words = [value]
+            while self.peek()[0] == "word" and self.peek()[1].lower() not in KEYWORDS:
+                words.append(self.take()[1])
+            return ("metric", " ".join(words), _metric_spec(" ".join(words)))
+        self.fail(f"Unexpected {value!r}" if value else "Unexpected end")
+
+
+def _metric_spec(phrase):
+    """``(section, key, function, lag, years)`` for a metric reference; section None means annual."""
+    section = function = None
+    count = unit = None
+    words = []
+    for word in phrase.lower().split():
+        period = _PERIOD.fullmatch(word)
+        if period:
+            count, unit = int(period.group(1)), period.group(2)
+        elif word in ("cagr", "growth", "yoy", "ago"):
+            function = word
+        elif word in ("avg", "average", "mean"):
+            function = "avg"
+        elif word == "ttm":
+            section = TTM
+        elif word in ("quarterly", "quarter", "qtr"):
+            section = QUARTERS
+        else:
+            words.append(word)
+    key = metric_key(" ".join(words))
+    key = ALIASES.get(key, key)
+    if not key:
+        raise ValueError(f"No metric named in {phrase!r}")
+    if unit == "q" or function == "yoy":
+        if section == TTM:
+            raise ValueError(f"TTM values have no quarterly history in {phrase!r}")
+        section = QUARTERS
+    if section == TTM:
+        if function or count:
+            raise ValueError(f"TTM values have no history in {phrase!r}")
+        return TTM, key, None, 0, None
+    if function == "yoy":
+        if count:
+            raise ValueError(f"'yoy' takes no period in {phrase!r}")
+        return QUARTERS, key, "growth", 4, 1.0
+    if function and not count:
+        raise ValueError(f"{function!r} needs a period such as 3y in {phrase!r}")
+    if count is not None and not function:
+        raise ValueError(f"Use the period with CAGR, growth, avg or ago in {phrase!r}")
+    if not function:
+        return section, key, None, 0, None
+    if count == 0:
+        raise ValueError(f"Period must be positive in {phrase!r}")
+    if section == QUARTERS:
+        lag = count if unit == "q" else count * 4
+        return QUARTERS, key, function, lag, lag / 4
+    return None, key, function, count, float(count)
+
+
+@functools.lru_cache(maxsize=512)
+def parse_expression(text):
+    """
+    Parse a screen expression into a tree of tuples. Raises ValueError on
+    syntax errors; metric names are checked when the tree is evaluated.
+    """
+    return _Parser(text).parse()
+
+
+def parse_condition(text):
+    node = parse_expression(text)
+    if not _is_condition(node):
+        raise ValueError(f"Expected a comparison such as 'ROCE > 20', got {text!r}")
+    return node
+
+
+def parse_value(text):
+    node = parse_expression(text)
+    if _is_condition(node):
+        raise ValueError(f"Expected a metric or arithmetic, not a condition: {text!r}")
+    return node
+
+
+# Data
+
+class SectionMatrix:
+    """One section for every ticker: ``values[ticker, metric, lag]``, lag 0 the latest period."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.labels = {}
+        self.values = np.full((0, 0, 0), np.nan)
+        self.latest = []
+
+    def _reserve(self, rows, metrics, periods):
+        capacity, width, depth = self.values.shape
+        if rows <= capacity and metrics <= width and periods <= depth:
+            return
+        # Tickers are added one at a time, so grow that axis geometrically.
+        grown = np.full((max(rows, capacity * 2), max(metrics, width), max(periods, depth)), np.nan)
+        grown[:capacity, :width, :depth] = self.values
+        self.values = grown
+
+    def set(self, row, columns, latest):
+        """Replace ticker ``row``'s values with ``{label: values}``, oldest period first."""
+        for label in columns:
+            key = metric_key(label)
+            if key not in self.metrics:
+                self.metrics[key] = len(self.metrics)
+                self.labels[key] = clean_label(label)
+        periods = max((len(values) for values in columns.values()), default=0)
+        self._reserve(row + 1, len(self.metrics), periods)
+        self.values[row] = np.nan
+        for label, values in columns.items():
+            self.values[row, self.metrics[metric_key(label)], :len(values)] = values[::-1]
+        self.latest += [None] * (row + 1 - len(self.latest))
+        self.latest[row] = latest
+
+    def series(self, key, lag, size):
+        """Values of metric ``key`` at ``lag`` for the first ``size`` tickers (NaN where absent)."""
+        out = np.full(size, np.nan)
+        rows = min(size, self.values.shape[0])
+        if lag < self.values.shape[2]:
+            out[:rows] = self.values[:rows, self.metrics[key], lag]
+        return out
+
+    def window(self, key, periods, size):
+        """``[ticker, lag]`` block of the latest ``periods`` values of metric ``key``."""
+        out = np.full((size, periods), np.nan)
+        rows = min(size, self.values.shape[0])
+        depth = min(periods, self.values.shape[2])
+        out[:rows, :depth] = self.values[:rows, self.metrics[key], :depth]
+        return out
+
+
+class Universe:
+    """
+    In-memory screening matrices for one statement view, kept in step with
+    ``FinancialSection`` by ``refresh``.
+    """
+
+    def __init__(self, view=FinancialSection.STANDALONE):
+        self.view = view
+        self.tickers = []
+        self.rows = {}
+        self.matrices = {section: SectionMatrix() for section in SCREEN_SECTIONS + (TTM,)}
+        self.hashes = {}
+        self.cursor = None
+        self.refreshed_at = None
+        self._refreshed = None
+        self.lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def update(self, ticker, section, table):
+        """Replace one ticker's section with a ``parse_table`` result. Call with ``lock`` held."""
+        row = self.rows.get(ticker)
+        if row is None:
+            row = self.rows[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        columnar = to_columnar(table, as_numpy=True) or {"index": [], "columns": {}}
+        periods, columns = columnar["index"], columnar["columns"]
+        if section == "profit-loss" and periods and periods[-1].lower() == TTM:
+            self.matrices[TTM].set(row, {label: values[-1:] for label, values in columns.items()}, periods[-1])
+            periods, columns = periods[:-1], {label: values[:-1] for label, values in columns.items()}
+        self.matrices[section].set(row, columns, periods[-1] if periods else None)
+
+    def refresh(self):
+        """
+        Load the sections changed since the last refresh (all of them the
+        first time). Returns the number of sections parsed.
+        """
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        with span("screen_refresh"):
+            stored = FinancialSection.objects.filter(view=self.view, section__in=SCREEN_SECTIONS)
+            if self.cursor is not None:
+                stored = stored.filter(changed_at__gte=self.cursor - REFRESH_OVERLAP)
+            current = list(stored.values_list("pk", "ticker", "section", "content_hash"))
+            changed = [pk for pk, ticker, section, content_hash in current
+                       if self.hashes.get((ticker, section)) != content_hash]
+            tables = []
+            for start in range(0, len(changed), 500):
+                tables += FinancialSection.objects.filter(pk__in=changed[start:start + 500]).values_list(
+                    "ticker", "section", "headers", "rows", "content_hash")
+            latest = stored.aggregate(latest=Max("changed_at"))["latest"]
+
+            with self.lock:
+                for ticker, section, headers, rows, content_hash in tables:
+                    self.update(ticker, section, {"headers": headers, "rows": rows})
+                    self.hashes[(ticker, section)] = content_hash
+                if latest is not None:
+                    self.cursor = max(filter(None, [self.cursor, latest]))
+                self._refreshed = time.monotonic()
+                self.refreshed_at = timezone.now()
+            return len(tables)
+
+    def ensure_fresh(self, max_age):
+        """Refresh if the last refresh is older than ``max_age`` seconds; only the first load blocks."""
+        if self._refreshed is None:
+            with self._refresh_lock:
+                if self._refreshed is None:
+                    self._refresh()
+        elif time.monotonic() - self._refreshed > max_age and self._refresh_lock.acquire(blocking=False):
+            # Others keep screening the current data meanwhile.
+            try:
+                self._refresh()
+            finally:
+                self._refresh_lock.release()
+
+    def _lookup(self, section, key, phrase):
+        sections = (section,) if section else ANNUAL_SECTIONS
+        for name in sections:
+            if key in self.matrices[name].metrics:
+                return self.matrices[name]
+        known = sorted({k for name in sections for k in self.matrices[name].metrics})
+        close = difflib.get_close_matches(key, known, n=3)
+        hint = f"; did you mean {', '.join(close)}?" if close else ""
+        raise ValueError(f"Unknown metric {phrase!r}{hint}")
+
+    def _metric(self, phrase, spec, size):
+        section, key, function, lag, years = spec
+        matrix = self._lookup(section, key, phrase)
+        if function is None:
+            return matrix.series(key, 0, size)
+        if function == "ago":
+            return matrix.series(key, lag, size)
+        if function == "avg":
+            return matrix.window(key, lag, size).mean(axis=1)
+        current, base = matrix.series(key, 0, size), matrix.series(key, lag, size)
+        valid = (current > 0) & (base > 0) if function == "cagr" else base > 0
+        ratio = np.divide(current, base, out=np.full(size, np.nan), where=valid)
+        if function == "cagr":
+            return (ratio ** (1 / years) - 1) * 100
+        return (ratio - 1) * 100
+
+    def evaluate(self, node, size, memo):
+        """Evaluate an expression tree to one value per ticker. Call with ``lock`` held."""
+        kind = node[0]
+        if _is_condition(node):
+            return self._truth(node, size, memo)[0]
+        if kind == "num":
+            return np.full(size, node[1])
+        if kind == "metric":
+            if node[1] not in memo:
+                memo[node[1]] = self._metric(node[1], node[2], size)
+            return memo[node[1]]
+        if kind == "neg":
+            return -self.evaluate(node[1], size, memo)
+        left, right = self.evaluate(node[-2], size, memo), self.evaluate(node[-1], size, memo)
+        return ARITHMETIC[node[1]](left, right)
+
+    def _truth(self, node, size, memo):
+        """
+        ``(true, false)`` masks of a condition. A comparison with a missing
+        value is neither, and ``and``/``or``/``not`` follow SQL's three-valued
+        logic, so negating a condition never matches missing data.
+        """
+        kind = node[0]
+        if kind == "not":
+            true, false = self._truth(node[1], size, memo)
+            return false, true
+        if kind == "cmp":
+            left, right = self.evaluate(node[2], size, memo), self.evaluate(node[3], size, memo)
+            defined = ~np.isnan(left) & ~np.isnan(right)
+            result = COMPARISONS[node[1]](left, right)
+            return result & defined, ~result & defined
+        (left_true, left_false), (right_true, right_false) = (
+            self._truth(node[1], size, memo), self._truth(node[2], size, memo))
+        if kind == "and":
+            return left_true & right_true, left_false | right_false
+        return left_true | right_true, left_false & right_false
+
+
+def _percentile_ranks(values, descending):
+    """Percentile rank of each value among the present ones (100 best); missing values score 0."""
+    present = ~np.isnan(values)
+    count = int(present.sum())
+    scores = np.zeros(len(values))
+    if count:
+        order = np.argsort(-values[present] if descending else values[present], kind="stable")
+        ranks = np.empty(count)
+        ranks[order] = np.arange(count)
+        scores[present] = 100.0 if count == 1 else 100 * (1 - ranks / (count - 1))
+    return scores
+
+
+def _json_values(values):
+    return [round(v, 4) if np.isfinite(v) else None for v in values.tolist()]
+
+
+_universes = {}
+_universes_lock = threading.Lock()
+
+
+def get_universe(view=FinancialSection.STANDALONE):
+    """Return the process-wide screening universe for a statement view."""
+    with _universes_lock:
+        universe = _universes.get(view)
+        if universe is None:
+            universe = _universes[view] = Universe(view)
+        return universe
+
+
+def screen(where=None, sort=(), rank=(), columns=(), limit=50, view=FinancialSection.STANDALONE, max_age=60):
+    """
+    Screen every stored ticker of ``view``.
+
+    ``where`` is a condition such as ``"ROCE > 20 and 3y sales CAGR > 15"``
+    (all tickers when None). ``sort`` is a list of ``(expression,
+    descending)`` keys applied in order; ``rank`` is a list of the same
+    shape combined into one ``score``, the mean percentile rank of the
+    matches on each key. Missing values sort last. ``columns`` are extra
+    expressions to report; every metric in ``where``, ``sort`` and ``rank``
+    is reported too. The universe is refreshed first when older than
+    ``max_age`` seconds.
+
+    Raises ValueError for invalid expressions or unknown metrics.
+    """
+    condition = parse_condition(where) if where else None
+    sort = [(text, parse_value(text), descending) for text, descending in sort]
+    rank = [(text, parse_value(text), descending) for text, descending in rank]
+    reported = [(text, node) for text, node, _ in sort + rank]
+    reported += [(text, parse_value(text)) for text in columns]
+
+    universe = get_universe(view)
+    universe.ensure_fresh(max_age)
+    with universe.lock, span("screen"):
+        size = len(universe.tickers)
+        memo = {}
+        mask = universe.evaluate(condition, size, memo) if condition else np.ones(size, dtype=bool)
+        matches = np.flatnonzero(mask)
+        # Metrics of the filter first, then the sort, rank and extra columns.
+        values = {text: series[matches] for text, series in memo.items()}
+        for text, node in reported:
+            values[text] = universe.evaluate(node, size, memo)[matches]
+
+        score = None
+        if rank:
+            score = np.mean([_percentile_ranks(values[text], descending) for text, _, descending in rank], axis=0)
+            order = np.argsort(-score, kind="stable")
+        elif sort:
+            keys = []
+            for text, _, descending in reversed(sort):
+                key = -values[text] if descending else values[text].copy()
+                key[np.isnan(key)] = np.inf
+                keys.append(key)
+            order = np.lexsort(keys)
+        else:
+            order = np.arange(len(matches))
+        order = order[:limit]
+
+        picked = matches[order]
+        tickers = [universe.tickers[i] for i in picked]
+        annual = universe.matrices["profit-loss"].latest
+        quarterly = universe.matrices[QUARTERS].latest
+        as_of = [
+            {"annual": annual[i] if i < len(annual) else None,
+             "quarter": quarterly[i] if i < len(quarterly) else None}
+            for i in picked
+        ]
+        reported_values = {text: _json_values(series[order]) for text, series in values.items()}
+        scores = _json_values(score[order]) if score is not None else None
+        total, refreshed_at = size, universe.refreshed_at
+
+    results = []
+    for position, ticker in enumerate(tickers):
+        result = {
+            "ticker": ticker,
+            "as_of": as_of[position],
+            "values": {text: reported_values[text][position] for text in reported_values},
+        }
+        if scores is not None:
+            result["score"] = scores[position]
+        results.append(result)
+    return {
+        "view": view,
+        "universe": total,
+        "matched": int(len(matches)),
+        "refreshed_at": refreshed_at.isoformat() if refreshed_at else None,
+        "results": results,
+    }
@@ -0,0 +1,119 @@
+import hashlib
+import json
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import FinancialSection
+
+UPDATE_FIELDS = ["headers", "rows", "content_hash", "scraped_at", "changed_at"]
+
+
+def section_hash(table):
+    """Stable SHA-256 of a parsed table's headers and rows."""
+    payload = json.dumps([table["headers"], table["rows"]], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_snapshot(ticker, view=FinancialSection.STANDALONE):
+    """
+    Read the stored tables for one statement view of ``ticker``.
+
+    Returns ``{"data": {section: table}, "scraped_at": {section: datetime}}``
+    or None when nothing has been stored yet.
+    """
+    sections = list(FinancialSection.objects.filter(ticker=ticker.upper(), view=view))
+    if not sections:
+        return None
+    return {
+        "data": {s.section: s.as_table() for s in sections},
+        "scraped_at": {s.section: s.scraped_at for s in sections},
+    }
+
+
+def bulk_save_snapshots(snapshots, batch_size=500, view=FinancialSection.STANDALONE):
+    """
+    Upsert scraped tables for many tickers, rewriting only changed sections.
+
+    ``snapshots`` maps ticker to the dict returned by ``scrape_company`` for
+    ``view``. Sections that are None (not present on the page) or were not
+    scraped are left untouched.
+    Existing hashes are loaded in one query, new or changed sections are
+    written with a single ``bulk_create(update_conflicts=True)`` per batch and
+    unchanged ones only get their ``scraped_at`` bumped with one UPDATE.
+
+    Returns counts of created, updated and unchanged sections.
+    """
+    now = timezone.now()
+    tickers = [ticker.upper() for ticker in snapshots]
+    existing = {
+        (ticker, section): (pk, content_hash)
+        for pk, ticker, section, content_hash in FinancialSection.objects
+        .filter(ticker__in=tickers, view=view)
+        .values_list("pk", "ticker", "section", "content_hash")
+    }
+
+    changed = []
+    unchanged_pks = []
+    counts = {"created": 0, "updated": 0, "unchanged": 0}
+    for ticker, data in snapshots.items():
+        ticker = ticker.upper()
+        for section, table in (data or {}).items():
+            if table is None:
+                continue
+            digest = section_hash(table)
+            current = existing.get((ticker, section))
+            if current and current[1] == digest:
+                unchanged_pks.append(current[0])
+                counts["unchanged"] += 1
+                continue
+            counts["updated" if current else "created"] += 1
+            changed.append(FinancialSection(
+                ticker=ticker,
+                view=view,
+                section=section,
+                headers=table["headers"],
+                rows=table["rows"],
+                content_hash=digest,
+                scraped_at=now,
+                changed_at=now,
+            ))
+
+    with transaction.atomic():
+        if changed:
+            FinancialSection.objects.bulk_create(
+                changed,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["ticker", "view", "section"],
+                update_fields=UPDATE_FIELDS,
+            )
+        for start in range(0, len(unchanged_pks), batch_size):
+            FinancialSection.objects.filter(pk__in=unchanged_pks[start:start + batch_size]).update(scraped_at=now)
+    return counts
+
+
+def save_snapshot(ticker, data, view=FinancialSection.STANDALONE):
+    """Persist a single ticker's scrape; see ``bulk_save_snapshots``."""
+    return bulk_save_snapshots({ticker: data}, view=view)
+
+
+def scrape_and_store(ticker, **kwargs):
+    """Scrape ``ticker`` and persist the result before returning it."""
+    from .scrapers import scrape_company
+
+    data = scrape_company(ticker, **kwargs)
+    if data:
+        save_snapshot(ticker, data, view=kwargs.get("view", FinancialSection.STANDALONE))
+    return data
+
+
+def scrape_views_and_store(ticker, views, sections=None):
+    """Scrape several statement views of ``ticker`` in one call and persist each."""
+    from .scrapers import scrape_company_views
+
+    results = scrape_company_views(ticker, views, sections=sections)
+    for view, data in results.items():
+        if data:
+            save_snapshot(ticker, data, view=view)
+    return results
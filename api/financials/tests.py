@@ -1,3 +1,388 @@
-from django.test import TestCase
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from bs4 import BeautifulSoup
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from benchmarks import standins
+from . import jobs, scrapers, screening, store
+from .browser import PoolExhausted
+from .cache import HIT, MISS, STALE, FinancialsCache
+from .models import FinancialSection, ScrapeJob
+from .scrapers import PARSER_BACKENDS, SECTIONS, parse_sections, parse_table
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "screener"
+
+
+class ParserTests(SimpleTestCase):
+    """Every parser backend against the saved screener.in pages."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company_html = (FIXTURES / "TCS.html").read_text(encoding="utf-8")
+        # The peers endpoint returns a bare table; _fetch_peers wraps it the same way.
+        cls.peers_html = f'<section id="peers">{(FIXTURES / "TCS_peers.html").read_text(encoding="utf-8")}</section>'
+
+    def test_parse_table_full_page(self):
+        soup = BeautifulSoup(self.company_html, "html.parser")
+        profit_loss = parse_table(soup, "profit-loss")
+        self.assertEqual(profit_loss["headers"][:2], ["", "Mar 2013"])
+        self.assertEqual(profit_loss["rows"][0][:2], ["Sales+", "2,08,659"])
+        self.assertTrue(all(len(row) == len(profit_loss["headers"]) for row in profit_loss["rows"]))
+        # Peers are loaded separately, so the page's section has no table
+        self.assertIsNone(parse_table(soup, "peers"))
+        self.assertIsNone(parse_table(soup, "no-such-section"))
+
+    def test_backends_match_full_page_parse(self):
+        soup = BeautifulSoup(self.company_html, "html.parser")
+        expected = {section: parse_table(soup, section) for section in SECTIONS}
+        for backend in PARSER_BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual(parse_sections(self.company_html, SECTIONS, backend), expected)
+
+    def test_backends_parse_peers(self):
+        for backend in PARSER_BACKENDS:
+            with self.subTest(backend=backend):
+                peers = parse_sections(self.peers_html, ["peers"], backend)["peers"]
+                self.assertEqual(peers["headers"][:4], ["S.No.", "Name", "CMP Rs.", "P/E"])
+                self.assertEqual(len(peers["rows"]), 8)
+                self.assertEqual(peers["rows"][0][:2], ["1.", "TCS"])
+
+    def test_backends_parse_only_requested_sections(self):
+        for backend in PARSER_BACKENDS:
+            with self.subTest(backend=backend):
+                parsed = parse_sections(self.company_html, ["ratios", "missing"], backend)
+                self.assertEqual(set(parsed), {"ratios", "missing"})
+                self.assertEqual(parsed["ratios"]["rows"][0][0], "Debtor Days+")
+                self.assertIsNone(parsed["missing"])
+
+    def test_unknown_backend(self):
+        with self.assertRaisesMessage(ValueError, "Unknown parser backend 'regex'"):
+            parse_sections(self.company_html, ["ratios"], "regex")
+
+
+class HTTPScrapeTests(SimpleTestCase):
+    """The HTTP fetch path against the screener stand-in; the browser is never started."""
+
+    PEERS_PATH = "/api/company/6599230/peers/"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = standins.start_screener(missing={cls.PEERS_PATH})
+        cls.peerless = standins.start_screener()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.peerless.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        rendered = f'<section id="peers">{standins.PEERS_PAGE.decode()}</section>'
+        patcher = mock.patch.object(scrapers, "get_rendered_html", return_value=rendered)
+        self.get_rendered_html = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scrape(self, server, ticker="TCS", **overrides):
+        with self.settings(SCREENER_BASE_URL=standins.base_url(server), SCRAPER_HOST_RATE_LIMIT=0, **overrides):
+            return scrapers.scrape_company_http(ticker)
+
+    def test_peers_come_from_ajax_endpoint(self):
+        data = self.scrape(self.peerless)
+        self.assertEqual(set(data), set(SECTIONS))
+        self.assertEqual(data["peers"]["rows"][0][:2], ["1.", "TCS"])
+        self.assertEqual(len(data["peers"]["rows"]), 8)
+        self.assertTrue(all(data[key]["rows"] for key in SECTIONS))
+        self.get_rendered_html.assert_not_called()
+
+    def test_all_views_in_one_call(self):
+        with self.settings(SCREENER_BASE_URL=standins.base_url(self.peerless), SCRAPER_HOST_RATE_LIMIT=0):
+            results = scrapers._scrape_http("TCS", ["ratios", "peers"], list(scrapers.VIEWS))
+        self.assertEqual(set(results), set(scrapers.VIEWS))
+        for view, data in results.items():
+            with self.subTest(view=view):
+                self.assertEqual(data["ratios"]["rows"][0][0], "Debtor Days+")
+                self.assertEqual(len(data["peers"]["rows"]), 8)
+        self.get_rendered_html.assert_not_called()
+
+    def test_pages_reuse_keep_alive_connection(self):
+        for _ in range(3):
+            self.scrape(self.peerless)
+        # Company pages are fetched on this thread, over its one session
+        pools = scrapers.get_http_session().get_adapter(standins.base_url(self.peerless)).poolmanager.pools
+        opened = [pools[key].num_connections for key in pools.keys() if key.key_port == self.peerless.server_port]
+        self.assertEqual(opened, [1])
+
+    def test_missing_company_is_none(self):
+        # Every company path 404s under a prefix the stand-in does not serve
+        with self.settings(SCREENER_BASE_URL=standins.base_url(self.peerless, "/nowhere"), SCRAPER_HOST_RATE_LIMIT=0):
+            self.assertIsNone(scrapers.scrape_company_http("NOSUCH"))
+        self.get_rendered_html.assert_not_called()
+
+    def test_empty_sections_fall_back_to_browser(self):
+        data = self.scrape(self.server)
+        self.get_rendered_html.assert_called_once_with(standins.base_url(self.server, "/company/TCS/"))
+        self.assertEqual(len(data["peers"]["rows"]), 8)
+        self.assertTrue(data["ratios"]["rows"])
+
+    def test_no_fallback_leaves_sections_empty(self):
+        data = self.scrape(self.server, SCRAPER_BROWSER_FALLBACK=False)
+        self.assertFalse(data["peers"] and data["peers"]["rows"])
+        self.get_rendered_html.assert_not_called()
+
+
+class StubLoader:
+    """Counts scrapes and returns one-row tables tagged with the scrape number."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker, views, sections):
+        with self._lock:
+            self.calls.append((ticker, tuple(views), tuple(sections)))
+            n = len(self.calls)
+        time.sleep(self.delay)
+        self.release.wait(5)
+        return {view: {section: {"headers": ["", "Mar 2024"], "rows": [[section, str(n)]]} for section in sections}
+                for view in views}
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                                       "LOCATION": "financials-cache-tests"}})
+class FinancialsCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def make_cache(self, loader, **kwargs):
+        kwargs.setdefault("section_ttls", {"default": 100, "peers": 10})
+        cache = FinancialsCache(loader, max_stale=1000, **kwargs)
+        self.addCleanup(cache._executor.shutdown)
+        return cache
+
+    def age(self, cache, ticker, seconds):
+        """Backdate every section of ``ticker`` by ``seconds``."""
+        key = cache.make_key(ticker)
+        entry = cache._read(key)
+        cache._write(key, {**entry, "fetched_at": {s: t - seconds for s, t in entry["fetched_at"].items()}})
+
+    def test_concurrent_misses_share_one_scrape(self):
+        loader = StubLoader(delay=0.2)
+        cache = self.make_cache(loader)
+        barrier = threading.Barrier(50)
+
+        def get():
+            barrier.wait()
+            return cache.get("TCS", ["ratios"])
+
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            results = list(pool.map(lambda _: get(), range(50)))
+        self.assertEqual(len(loader.calls), 1)
+        self.assertEqual({str(data) for data, _ in results}, {str(results[0][0])})
+        self.assertIn(MISS, {status for _, status in results})
+
+    def test_sections_expire_on_their_own_ttl(self):
+        loader = StubLoader()
+        cache = self.make_cache(loader)
+        cache.get("TCS", ["peers", "ratios"])
+        entry = cache._read(cache.make_key("TCS"))
+        fetched = entry["fetched_at"]["ratios"]
+        self.assertEqual(cache.stale_sections(entry, now=fetched + 5), [])
+        self.assertEqual(cache.stale_sections(entry, now=fetched + 11), ["peers"])
+        self.assertEqual(sorted(cache.stale_sections(entry, now=fetched + 101)), ["peers", "ratios"])
+
+        self.age(cache, "TCS", 11)
+        data, status = cache.get("TCS", ["peers", "ratios"])
+        self.assertEqual(status, STALE)
+        cache._executor.shutdown(wait=True)
+        # Only the expired section is scraped again
+        self.assertEqual(loader.calls[-1], ("TCS", ("standalone",), ("peers",)))
+        self.assertEqual(cache.get("TCS", ["peers", "ratios"])[1], HIT)
+
+    def test_stale_data_served_while_refresh_holds_lock(self):
+        loader = StubLoader()
+        cache = self.make_cache(loader)
+        fresh, _ = cache.get("TCS", ["ratios"])
+        self.age(cache, "TCS", 101)
+
+        loader.release.clear()
+        self.assertEqual(cache.get("TCS", ["ratios"]), (fresh, STALE))
+        deadline = time.monotonic() + 5
+        while len(loader.calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # The refresh is parked in the loader, holding the lock
+        lock_key = f"{cache.make_key('TCS')}:refreshing"
+        self.assertEqual(cache.backend.get(lock_key), 1)
+        for _ in range(5):
+            self.assertEqual(cache.get("TCS", ["ratios"]), (fresh, STALE))
+        self.assertEqual(len(loader.calls), 2)
+
+        loader.release.set()
+        cache._executor.shutdown(wait=True)
+        data, status = cache.get("TCS", ["ratios"])
+        self.assertEqual(status, HIT)
+        self.assertEqual(data["ratios"]["rows"], [["ratios", "2"]])
+        self.assertIsNone(cache.backend.get(lock_key))
+
+    def test_local_tier_evicts_least_recently_used_by_bytes(self):
+        probe = self.make_cache(StubLoader())
+        probe.get("PROBE", ["ratios"])
+        entry_bytes = probe.local.size
+
+        loader = StubLoader()
+        cache = self.make_cache(loader, max_bytes=entry_bytes * 2 + entry_bytes // 2)
+        cache.get("AAA", ["ratios"])
+        cache.get("BBB", ["ratios"])
+        cache.get("AAA", ["ratios"])
+        cache.get("CCC", ["ratios"])
+        self.assertEqual(len(cache.local), 2)
+        self.assertLessEqual(cache.local.size, cache.local.max_bytes)
+        self.assertIsNone(cache.local.get(cache.make_key("BBB")))
+        self.assertIsNotNone(cache.local.get(cache.make_key("AAA")))
+
+        # The evicted entry is still served from the shared backend
+        self.assertEqual(cache.get("BBB", ["ratios"])[1], HIT)
+        self.assertEqual(len(loader.calls), 3)
+
+
+class BulkSaveSnapshotsTests(TestCase):
+    def table(self, value):
+        return {"headers": ["", "Mar 2024"], "rows": [["Sales+", value]]}
+
+    def save(self, snapshots, at):
+        with mock.patch("financials.store.timezone.now", return_value=at), CaptureQueriesContext(connection) as ctx:
+            counts = store.bulk_save_snapshots(snapshots)
+        return counts, [query["sql"] for query in ctx.captured_queries]
+
+    def test_only_changed_sections_are_rewritten(self):
+        first = timezone.now() - timedelta(days=1)
+        second = first + timedelta(hours=12)
+        self.save({
+            "TCS": {"ratios": self.table("1"), "quarters": self.table("2")},
+            "INFY": {"ratios": self.table("3")},
+        }, first)
+        before = {(s.ticker, s.section): s for s in FinancialSection.objects.all()}
+
+        counts, queries = self.save({
+            "tcs": {"ratios": self.table("1"), "quarters": self.table("20"), "peers": None},
+            "INFY": {"ratios": self.table("3"), "cashflow": self.table("4")},
+        }, second)
+        self.assertEqual(counts, {"created": 1, "updated": 1, "unchanged": 2})
+
+        after = {(s.ticker, s.section): s for s in FinancialSection.objects.all()}
+        self.assertEqual(set(after), set(before) | {("INFY", "cashflow")})
+        for key in [("TCS", "ratios"), ("INFY", "ratios")]:
+            with self.subTest(unchanged=key):
+                self.assertEqual(after[key].scraped_at, second)
+                self.assertEqual(after[key].changed_at, first)
+                self.assertEqual(after[key].as_table(), before[key].as_table())
+        changed = after[("TCS", "quarters")]
+        self.assertEqual(changed.pk, before[("TCS", "quarters")].pk)
+        self.assertEqual((changed.scraped_at, changed.changed_at), (second, second))
+        self.assertEqual(changed.as_table(), self.table("20"))
+        self.assertEqual(changed.content_hash, store.section_hash(self.table("20")))
+
+        # One upsert for the changed and new sections, one UPDATE for the unchanged
+        writes = [sql for sql in queries if sql.startswith(("INSERT", "UPDATE"))]
+        self.assertEqual(len(writes), 2)
+        self.assertIn("ON CONFLICT", writes[0])
+        self.assertTrue(writes[1].startswith("UPDATE"))
+        self.assertNotIn('"rows"', writes[1])
+
+
+@override_settings(SCRAPE_JOBS_MAX_ATTEMPTS=3, SCRAPE_JOBS_RETRY_BACKOFF=5, SCRAPE_JOBS_RETRY_BACKOFF_MAX=8)
+class ScrapeJobRetryTests(TestCase):
+    @staticmethod
+    def busy_loader(ticker):
+        raise PoolExhausted("No browser session available after 30.0s")
+
+    def test_busy_pool_requeues_with_backoff(self):
+        jobs.submit("TCS")
+        job = jobs.claim("test/0")
+        before = timezone.now()
+        jobs.run(job, self.busy_loader)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ScrapeJob.QUEUED)
+        self.assertGreaterEqual(job.not_before, before + timedelta(seconds=5))
+        self.assertIsNone(jobs.claim("test/0"))
+
+        ScrapeJob.objects.filter(pk=job.pk).update(not_before=timezone.now())
+        self.assertEqual(jobs.claim("test/0").pk, job.pk)
+
+    def test_retry_delay_doubles_up_to_max(self):
+        self.assertEqual([jobs.retry_delay(n) for n in (1, 2, 3)], [5, 8, 8])
+
+    def test_busy_pool_fails_after_max_attempts(self):
+        jobs.submit("TCS")
+        for _ in range(3):
+            ScrapeJob.objects.update(not_before=None)
+            job = jobs.claim("test/0")
+            jobs.run(job, self.busy_loader)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ScrapeJob.FAILED)
+        self.assertIn("Scraper is busy", job.error)
+
+
+@override_settings(SCRAPE_JOBS_WORKERS=0)
+class ScrapeJobDetailViewTests(TestCase):
+    def test_wait_must_be_finite(self):
+        job, _ = jobs.submit("TCS")
+        url = reverse("scrape_job", args=[job.pk])
+        for wait in ("nan", "NaN", "inf", "-inf", "soon"):
+            with self.subTest(wait=wait):
+                response = self.client.get(url, {"wait": wait})
+                self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {"wait": "0"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], ScrapeJob.QUEUED)
+
+
+class ScreeningMissingDataTests(SimpleTestCase):
+    """Conditions over tickers with and without a ROCE row."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        headers = ["", "Mar 2023", "Mar 2024"]
+        cls.universe = screening.Universe()
+        for ticker, rows in [
+            ("HIGH", [["ROCE %", "30%", "35%"], ["Debtor Days", "40", "50"]]),
+            ("LOW", [["ROCE %", "8%", "10%"], ["Debtor Days", "70", "90"]]),
+            ("NOROCE", [["Debtor Days", "20", "30"]]),
+        ]:
+            cls.universe.update(ticker, "ratios", {"headers": headers, "rows": rows})
+
+    def matches(self, text):
+        with self.universe.lock:
+            mask = self.universe.evaluate(screening.parse_condition(text), len(self.universe.tickers), {})
+        return {ticker for ticker, hit in zip(self.universe.tickers, mask) if hit}
+
+    def test_missing_data_never_matches(self):
+        cases = [
+            ("ROCE > 20", {"HIGH"}),
+            ("not ROCE > 20", {"LOW"}),
+            ("not not ROCE > 20", {"HIGH"}),
+            ("not (ROCE > 20 and debtor days < 60)", {"LOW"}),
+            ("not (ROCE > 20 or debtor days < 60)", {"LOW"}),
+            ("ROCE > 20 or debtor days < 60", {"HIGH", "NOROCE"}),
+            ("not (ROCE > 20) and debtor days < 60", set()),
+            ("debtor days < 60 and not ROCE < 5", {"HIGH"}),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(self.matches(text), expected)
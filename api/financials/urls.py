@@ -1,7 +1,19 @@
 
+from django.conf import settings
 from django.urls import path
-from .views import FinancialDataView
+from .views import (
+    AsyncFinancialDataView, BrowserPoolStatsView, FinancialDataBatchView, FinancialDataView,
+    ScrapeJobDetailView, ScrapeJobListView, ScrapeJobMetricsView, ScreenView,
+)
+
+financial_data_view = AsyncFinancialDataView if settings.API_ASYNC_VIEWS else FinancialDataView
 
 urlpatterns = [
-    path('financial_data/<str:ticker>/', FinancialDataView.as_view(), name='financial_data'),
+    path('financial_data/<str:ticker>/', financial_data_view.as_view(), name='financial_data'),
+    path('batch/', FinancialDataBatchView.as_view(), name='financial_data_batch'),
+    path('browser_pool/', BrowserPoolStatsView.as_view(), name='browser_pool'),
+    path('screen/', ScreenView.as_view(), name='financials_screen'),
+    path('jobs/', ScrapeJobListView.as_view(), name='scrape_jobs'),
+    path('jobs/metrics/', ScrapeJobMetricsView.as_view(), name='scrape_job_metrics'),
+    path('jobs/<int:job_id>/', ScrapeJobDetailView.as_view(), name='scrape_job'),
 ]
@@ -1,15 +1,290 @@
+import asyncio
+import contextvars
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views import View
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .scrapers import scrape_company
+from . import jobs, screening
+from .batch import iter_batch
+from .browser import PoolExhausted, pool_stats
+from .cache import get_financials_cache
+from .normalize import normalize_company
+from .scrapers import SECTIONS, STANDALONE, VIEWS
+
+LAYOUTS = ('rows', 'columnar')
+BOTH = 'both'
+
+def parse_financials_params(query_params):
+    """
+    Validate the ``layout``, ``sections`` (comma-separated SECTIONS keys,
+    default all) and ``view`` (``standalone``, ``consolidated`` or ``both``)
+    query parameters of the financial data views.
+
+    Returns ``(params, error)`` where ``error`` is a message for a 400 response.
+    """
+    layout = query_params.get('layout', 'rows')
+    if layout not in LAYOUTS:
+        return None, f"'layout' must be one of: {', '.join(LAYOUTS)}"
+    sections = None
+    if query_params.get('sections'):
+        sections = [s.strip() for s in query_params['sections'].split(',') if s.strip()]
+        if not sections or not all(s in SECTIONS for s in sections):
+            return None, f"'sections' must be a comma-separated list drawn from: {', '.join(SECTIONS)}"
+    view = query_params.get('view', STANDALONE)
+    if view not in VIEWS + (BOTH,):
+        return None, f"'view' must be one of: {', '.join(VIEWS + (BOTH,))}"
+    return {
+        "columnar": layout == 'columnar',
+        "sections": sections,
+        "views": list(VIEWS) if view == BOTH else [view],
+    }, None
+
+def financials_body(results, params):
+    """
+    Response body for ``FinancialsCache.get_views`` results: the requested
+    view's sections, or ``{"standalone": ..., "consolidated": ...}`` for
+    ``view=both``. None when there is nothing to return.
+    """
+    if not any(results.values()):
+        return None
+    if params["columnar"]:
+        results = {view: normalize_company(data) if data else data for view, data in results.items()}
+    if len(params["views"]) == 1:
+        return results[params["views"][0]]
+    return results
+
+def wants_async(request):
+    """True when the client sent ``Prefer: respond-async`` (RFC 7240)."""
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+def job_record(request, job):
+    record = jobs.serialize(job)
+    record["url"] = request.build_absolute_uri(reverse('scrape_job', args=[job.pk]))
+    record["result_url"] = request.build_absolute_uri(reverse('financial_data', args=[job.ticker]))
+    return record
+
+def job_accepted(request, job, response_class=Response):
+    """202 pointing the client at the job to poll."""
+    record = job_record(request, job)
+    response = response_class(record, status=status.HTTP_202_ACCEPTED)
+    response["Location"] = record["url"]
+    return response
 
 class FinancialDataView(APIView):
+    """
+    GET the financial tables of a ticker. ``sections=quarters,ratios`` limits
+    which sections are scraped, parsed and returned; ``view=consolidated``
+    selects the consolidated statements and ``view=both`` returns both,
+    fetched concurrently.
+    """
     def get(self, request, ticker):
         if not ticker:
             return Response({"error": "Ticker is required"}, status=status.HTTP_400_BAD_REQUEST)
+        params, error = parse_financials_params(request.query_params)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
         
-        result = scrape_company(ticker.upper())
+        try:
+            # Scrape jobs fetch the standalone statements only.
+            if wants_async(request) and params["views"] == [STANDALONE]:
+                # Never hold the connection for a cold scrape; hand it to a job instead.
+                cached = get_financials_cache().peek(ticker, params["sections"])
+                if cached is None:
+                    jobs.get_pool()
+                    return job_accepted(request, jobs.submit(ticker)[0])
+                results, cache_status = {STANDALONE: cached[0]}, cached[1]
+            else:
+                results, cache_status = get_financials_cache().get_views(ticker.upper(), params["views"], params["sections"])
+        except PoolExhausted as e:
+            return Response({"error": f"Scraper is busy, please retry: {str(e)}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        result = financials_body(results, params)
+        if result:
+            response = Response(result, status=status.HTTP_200_OK)
+            response["X-Cache"] = cache_status
+            return response
+        else:
+            return Response({"error": "Could not retrieve data for the given ticker"}, status=status.HTTP_404_NOT_FOUND)
+
+_scrape_executor = None
+_scrape_executor_lock = threading.Lock()
+
+def get_scrape_executor():
+    """Bounded executor that async views hand blocking scrapes (HTTP, browser, DB) to."""
+    global _scrape_executor
+    with _scrape_executor_lock:
+        if _scrape_executor is None:
+            _scrape_executor = ThreadPoolExecutor(
+                max_workers=settings.API_ASYNC_SCRAPE_WORKERS,
+                thread_name_prefix="financials-async",
+            )
+        return _scrape_executor
+
+def run_in_scrape_executor(fn, *args):
+    """
+    Run ``fn`` on the scrape executor in a copy of the caller's context, so
+    spans timed in the worker thread reach the request's Server-Timing header.
+    """
+    context = contextvars.copy_context()
+    return asyncio.get_running_loop().run_in_executor(get_scrape_executor(), context.run, fn, *args)
+
+class AsyncFinancialDataView(View):
+    """
+    Async variant of FinancialDataView for ASGI deployments. The event loop
+    stays free while the cache lookup and any scrape run on a bounded executor.
+    """
+    async def get(self, request, ticker):
+        params, error = parse_financials_params(request.GET)
+        if error:
+            return JsonResponse({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if wants_async(request) and params["views"] == [STANDALONE]:
+                cached = await run_in_scrape_executor(get_financials_cache().peek, ticker, params["sections"])
+                if cached is None:
+                    jobs.get_pool()
+                    job, _ = await run_in_scrape_executor(jobs.submit, ticker)
+                    return job_accepted(request, job, JsonResponse)
+                results, cache_status = {STANDALONE: cached[0]}, cached[1]
+            else:
+                results, cache_status = await run_in_scrape_executor(
+                    get_financials_cache().get_views, ticker.upper(), params["views"], params["sections"])
+        except PoolExhausted as e:
+            return JsonResponse({"error": f"Scraper is busy, please retry: {str(e)}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        result = financials_body(results, params)
         if result:
-            return Response(result, status=status.HTTP_200_OK)
+            response = JsonResponse(result, status=status.HTTP_200_OK)
+            response["X-Cache"] = cache_status
+            return response
         else:
-            return Response({"error": "Could not retrieve data for the given ticker"}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return JsonResponse({"error": "Could not retrieve data for the given ticker"}, status=status.HTTP_404_NOT_FOUND)
+
+class FinancialDataBatchView(APIView):
+    """
+    POST {"tickers": [...], "sections": [...], "layout": "rows"|"columnar"} and
+    receive one NDJSON line per ticker as soon as it is ready. Failures are
+    reported per ticker.
+    """
+    def post(self, request):
+        tickers = request.data.get('tickers')
+        sections = request.data.get('sections')
+        layout = request.data.get('layout', 'rows')
+
+        if not isinstance(tickers, list) or not tickers or not all(isinstance(t, str) and t.strip() for t in tickers):
+            return Response({"error": "'tickers' must be a non-empty list of ticker symbols"}, status=status.HTTP_400_BAD_REQUEST)
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        if len(tickers) > settings.FINANCIALS_BATCH_MAX_TICKERS:
+            return Response({"error": f"At most {settings.FINANCIALS_BATCH_MAX_TICKERS} tickers per batch"}, status=status.HTTP_400_BAD_REQUEST)
+        if sections is not None:
+            if not isinstance(sections, list) or not all(s in SECTIONS for s in sections):
+                return Response({"error": f"'sections' must be a list drawn from: {', '.join(SECTIONS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        if layout not in LAYOUTS:
+            return Response({"error": f"'layout' must be one of: {', '.join(LAYOUTS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return StreamingHttpResponse(iter_batch(tickers, sections, columnar=layout == 'columnar'), content_type='application/x-ndjson')
+
+def parse_sort_keys(value):
+    """``"ROCE desc, 3y sales CAGR"`` -> ``[("ROCE", True), ("3y sales CAGR", True)]``; descending by default."""
+    keys = []
+    for part in filter(None, (p.strip() for p in (value or '').split(','))):
+        words = part.split()
+        descending = words[-1].lower() != 'asc'
+        if words[-1].lower() in ('asc', 'desc'):
+            words = words[:-1]
+        keys.append((' '.join(words), descending))
+    return keys
+
+class ScreenView(APIView):
+    """
+    GET ?q=ROCE > 20 and 3y sales CAGR > 15&sort=ROCE desc&limit=50 screens
+    every stored ticker in memory. ``rank=`` combines several keys into a
+    percentile score, ``columns=`` adds expressions to each result and
+    ``view=consolidated`` screens the consolidated statements.
+    See ``financials.screening`` for the expression syntax.
+    """
+    def get(self, request):
+        sort = parse_sort_keys(request.query_params.get('sort'))
+        rank = parse_sort_keys(request.query_params.get('rank'))
+        if sort and rank:
+            return Response({"error": "Use either 'sort' or 'rank'"}, status=status.HTTP_400_BAD_REQUEST)
+        view = request.query_params.get('view', STANDALONE)
+        if view not in VIEWS:
+            return Response({"error": f"'view' must be one of: {', '.join(VIEWS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= settings.FINANCIALS_SCREEN_MAX_RESULTS:
+            return Response({"error": f"'limit' must be between 1 and {settings.FINANCIALS_SCREEN_MAX_RESULTS}"}, status=status.HTTP_400_BAD_REQUEST)
+        columns = [c.strip() for c in request.query_params.get('columns', '').split(',') if c.strip()]
+
+        try:
+            result = screening.screen(
+                where=request.query_params.get('q', '').strip() or None,
+                sort=sort, rank=rank, columns=columns, limit=limit, view=view,
+                max_age=settings.FINANCIALS_SCREEN_REFRESH_INTERVAL,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
+
+class BrowserPoolStatsView(APIView):
+    def get(self, request):
+        return Response(pool_stats(), status=status.HTTP_200_OK)
+
+class ScrapeJobListView(APIView):
+    """
+    POST {"ticker": "TCS"} or {"tickers": [...]} to queue background scrapes
+    and get job ids back immediately. "priority" is "interactive" (the default
+    for a single ticker) or "batch" (the default for a list); interactive jobs
+    run first.
+    """
+    def post(self, request):
+        ticker = request.data.get('ticker')
+        tickers = request.data.get('tickers')
+        if ticker is not None:
+            tickers = [ticker]
+        if not isinstance(tickers, list) or not tickers or not all(isinstance(t, str) and t.strip() for t in tickers):
+            return Response({"error": "Provide a 'ticker' or a non-empty list of 'tickers'"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(tickers) > settings.FINANCIALS_BATCH_MAX_TICKERS:
+            return Response({"error": f"At most {settings.FINANCIALS_BATCH_MAX_TICKERS} tickers per request"}, status=status.HTTP_400_BAD_REQUEST)
+        priority = request.data.get('priority', 'interactive' if ticker is not None else 'batch')
+        if priority not in jobs.PRIORITIES:
+            return Response({"error": f"'priority' must be one of: {', '.join(jobs.PRIORITIES)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        jobs.get_pool()
+        queued = jobs.submit_many([t.strip() for t in tickers], jobs.PRIORITIES[priority])
+        if ticker is not None:
+            return job_accepted(request, queued[0])
+        return Response({"jobs": [job_record(request, job) for job in queued]}, status=status.HTTP_202_ACCEPTED)
+
+class ScrapeJobDetailView(APIView):
+    """
+    GET a job's status. ``?wait=<seconds>`` long-polls until the job finishes
+    (capped at SCRAPE_JOBS_MAX_WAIT).
+    """
+    def get(self, request, job_id):
+        try:
+            wait = float(request.query_params.get('wait', 0))
+        except ValueError:
+            wait = math.nan
+        # NaN would slip through min/max and make the long-poll spin forever.
+        if not math.isfinite(wait):
+            return Response({"error": "'wait' must be a number of seconds"}, status=status.HTTP_400_BAD_REQUEST)
+        wait = min(wait, settings.SCRAPE_JOBS_MAX_WAIT)
+        jobs.get_pool()
+        job = jobs.wait(job_id, max(wait, 0))
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job_record(request, job), status=status.HTTP_200_OK)
+
+class ScrapeJobMetricsView(APIView):
+    def get(self, request):
+        jobs.get_pool()
+        return Response(jobs.metrics(), status=status.HTTP_200_OK)
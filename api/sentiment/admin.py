@@ -1,3 +1,30 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ArticleMatch, NewsArticle, NewsQuery, SentimentBucket
+
+
+@admin.register(NewsArticle)
+class NewsArticleAdmin(admin.ModelAdmin):
+    list_display = ("title", "source_name", "published_at", "sentiment")
+    list_filter = ("sentiment",)
+    search_fields = ("title", "url")
+
+
+@admin.register(ArticleMatch)
+class ArticleMatchAdmin(admin.ModelAdmin):
+    list_display = ("ticker", "query", "published_at")
+    search_fields = ("ticker", "query")
+    raw_id_fields = ("article",)
+
+
+@admin.register(NewsQuery)
+class NewsQueryAdmin(admin.ModelAdmin):
+    list_display = ("query", "ticker", "covered_from", "latest_published_at", "fetched_at")
+    search_fields = ("query", "ticker")
+
+
+@admin.register(SentimentBucket)
+class SentimentBucketAdmin(admin.ModelAdmin):
+    list_display = ("ticker", "granularity", "start", "positive", "negative", "neutral")
+    list_filter = ("granularity",)
+    search_fields = ("ticker",)
@@ -0,0 +1,52 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Shared worker pool capping concurrent NewsAPI fetches across batch requests."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SENTIMENT_BATCH_CONCURRENCY,
+                thread_name_prefix="sentiment-batch",
+            )
+        return _executor
+
+
+def summarize_one(analyzer, item, days_back, max_articles):
+    """Analyze one ticker/company and return its NDJSON record."""
+    ticker_or_company = item["ticker_or_company"]
+    try:
+        result = analyzer.analyze_sentiment(ticker_or_company, item.get("company_name"), days_back, max_articles,
+                                            include_articles=False)
+    except Exception as e:
+        logger.warning("Batch sentiment failed for %s: %s", ticker_or_company, e)
+        return {"ticker_or_company": ticker_or_company, "status": "error", "error": str(e)}
+    return {
+        "ticker_or_company": ticker_or_company,
+        "status": "ok",
+        "query_info": result["query_info"],
+        "sentiment_summary": result["sentiment_summary"],
+    }
+
+
+def iter_batch(analyzer, items, days_back, max_articles):
+    """Yield one NDJSON line per item, in completion order."""
+    executor = get_executor()
+    futures = [executor.submit(summarize_one, analyzer, item, days_back, max_articles) for item in items]
+    try:
+        for future in as_completed(futures):
+            yield json.dumps(future.result()) + "\n"
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Transient request errors worth another attempt; other request errors
+# (too many redirects, invalid URL) fail the call at once.
+RETRY_ERRORS = (
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+
+
+class CircuitOpen(requests.exceptions.RequestException):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Trip after ``failure_threshold`` consecutive failures and reject calls for
+    ``reset_timeout`` seconds; then let one trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_progress:
+                return False
+            self._trial_in_progress = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class NewsAPIClient:
+    """
+    Keep-alive HTTP client for NewsAPI with timeouts, bounded retries and a
+    circuit breaker.
+
+    429 and 5xx responses, timeouts, connection errors and truncated or
+    undecodable bodies are retried up to ``max_retries`` times with
+    full-jitter exponential backoff (honouring ``Retry-After`` up to
+    ``backoff_max``). Any other request error fails at once; either way the
+    failure is recorded with the breaker. Other 4xx responses are returned
+    to the caller unchanged and do not count against the breaker.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10.0, max_retries=2,
+                 backoff_base=0.5, backoff_max=8.0, pool_size=10, breaker=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get(self, url, params):
+        if not self.breaker.allow():
+            raise CircuitOpen(f"Circuit open for {url}; upstream recently failing")
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except RETRY_ERRORS as e:
+                error = e
+            except requests.exceptions.RequestException:
+                # Recorded so a failed half-open trial reopens the breaker
+                # instead of leaving it waiting on the trial forever.
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                error = requests.exceptions.HTTPError(
+                    f"{response.status_code} Server Error for url: {response.url}", response=response
+                )
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt, response)
+                logger.info("NewsAPI request failed (%s); retrying in %.2fs", error, delay)
+                time.sleep(delay)
+
+        self.breaker.record_failure()
+        raise error
+
+
+class AsyncNewsAPIClient:
+    """
+    Non-blocking counterpart of NewsAPIClient built on ``httpx.AsyncClient``.
+
+    Applies the same timeouts, retry policy and (shared) circuit breaker, and
+    returns the ``httpx.Response`` of the final attempt. Any ``httpx`` error
+    counts as a failure; failures are raised as ``requests`` exceptions so
+    callers handle both clients the same way.
+    """
+
+    def __init__(self, sync_client):
+        self.sync_client = sync_client
+        self.breaker = sync_client.breaker
+        connect, read = sync_client.timeout
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_keepalive_connections=settings.NEWS_API_POOL_SIZE,
+                                max_connections=settings.NEWS_API_ASYNC_MAX_CONNECTIONS),
+        )
+
+    async def get(self, url, params):
+        if not self.breaker.allow():
+            raise CircuitOpen(f"Circuit open for {url}; upstream recently failing")
+
+        retries = self.sync_client.max_retries
+        for attempt in range(retries + 1):
+            response = None
+            try:
+                response = await self.client.get(url, params=params)
+            except httpx.TimeoutException as e:
+                error = requests.exceptions.Timeout(str(e))
+            except httpx.TransportError as e:
+                error = requests.exceptions.ConnectionError(str(e))
+            except httpx.HTTPError as e:
+                # Undecodable bodies, too many redirects and the like
+                error = requests.exceptions.RequestException(str(e))
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                error = requests.exceptions.HTTPError(f"{response.status_code} Server Error for url: {response.url}")
+                error.response = response
+            if attempt < retries:
+                delay = self.sync_client._backoff(attempt, response)
+                logger.info("NewsAPI request failed (%s); retrying in %.2fs", error, delay)
+                await asyncio.sleep(delay)
+
+        self.breaker.record_failure()
+        raise error
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+async def _close_at_shutdown(client):
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+def _close_with_loop(client):
+    """
+    Close ``client`` when its event loop shuts down. Loops run by
+    ``asyncio.run`` (uvicorn, asgiref's per-request loops) finalize pending
+    async generators on shutdown, so one parked at its ``yield`` runs the
+    ``finally`` above. Returns the generator, which must be kept referenced.
+    """
+    closer = _close_at_shutdown(client)
+    try:
+        # Runs up to the yield without awaiting, registering with the running loop.
+        closer.asend(None).send(None)
+    except StopIteration:
+        pass
+    return closer
+
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """Return the process-wide NewsAPI client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = NewsAPIClient(
+                connect_timeout=settings.NEWS_API_CONNECT_TIMEOUT,
+                read_timeout=settings.NEWS_API_READ_TIMEOUT,
+                max_retries=settings.NEWS_API_MAX_RETRIES,
+                backoff_base=settings.NEWS_API_BACKOFF_BASE,
+                backoff_max=settings.NEWS_API_BACKOFF_MAX,
+                pool_size=settings.NEWS_API_POOL_SIZE,
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.NEWS_API_BREAKER_THRESHOLD,
+                    reset_timeout=settings.NEWS_API_BREAKER_RESET,
+                ),
+            )
+        return _client
+
+
+def get_async_client():
+    """
+    Return the NewsAPI async client bound to the running event loop; it is
+    closed when that loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncNewsAPIClient(get_client())
+        client._closer = _close_with_loop(client)
+    return client
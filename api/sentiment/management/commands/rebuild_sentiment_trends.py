@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from sentiment.trends import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the hourly and daily sentiment trend buckets from the stored articles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ticker", help="Only rebuild this ticker.")
+
+    def handle(self, *args, **options):
+        ticker = options["ticker"].strip().upper() if options["ticker"] else None
+        counted = rebuild(ticker)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt trend buckets from {counted} ticker articles."))
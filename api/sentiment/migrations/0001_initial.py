@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=2000, unique=True)),
+                ('title', models.TextField(blank=True)),
+                ('description', models.TextField(blank=True)),
+                ('content', models.TextField(blank=True)),
+                ('author', models.CharField(blank=True, max_length=255)),
+                ('source_id', models.CharField(blank=True, max_length=255)),
+                ('source_name', models.CharField(blank=True, max_length=255)),
+                ('image_url', models.TextField(blank=True)),
+                ('published_at', models.DateTimeField()),
+                ('sentiment', models.CharField(max_length=8)),
+                ('fetched_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NewsQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255, unique=True)),
+                ('ticker', models.CharField(max_length=128)),
+                ('covered_from', models.DateTimeField()),
+                ('latest_published_at', models.DateTimeField(blank=True, null=True)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArticleMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255)),
+                ('ticker', models.CharField(max_length=128)),
+                ('published_at', models.DateTimeField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='sentiment.newsarticle')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ticker', 'published_at'], name='article_match_ticker_time'), models.Index(fields=['query', 'published_at'], name='article_match_query_time')],
+                'constraints': [models.UniqueConstraint(fields=('query', 'article'), name='unique_query_article')],
+            },
+        ),
+    ]
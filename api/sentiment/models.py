@@ -1,3 +1,100 @@
 from django.db import models
 
-# Create your models here.
+
+class NewsArticle(models.Model):
+    """A NewsAPI article with its sentiment, stored once per URL."""
+
+    url = models.CharField(max_length=2000, unique=True)
+    title = models.TextField(blank=True)
+    description = models.TextField(blank=True)
+    content = models.TextField(blank=True)
+    author = models.CharField(max_length=255, blank=True)
+    source_id = models.CharField(max_length=255, blank=True)
+    source_name = models.CharField(max_length=255, blank=True)
+    image_url = models.TextField(blank=True)
+    published_at = models.DateTimeField()
+    sentiment = models.CharField(max_length=8)
+    fetched_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.url
+
+    def as_article(self):
+        """The article in NewsAPI's shape, plus its stored ``sentiment``."""
+        return {
+            "source": {"id": self.source_id or None, "name": self.source_name},
+            "author": self.author or None,
+            "title": self.title,
+            "description": self.description,
+            "url": self.url,
+            "urlToImage": self.image_url or None,
+            "publishedAt": self.published_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "content": self.content or None,
+            "sentiment": self.sentiment,
+        }
+
+
+class ArticleMatch(models.Model):
+    """An article returned for a NewsAPI query, with the ticker the query was for."""
+
+    article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name="matches")
+    query = models.CharField(max_length=255)
+    ticker = models.CharField(max_length=128)
+    # Copied from the article so window reads stay on one index.
+    published_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["query", "article"], name="unique_query_article"),
+        ]
+        indexes = [
+            models.Index(fields=["ticker", "published_at"], name="article_match_ticker_time"),
+            models.Index(fields=["query", "published_at"], name="article_match_query_time"),
+        ]
+
+    def __str__(self):
+        return f"{self.ticker} {self.article_id}"
+
+
+class NewsQuery(models.Model):
+    """How much of a query's history is stored: every article since ``covered_from``."""
+
+    query = models.CharField(max_length=255, unique=True)
+    ticker = models.CharField(max_length=128)
+    covered_from = models.DateTimeField()
+    latest_published_at = models.DateTimeField(null=True, blank=True)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.query
+
+
+class SentimentBucket(models.Model):
+    """Sentiment counts of one ticker's articles published in one hour or day (UTC)."""
+
+    HOUR = "hour"
+    DAY = "day"
+    GRANULARITY_CHOICES = [(HOUR, HOUR), (DAY, DAY)]
+
+    ticker = models.CharField(max_length=128)
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    start = models.DateTimeField()
+    positive = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ticker", "granularity", "start"], name="unique_sentiment_bucket"),
+        ]
+
+    def __str__(self):
+        return f"{self.ticker} {self.granularity} {self.start:%Y-%m-%d %H:%M}"
+
+    @property
+    def total(self):
+        return self.positive + self.negative + self.neutral
+
+    @property
+    def net(self):
+        return self.positive - self.negative
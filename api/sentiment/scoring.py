@@ -0,0 +1,137 @@
+import string
+from typing import Dict, Iterable, List, Optional
+
+# Term weights; a weight of 1.0 is an ordinary signal word.
+POSITIVE_TERMS = {
+    'good': 1.0, 'great': 1.0, 'excellent': 1.5, 'positive': 1.0, 'up': 0.5, 'gain': 1.0,
+    'profit': 1.0, 'growth': 1.0, 'bullish': 1.5, 'surge': 1.5, 'rally': 1.5, 'boom': 1.5,
+    'strong': 1.0, 'beat': 1.0, 'outperform': 1.5, 'upgrade': 1.5, 'buy': 1.0, 'success': 1.0,
+    'record': 1.0, 'high': 0.5, 'rise': 1.0, 'increase': 1.0, 'breakthrough': 1.5,
+    'innovation': 1.0, 'expansion': 1.0, 'revenue': 0.5, 'earnings': 0.5, 'win': 1.0,
+}
+
+NEGATIVE_TERMS = {
+    'bad': 1.0, 'poor': 1.0, 'terrible': 1.5, 'negative': 1.0, 'down': 0.5, 'loss': 1.0,
+    'decline': 1.0, 'drop': 1.0, 'bearish': 1.5, 'crash': 2.0, 'fall': 1.0, 'weak': 1.0,
+    'miss': 1.0, 'underperform': 1.5, 'downgrade': 1.5, 'sell': 1.0, 'failure': 1.0, 'low': 0.5,
+    'decrease': 1.0, 'concern': 1.0, 'risk': 0.5, 'warning': 1.0, 'lawsuit': 1.5,
+    'investigation': 1.5, 'scandal': 2.0, 'debt': 0.5, 'bankruptcy': 2.0, 'cut': 1.0,
+    'ease': 0.5,
+}
+
+# Contractions are split at the apostrophe, so "didn't" is matched as "didn".
+# ("won't" and "can't" are left out because "won" and "can" are ordinary words.)
+NEGATORS = (
+    'not', 'no', 'never', 'without', 'hardly', 'isn', 'aren', 'wasn', 'weren', 'don',
+    'doesn', 'didn', 'couldn', 'wouldn', 'shouldn', 'hasn', 'haven', 'hadn',
+)
+
+_VOWELS = frozenset("aeiou")
+# Only these adjectives take "-er"/"-est", so "buy" does not match "buyer".
+_COMPARABLE = frozenset(("strong", "weak", "high", "low", "great", "poor"))
+# Irregular forms the rules in ``inflections`` do not produce.
+_IRREGULAR = {"rise": ("rose", "risen"), "fall": ("fell", "fallen")}
+# Maps punctuation, including curly quotes, to spaces.
+_PUNCTUATION = str.maketrans({c: " " for c in string.punctuation + "\u2018\u2019\u201c\u201d"})
+_NEGATOR = None
+
+
+def inflections(term: str) -> set:
+    """
+    ``term`` and the inflected forms scored with its weight: plurals and third
+    person ("gains", "losses", "rallies"), past and present participles with
+    silent-e and doubled-consonant stems ("surged", "rising", "dropping") and,
+    for the adjectives in ``_COMPARABLE``, comparatives ("stronger").
+    """
+    forms = {term}
+    if term.endswith(("s", "sh", "ch", "x", "z")):
+        forms.add(term + "es")
+    elif term.endswith("y") and term[-2:-1] not in _VOWELS:
+        forms.update((term[:-1] + "ies", term[:-1] + "ied"))
+    else:
+        forms.add(term + "s")
+
+    if term.endswith("e") and not term.endswith("ee"):
+        forms.update((term + "d", term[:-1] + "ing"))
+    else:
+        stem = term
+        # One-syllable consonant-vowel-consonant words double their last letter.
+        vowel_groups = sum(1 for i, c in enumerate(term) if c in _VOWELS and (i == 0 or term[i - 1] not in _VOWELS))
+        if (len(term) >= 3 and vowel_groups == 1 and term[-1] not in _VOWELS and term[-1] not in "wxy"
+                and term[-2] in _VOWELS and term[-3] not in _VOWELS):
+            stem = term + term[-1]
+        if not term.endswith("y") or term[-2:-1] in _VOWELS:
+            forms.add(stem + "ed")
+        forms.add(stem + "ing")
+
+    if term in _COMPARABLE:
+        forms.update((term + "er", term + "est"))
+    forms.update(_IRREGULAR.get(term, ()))
+    return forms
+
+
+class SentimentScorer:
+    """
+    Keyword sentiment scorer built once and applied in a single pass per text.
+
+    The text is split into words in one pass and each word is looked up in a
+    prebuilt table of terms and their inflections, so "up" no longer
+    matches "update" and "cut" no longer matches "execute". A negator such as
+    "not" or "didn't" flips the sign of terms up to ``negation_window`` words
+    after it ("not strong" counts as negative).
+    """
+
+    def __init__(self, positive: Optional[Dict[str, float]] = None,
+                 negative: Optional[Dict[str, float]] = None,
+                 negators: Iterable[str] = NEGATORS, negation_window: int = 3):
+        positive = POSITIVE_TERMS if positive is None else positive
+        negative = NEGATIVE_TERMS if negative is None else negative
+        weights = dict(positive)
+        weights.update({term: -weight for term, weight in negative.items()})
+        self.negation_window = negation_window
+
+        self._lookup = {}
+        for term, weight in weights.items():
+            for form in inflections(term):
+                self._lookup.setdefault(form, weight)
+        # A term always keeps its own weight even if it is an inflection of another.
+        self._lookup.update(weights)
+        for negator in negators:
+            self._lookup[negator] = _NEGATOR
+
+    def _hits(self, text: str):
+        lookup = self._lookup
+        words = text.lower().translate(_PUNCTUATION).split()
+        return [(i, lookup[word]) for i, word in enumerate(words) if word in lookup]
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Return the weighted positive and negative totals for ``text``."""
+        positive = negative = 0.0
+        negated_until = -1
+        for i, weight in self._hits(text):
+            if weight is _NEGATOR:
+                negated_until = i + self.negation_window
+                continue
+            if i <= negated_until:
+                weight = -weight
+            if weight > 0:
+                positive += weight
+            else:
+                negative -= weight
+        return {"positive": positive, "negative": negative}
+
+    def label(self, text: str) -> str:
+        scores = self.scores(text)
+        if scores["positive"] > scores["negative"]:
+            return "positive"
+        elif scores["negative"] > scores["positive"]:
+            return "negative"
+        return "neutral"
+
+    def label_many(self, texts: Iterable[str]) -> List[str]:
+        """Label a batch of texts."""
+        label = self.label
+        return [label(text) for text in texts]
+
+
+default_scorer = SentimentScorer()
@@ -0,0 +1,125 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import trends
+from .models import ArticleMatch, NewsArticle, NewsQuery
+from .scoring import default_scorer
+
+
+def article_text(article):
+    """The text an article's sentiment is scored on."""
+    return f"{article.get('title', '')}. {article.get('description', '')}"
+
+
+def parse_published(value):
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+
+
+def window_start(from_date):
+    """Start of the window NewsAPI is asked for with ``from=YYYY-MM-DD`` (midnight UTC)."""
+    return datetime.strptime(from_date, "%Y-%m-%d").replace(tzinfo=dt_timezone.utc)
+
+
+def delta_since(query, start, limit):
+    """
+    Publish time to fetch ``query`` from when the stored articles already
+    answer a request for the newest ``limit`` articles since ``start``, or
+    None when the window has to be fetched in full.
+    """
+    state = NewsQuery.objects.filter(query=query).first()
+    if state is None or state.latest_published_at is None:
+        return None
+    if state.covered_from > start:
+        # Older articles were never fetched; fine only if the newest `limit` are all newer.
+        covered = ArticleMatch.objects.filter(query=query, published_at__gte=state.covered_from)
+        if covered.count() < limit:
+            return None
+    return state.latest_published_at
+
+
+def save_articles(query, ticker, articles, start, limit, since=None, scorer=None):
+    """
+    Store the articles NewsAPI returned for ``query`` and advance its coverage.
+
+    ``start`` is the ``from`` the request was made with (``since`` for delta
+    fetches). Articles already stored are not scored again, and articles new
+    to ``ticker`` are added to its trend buckets exactly once, also when
+    several fetches for the ticker store the same articles concurrently. A response with ``limit``
+    articles may have been cut short, so only its oldest article is taken as
+    covered.
+    """
+    scorer = scorer or default_scorer
+    fetched = {}
+    for article in articles:
+        published = parse_published(article.get("publishedAt"))
+        if article.get("url") and published and (article.get("title") or article.get("description")):
+            fetched[article["url"]] = (article, published)
+
+    now = timezone.now()
+    with transaction.atomic():
+        known = set(NewsArticle.objects.filter(url__in=list(fetched)).values_list("url", flat=True))
+        new = [(url, article, published) for url, (article, published) in fetched.items() if url not in known]
+        sentiments = scorer.label_many([article_text(article) for _, article, _ in new])
+        NewsArticle.objects.bulk_create([
+            NewsArticle(
+                url=url,
+                title=article.get("title") or "",
+                description=article.get("description") or "",
+                content=article.get("content") or "",
+                author=(article.get("author") or "")[:255],
+                source_id=(article.get("source") or {}).get("id") or "",
+                source_name=(article.get("source") or {}).get("name") or "",
+                image_url=article.get("urlToImage") or "",
+                published_at=published,
+                sentiment=sentiment,
+            )
+            for (url, article, published), sentiment in zip(new, sentiments)
+        ], ignore_conflicts=True)
+        stored = {url: (pk, sentiment) for url, pk, sentiment
+                  in NewsArticle.objects.filter(url__in=list(fetched)).values_list("url", "pk", "sentiment")}
+        pks = sorted(pk for pk, _ in stored.values())
+        # Concurrent saves of the same articles must not both count them into
+        # the trend buckets. On SQLite this transaction already holds the
+        # database write lock (transaction_mode IMMEDIATE), so saves run one
+        # at a time; on databases with row locks, locking the articles (in pk
+        # order, so saves cannot deadlock) before reading their matches makes
+        # a concurrent save wait here and then see this one's matches.
+        list(NewsArticle.objects.select_for_update().filter(pk__in=pks).order_by("pk").values_list("pk", flat=True))
+        # The same article can come back for several queries of one ticker.
+        matched = set(ArticleMatch.objects.select_for_update()
+                      .filter(ticker=ticker, article_id__in=pks)
+                      .values_list("article_id", flat=True))
+        ArticleMatch.objects.bulk_create([
+            ArticleMatch(article_id=stored[url][0], query=query, ticker=ticker, published_at=published)
+            for url, (_, published) in fetched.items()
+        ], ignore_conflicts=True)
+        trends.record(ticker, [(published, stored[url][1]) for url, (_, published) in fetched.items()
+                               if stored[url][0] not in matched])
+
+        times = [published for _, published in fetched.values()]
+        truncated = bool(times) and len(articles) >= limit
+        state, _ = NewsQuery.objects.select_for_update().get_or_create(
+            query=query, defaults={"ticker": ticker, "covered_from": start, "fetched_at": now})
+        if since is None:
+            state.covered_from = min(times) if truncated else start
+        elif truncated:
+            # Articles between the previous latest and this batch may be missing.
+            state.covered_from = min(times)
+        if times:
+            state.latest_published_at = max(filter(None, [state.latest_published_at, max(times)]))
+        state.fetched_at = now
+        state.save()
+
+
+def read_articles(query, start, limit):
+    """The newest ``limit`` stored articles for ``query`` published since ``start``."""
+    matches = (ArticleMatch.objects
+               .filter(query=query, published_at__gte=start)
+               .select_related("article")
+               .order_by("-published_at")[:limit])
+    return [match.article.as_article() for match in matches]
@@ -1,3 +1,369 @@
-from django.test import TestCase
+import base64
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from benchmarks import standins
+from . import client, store, trends, views
+from .client import CircuitBreaker, CircuitOpen, NewsAPIClient
+from .models import SentimentBucket
+from .scoring import SentimentScorer, default_scorer
+
+
+class NewsAPIStandInMixin:
+    """Runs the NewsAPI stand-in for the test class; queue error responses on ``self.faults``."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.faults = deque()
+        cls.server = standins.start_newsapi(faults=cls.faults)
+        cls.url = standins.base_url(cls.server, "/v2/everything")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.faults.clear()
+
+    def make_client(self, max_retries=0, threshold=2, reset=0.2):
+        return NewsAPIClient(max_retries=max_retries, backoff_base=0, backoff_max=2.0,
+                             breaker=CircuitBreaker(failure_threshold=threshold, reset_timeout=reset))
+
+
+class NewsAPIClientTests(NewsAPIStandInMixin, SimpleTestCase):
+    def test_429_is_retried_after_retry_after(self):
+        api = self.make_client(max_retries=2)
+        self.faults.append((429, {"Retry-After": "1"}))
+        with mock.patch("sentiment.client.time.sleep") as sleep:
+            response = api.get(self.url, {"q": "TCS"})
+        self.assertEqual(response.status_code, 200)
+        sleep.assert_called_once_with(1.0)
+        self.assertFalse(self.faults)
+        self.assertEqual(api.breaker.state, "closed")
+
+    def test_other_4xx_is_returned_without_retry(self):
+        api = self.make_client(max_retries=2)
+        self.faults.extend([(401, {}), (401, {})])
+        self.assertEqual(api.get(self.url, {"q": "TCS"}).status_code, 401)
+        self.assertEqual(len(self.faults), 1)
+
+    def test_breaker_opens_after_threshold_failures(self):
+        api = self.make_client(threshold=2)
+        self.faults.extend([(503, {}), (503, {}), (503, {})])
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                api.get(self.url, {"q": "TCS"})
+        self.assertEqual(api.breaker.state, "open")
+        with self.assertRaises(CircuitOpen):
+            api.get(self.url, {"q": "TCS"})
+        # Rejected without calling upstream
+        self.assertEqual(len(self.faults), 1)
+
+    def test_breaker_closes_after_cooldown(self):
+        api = self.make_client(threshold=1, reset=0.2)
+        self.faults.append((503, {}))
+        with self.assertRaises(requests.exceptions.HTTPError):
+            api.get(self.url, {"q": "TCS"})
+        self.assertEqual(api.breaker.state, "open")
+        time.sleep(0.25)
+        self.assertEqual(api.breaker.state, "half-open")
+        self.assertEqual(api.get(self.url, {"q": "TCS"}).status_code, 200)
+        self.assertEqual(api.breaker.state, "closed")
+
+
+    def test_non_retryable_error_during_trial_reopens_breaker(self):
+        api = self.make_client(max_retries=2, threshold=1, reset=0.2)
+        self.faults.extend([(503, {})] * 3)
+        with mock.patch("sentiment.client.time.sleep"), self.assertRaises(requests.exceptions.HTTPError):
+            api.get(self.url, {"q": "TCS"})
+        time.sleep(0.25)
+        # The half-open trial is redirected until requests gives up
+        redirect = (302, {"Location": f"{self.url}?q=TCS"})
+        self.faults.extend([redirect] * (api.session.max_redirects + 1))
+        with self.assertRaises(requests.exceptions.TooManyRedirects):
+            api.get(self.url, {"q": "TCS"})
+        self.assertEqual(api.breaker.state, "open")
+        self.assertFalse(self.faults)
+
+        time.sleep(0.25)
+        self.assertEqual(api.get(self.url, {"q": "TCS"}).status_code, 200)
+        self.assertEqual(api.breaker.state, "closed")
+
+
+class NewsFallbackTests(NewsAPIStandInMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for cache in (views.news_cache, views.last_good_news):
+            cache.clear()
+        self.api = self.make_client(threshold=1, reset=60)
+        patcher = mock.patch.object(client, "_client", self.api)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        settings_override = override_settings(NEWS_API_BASE_URL=self.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.analyzer = views.NewsSentimentAnalyzer(api_key="test")
+
+    def test_open_breaker_serves_last_good_news(self):
+        articles = self.analyzer._fetch_news("TCS")
+        self.assertTrue(articles)
+
+        views.news_cache.clear()
+        self.faults.append((503, {}))
+        self.assertEqual(self.analyzer._fetch_news("TCS"), articles)
+        self.assertEqual(self.api.breaker.state, "open")
+
+        views.news_cache.clear()
+        self.assertEqual(self.analyzer._fetch_news("TCS"), articles)
+
+    def test_no_fallback_raises(self):
+        self.faults.append((503, {}))
+        with self.assertRaisesMessage(Exception, "Error fetching news"):
+            self.analyzer._fetch_news("INFY")
+
+
+class AnalyzeSentimentViewTests(NewsAPIStandInMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for cache in (views.news_cache, views.last_good_news, views.article_sentiment_cache):
+            cache.clear()
+        for patcher in (mock.patch.object(client, "_client", self.make_client()),
+                        mock.patch.dict(os.environ, {"NEWS_API_KEY": "test"})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        settings_override = override_settings(NEWS_API_BASE_URL=self.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.params = {"ticker_or_company": "TCS", "days_back": "30", "max_articles": "100"}
+
+    def get(self, headers=None, **params):
+        return self.client.get(reverse("analyze_sentiment"), {**self.params, **params}, headers=headers)
+
+    def test_matching_if_none_match_returns_304(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        with mock.patch.object(views.NewsSentimentAnalyzer, "_build_result") as build:
+            cached = self.get(headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+        self.assertEqual(cached.content, b"")
+        build.assert_not_called()
+
+        self.assertEqual(self.get(headers={"If-None-Match": 'W/"other"'}).status_code, 200)
+        # Other options make another response
+        self.assertEqual(self.get(headers={"If-None-Match": etag}, summary="true").status_code, 200)
+
+    def test_etag_of_compressed_response_matches(self):
+        compressed = self.get(headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        etag = compressed["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+        # Weak comparison: either form of the tag revalidates
+        for candidate in (etag, etag.removeprefix("W/"), f'"other", {etag}'):
+            with self.subTest(candidate=candidate):
+                response = self.get(headers={"If-None-Match": candidate, "Accept-Encoding": "gzip"})
+                self.assertEqual(response.status_code, 304)
+
+    def test_cursor_pages_through_every_article_once(self):
+        expected = [article["url"] for article in self.get().json()["articles"]]
+        self.assertEqual(len(expected), len(standins.NEWSAPI_FIXTURE["articles"]))
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            body = self.get(page_size="7", **({"cursor": cursor} if cursor else {})).json()
+            self.assertLessEqual(len(body["articles"]), 7)
+            seen += [(a["published_date_raw"], a["url"]) for a in body["articles"]]
+            pages += 1
+            cursor = body["pagination"]["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(pages, 8)
+        self.assertEqual(sorted(url for _, url in seen), sorted(expected))
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_invalid_cursor_is_rejected(self):
+        def b64(value):
+            return base64.urlsafe_b64encode(value.encode()).decode()
+
+        for cursor in ("not a cursor!", b64("[1, 2]"), b64('["2025-03-10"]'), b64("{"), b64('"x"')):
+            with self.subTest(cursor=cursor):
+                with self.assertRaisesMessage(ValueError, "Invalid 'cursor'"):
+                    views.decode_cursor(cursor)
+                response = self.get(cursor=cursor)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Invalid 'cursor'"})
+        article = {"publishedAt": "2025-03-10T09:00:00Z", "url": "https://example.com/a"}
+        self.assertEqual(views.decode_cursor(views.encode_cursor(article)),
+                         ("2025-03-10T09:00:00Z", "https://example.com/a"))
+
+    def test_summary_skips_building_articles(self):
+        with mock.patch.object(views.NewsSentimentAnalyzer, "_process_article") as process:
+            body = self.get(summary="true").json()
+        process.assert_not_called()
+        self.assertEqual(set(body), set(views.SUMMARY_FIELDS))
+        self.assertEqual(body["sentiment_summary"]["total_articles"], len(standins.NEWSAPI_FIXTURE["articles"]))
+
+
+class SentimentScorerTests(SimpleTestCase):
+    LABELS = [
+        ("Margins are not strong this quarter", "negative"),
+        ("Shares didn't fall after the results", "positive"),
+        ("No growth expected as orders drop", "negative"),
+        ("Not much else happened; a strong quarter overall", "positive"),
+        ("Company ships a software update", "neutral"),
+        ("Board to execute the merger plan", "neutral"),
+        ("Executives cut guidance", "negative"),
+        ("Profit surged on record revenue", "positive"),
+        ("Stronger demand lifts earnings", "positive"),
+        ("Lawsuits pile up", "negative"),
+        ("Shares rising after the announcement", "positive"),
+        ("Surging orders for the new model", "positive"),
+        ("Declining margins at the unit", "negative"),
+        ("Stock easing in late trade", "negative"),
+        ("Orders dropped in March", "negative"),
+        ("Markets rallied", "positive"),
+        ("Buyer found for the plant", "neutral"),
+        ("Sellers return to the table", "neutral"),
+        ("", "neutral"),
+    ]
+
+    def test_labels(self):
+        for text, expected in self.LABELS:
+            with self.subTest(text=text):
+                self.assertEqual(default_scorer.label(text), expected)
+
+    def test_label_many_matches_label(self):
+        texts = [text for text, _ in self.LABELS]
+        self.assertEqual(default_scorer.label_many(texts), [label for _, label in self.LABELS])
+
+    def test_substrings_do_not_match(self):
+        for text in ("update", "execute", "uptick", "downtown", "lowercase", "buyer", "sellers", "winner"):
+            with self.subTest(text=text):
+                self.assertEqual(default_scorer.scores(text), {"positive": 0.0, "negative": 0.0})
+
+    def test_negation_window(self):
+        scorer = SentimentScorer(negation_window=1)
+        self.assertEqual(scorer.label("not strong"), "negative")
+        self.assertEqual(scorer.label("not very very strong"), "positive")
+
+
+class SaveArticlesTests(TestCase):
+    def bucket_totals(self):
+        buckets = SentimentBucket.objects.filter(ticker="TCS", granularity=SentimentBucket.DAY)
+        return sum(b.positive + b.negative + b.neutral for b in buckets)
+
+    def test_articles_counted_once_per_ticker(self):
+        articles = standins.NEWSAPI_FIXTURE["articles"]
+        start = store.window_start("2000-01-01")
+        store.save_articles("TCS", "TCS", articles, start, 100)
+        counted = self.bucket_totals()
+        self.assertGreater(counted, 0)
+
+        # Same articles again, and for another query of the same ticker
+        store.save_articles("TCS", "TCS", articles, start, 100)
+        store.save_articles("Tata Consultancy", "TCS", articles, start, 100)
+        self.assertEqual(self.bucket_totals(), counted)
+        self.assertEqual(trends.rebuild("TCS"), counted)
+        self.assertEqual(self.bucket_totals(), counted)
+
+
+class TrendTests(TestCase):
+    NOW = datetime(2025, 3, 10, 15, 30, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        trends.record("TCS", [
+            (datetime(2025, 3, 9, 12, 0, tzinfo=dt_timezone.utc), "negative"),
+            (datetime(2025, 3, 10, 12, 5, tzinfo=dt_timezone.utc), "positive"),
+            (datetime(2025, 3, 10, 14, 10, tzinfo=dt_timezone.utc), "positive"),
+            (datetime(2025, 3, 10, 14, 50, tzinfo=dt_timezone.utc), "negative"),
+        ])
+
+    def points(self, window):
+        return {point["t"]: point for point in trends.trend("TCS", window, now=self.NOW)["points"]}
+
+    def test_windows(self):
+        cases = [
+            ("1D", "hour", 24, "2025-03-09T16:00:00+00:00", "2025-03-10T15:00:00+00:00", 3),
+            ("5D", "hour", 120, "2025-03-05T16:00:00+00:00", "2025-03-10T15:00:00+00:00", 4),
+            ("1M", "day", 30, "2025-02-09T00:00:00+00:00", "2025-03-10T00:00:00+00:00", 4),
+            ("3M", "day", 90, "2024-12-11T00:00:00+00:00", "2025-03-10T00:00:00+00:00", 4),
+        ]
+        for window, granularity, length, first, last, total in cases:
+            with self.subTest(window=window):
+                result = trends.trend("TCS", window, now=self.NOW)
+                self.assertEqual(result["granularity"], granularity)
+                self.assertEqual(len(result["points"]), length)
+                self.assertEqual((result["points"][0]["t"], result["points"][-1]["t"]), (first, last))
+                self.assertEqual(result["summary"]["total"], total)
+
+    def test_hourly_buckets_are_zero_filled(self):
+        points = self.points("1D")
+        self.assertEqual(
+            points["2025-03-10T14:00:00+00:00"],
+            {"t": "2025-03-10T14:00:00+00:00", "positive": 1, "negative": 1, "neutral": 0,
+             "total": 2, "net": 0, "score": 0.0, "moving_average": 0.3333},
+        )
+        gap = points["2025-03-10T13:00:00+00:00"]
+        self.assertEqual((gap["total"], gap["score"]), (0, None))
+        # The trailing average still covers the article at 12:00
+        self.assertEqual(gap["moving_average"], 1.0)
+        self.assertEqual(points["2025-03-10T15:00:00+00:00"]["moving_average"], 0.3333)
+
+    def test_moving_average_reaches_before_window(self):
+        points = trends.trend("TCS", "1D", now=self.NOW)["points"]
+        # 2025-03-09 12:00 is outside the points but inside the first 6-hour average
+        self.assertEqual((points[0]["score"], points[0]["moving_average"]), (None, -1.0))
+        self.assertIsNone(points[6]["moving_average"])
+
+    def test_daily_buckets(self):
+        points = self.points("1M")
+        today = points["2025-03-10T00:00:00+00:00"]
+        self.assertEqual((today["positive"], today["negative"], today["score"]), (2, 1, 0.3333))
+        self.assertEqual(points["2025-03-09T00:00:00+00:00"]["score"], -1.0)
+        self.assertEqual(today["moving_average"], 0.0)
+        self.assertEqual(points["2025-03-08T00:00:00+00:00"]["total"], 0)
+        self.assertIsNone(points["2025-03-08T00:00:00+00:00"]["moving_average"])
+
+
+class ConcurrentSaveArticlesTests(TransactionTestCase):
+    """Saves racing from several threads on the file-backed test database."""
+
+    def test_concurrent_saves_wait_and_count_once(self):
+        articles = standins.NEWSAPI_FIXTURE["articles"]
+        start = store.window_start("2000-01-01")
+        queries = ["TCS", "Tata Consultancy", "TCS share", "TCS results"]
+        barrier = threading.Barrier(len(queries))
+        errors = []
+
+        def save(query):
+            barrier.wait()
+            try:
+                store.save_articles(query, "TCS", articles, start, 100)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=save, args=(query,)) for query in queries]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        buckets = SentimentBucket.objects.filter(ticker="TCS", granularity=SentimentBucket.DAY)
+        self.assertEqual(sum(b.positive + b.negative + b.neutral for b in buckets), len(articles))
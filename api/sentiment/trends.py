@@ -0,0 +1,136 @@
+"""
+Per-ticker sentiment trend index.
+
+Every article newly matched to a ticker is added to that ticker's hourly and
+daily ``SentimentBucket`` rows as it is stored, so trend charts are read from
+a handful of precomputed rows instead of re-scoring or refetching news.
+Buckets are aligned to UTC hours and days.
+"""
+from collections import Counter, deque
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ArticleMatch, SentimentBucket
+
+HOUR = SentimentBucket.HOUR
+DAY = SentimentBucket.DAY
+STEPS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+# Window -> (span, bucket granularity, moving average length in buckets)
+WINDOWS = {
+    "1D": (timedelta(days=1), HOUR, 6),
+    "5D": (timedelta(days=5), HOUR, 24),
+    "1M": (timedelta(days=30), DAY, 7),
+    "3M": (timedelta(days=90), DAY, 7),
+}
+
+
+def bucket_start(t, granularity):
+    t = t.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return t.replace(hour=0) if granularity == DAY else t
+
+
+def record(ticker, scored):
+    """
+    Add ``(published_at, sentiment)`` pairs for articles newly matched to
+    ``ticker`` to its hourly and daily buckets. Each article must be recorded
+    once per ticker.
+    """
+    deltas = {}
+    for published, sentiment in scored:
+        for granularity in STEPS:
+            deltas.setdefault((granularity, bucket_start(published, granularity)), Counter())[sentiment] += 1
+    if not deltas:
+        return
+    SentimentBucket.objects.bulk_create(
+        [SentimentBucket(ticker=ticker, granularity=granularity, start=start) for granularity, start in deltas],
+        ignore_conflicts=True,
+    )
+    for (granularity, start), counts in deltas.items():
+        SentimentBucket.objects.filter(ticker=ticker, granularity=granularity, start=start).update(
+            **{label: F(label) + n for label, n in counts.items()})
+
+
+def rebuild(ticker=None):
+    """
+    Recompute buckets from the stored article matches, for one ticker or all.
+    Returns the number of (ticker, article) pairs counted.
+    """
+    matches = ArticleMatch.objects.all()
+    buckets = SentimentBucket.objects.all()
+    if ticker:
+        matches = matches.filter(ticker=ticker)
+        buckets = buckets.filter(ticker=ticker)
+    by_ticker = {}
+    pairs = matches.values_list("ticker", "article_id", "article__published_at", "article__sentiment").distinct()
+    for match_ticker, _, published, sentiment in pairs.iterator():
+        by_ticker.setdefault(match_ticker, []).append((published, sentiment))
+    with transaction.atomic():
+        buckets.delete()
+        for match_ticker, scored in by_ticker.items():
+            record(match_ticker, scored)
+    return sum(map(len, by_ticker.values()))
+
+
+def _ratio(net, total):
+    return round(net / total, 4) if total else None
+
+
+def trend(ticker, window="1M", now=None):
+    """
+    Sentiment trend for ``ticker`` over ``window`` (``1D``, ``5D``, ``1M`` or
+    ``3M``): one point per bucket, oldest first and zero-filled, with the
+    bucket's counts, its net score ``(positive - negative) / total`` and a
+    trailing moving average of that score weighted by article count.
+    """
+    span, granularity, ma_length = WINDOWS[window]
+    step = STEPS[granularity]
+    end = bucket_start(now or timezone.now(), granularity)
+    first = end - span + step
+    lead = first - step * (ma_length - 1)
+    rows = {
+        bucket.start: bucket
+        for bucket in SentimentBucket.objects.filter(
+            ticker=ticker, granularity=granularity, start__gte=lead, start__lte=end)
+    }
+
+    points = []
+    recent = deque(maxlen=ma_length)
+    totals = Counter()
+    t = lead
+    while t <= end:
+        bucket = rows.get(t)
+        counts = {label: getattr(bucket, label, 0) for label in ("positive", "negative", "neutral")}
+        total = sum(counts.values())
+        net = counts["positive"] - counts["negative"]
+        recent.append((net, total))
+        if t >= first:
+            totals.update(counts)
+            points.append({
+                "t": t.isoformat(),
+                **counts,
+                "total": total,
+                "net": net,
+                "score": _ratio(net, total),
+                "moving_average": _ratio(sum(n for n, _ in recent), sum(c for _, c in recent)),
+            })
+        t += step
+
+    total = sum(totals.values())
+    return {
+        "ticker": ticker,
+        "window": window,
+        "granularity": granularity,
+        "moving_average_buckets": ma_length,
+        "summary": {
+            "positive": totals["positive"],
+            "negative": totals["negative"],
+            "neutral": totals["neutral"],
+            "total": total,
+            "score": _ratio(totals["positive"] - totals["negative"], total),
+        },
+        "points": points,
+    }
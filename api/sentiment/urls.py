@@ -1,7 +1,12 @@
 
+from django.conf import settings
 from django.urls import path
-from .views import AnalyzeSentimentAPIView
+from .views import AnalyzeSentimentAPIView, AsyncAnalyzeSentimentView, BatchSentimentAPIView, SentimentTrendView
+
+analyze_sentiment_view = AsyncAnalyzeSentimentView if settings.API_ASYNC_VIEWS else AnalyzeSentimentAPIView
 
 urlpatterns = [
-    path('analyze-sentiment/', AnalyzeSentimentAPIView.as_view(), name='analyze_sentiment'),
+    path('analyze-sentiment/', analyze_sentiment_view.as_view(), name='analyze_sentiment'),
+    path('batch/', BatchSentimentAPIView.as_view(), name='batch_sentiment'),
+    path('trend/', SentimentTrendView.as_view(), name='sentiment_trend'),
 ]
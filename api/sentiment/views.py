@@ -1,15 +1,42 @@
+import base64
+import binascii
+import hashlib
 import os
 import requests
 import json
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
+from django.views import View
 from dotenv import load_dotenv
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
+from core.caching import AsyncSingleFlight, SingleFlight, TTLCache
+from core.instrumentation import register_cache, timed
+from .batch import iter_batch
+from . import store, trends
+from .client import get_async_client, get_client
+from .scoring import default_scorer
+
 load_dotenv()
 
+# Shared across analyzer instances (one is created per request).
+news_cache = TTLCache(settings.SENTIMENT_NEWS_CACHE_SIZE, settings.SENTIMENT_NEWS_CACHE_TTL)
+article_sentiment_cache = TTLCache(settings.SENTIMENT_ARTICLE_CACHE_SIZE, settings.SENTIMENT_ARTICLE_CACHE_TTL)
+news_flight = SingleFlight()
+async_news_flight = AsyncSingleFlight()
+# Last successful response per key, served while NewsAPI is degraded.
+last_good_news = TTLCache(settings.SENTIMENT_NEWS_CACHE_SIZE, settings.SENTIMENT_NEWS_FALLBACK_TTL)
+
+register_cache("sentiment_news", lambda: (news_cache.hits, news_cache.misses))
+register_cache("sentiment_articles", lambda: (article_sentiment_cache.hits, article_sentiment_cache.misses))
+
 class NewsSentimentAnalyzer:
     """
     A wrapper class for financial news sentiment analysis using NewsAPI.
@@ -29,11 +56,12 @@ class NewsSentimentAnalyzer:
             api_key: NewsAPI key. If None, will try to get from environment variable.
         """
         self.api_key = api_key or os.getenv("NEWS_API_KEY")
-        self.base_url = "https://newsapi.org/v2/everything"
+        self.base_url = settings.NEWS_API_BASE_URL
 
         if not self.api_key:
             raise ValueError("NewsAPI key is required. Set NEWS_API_KEY environment variable or pass api_key parameter.")
 
+    @timed("sentiment_score")
     def _sentiment_score(self, text: str) -> str:
         """
         Analyze sentiment of given text using keyword-based approach.
@@ -44,30 +72,7 @@ class NewsSentimentAnalyzer:
         Returns:
             Sentiment: 'positive', 'negative', or 'neutral'
         """
-        positive_words = [
-            'good', 'great', 'excellent', 'positive', 'up', 'gain', 'profit', 'growth',
-            'bullish', 'surge', 'rally', 'boom', 'strong', 'beat', 'outperform',
-            'upgrade', 'buy', 'success', 'record', 'high', 'rise', 'increase',
-            'breakthrough', 'innovation', 'expansion', 'revenue', 'earnings', 'win'
-        ]
-
-        negative_words = [
-            'bad', 'poor', 'terrible', 'negative', 'down', 'loss', 'decline', 'drop',
-            'bearish', 'crash', 'fall', 'weak', 'miss', 'underperform', 'downgrade',
-            'sell', 'failure', 'low', 'decrease', 'concern', 'risk', 'warning',
-            'lawsuit', 'investigation', 'scandal', 'debt', 'bankruptcy', 'cut'
-        ]
-
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-
-        if positive_count > negative_count:
-            return "positive"
-        elif negative_count > positive_count:
-            return "negative"
-        else:
-            return "neutral"
+        return default_scorer.label(text)
 
     def _format_date(self, date_string: str) -> str:
         """Format date string from NewsAPI to readable format."""
@@ -79,18 +84,47 @@ class NewsSentimentAnalyzer:
         except:
             return date_string or "Unknown"
 
-    def _fetch_news(self, query: str, days_back: int = 7, max_articles: int = 50) -> List[Dict]:
+    @timed("fetch_news")
+    def _fetch_news(self, query: str, days_back: int = 7, max_articles: int = 50,
+                    ticker: Optional[str] = None) -> List[Dict]:
         """
         Fetch news articles from NewsAPI.
 
+        Fetched articles are kept in the article store with their sentiment.
+        Once a query's window is stored, NewsAPI is only asked for articles
+        newer than the latest stored one and the window is read back from the
+        store. Results are also cached per (query, date window, page size) and
+        concurrent identical requests share a single upstream call.
+
         Args:
             query: Search query (ticker or company name)
             days_back: Number of days to look back for news
             max_articles: Maximum number of articles to fetch
+            ticker: Ticker the articles are recorded under (defaults to the query)
 
         Returns:
             List of article dictionaries
         """
+        params, cache_key = self._news_params(query, days_back, max_articles)
+        ticker = (ticker or query).strip().upper()
+        articles = news_cache.get(cache_key)
+        if articles is None:
+            articles = news_flight.do(cache_key, lambda: self._request_news(params, cache_key, ticker))
+        return articles
+
+    @timed("fetch_news")
+    async def _fetch_news_async(self, query: str, days_back: int = 7, max_articles: int = 50,
+                                ticker: Optional[str] = None) -> List[Dict]:
+        """Non-blocking variant of ``_fetch_news`` sharing the same caches and store."""
+        params, cache_key = self._news_params(query, days_back, max_articles)
+        ticker = (ticker or query).strip().upper()
+        articles = news_cache.get(cache_key)
+        if articles is None:
+            articles = await async_news_flight.do(cache_key, lambda: self._request_news_async(params, cache_key, ticker))
+        return articles
+
+    def _news_params(self, query: str, days_back: int, max_articles: int):
+        """Build NewsAPI parameters and the cache key identifying the request."""
         # Calculate date range
         to_date = datetime.now()
         from_date = to_date - timedelta(days=days_back)
@@ -105,25 +139,86 @@ class NewsSentimentAnalyzer:
             'to': to_date.strftime('%Y-%m-%d'),
             'pageSize': min(max_articles, 100)  # NewsAPI limit is 100
         }
+        return params, (query, params['from'], params['to'], params['pageSize'])
 
-        try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+    def _delta_params(self, params: Dict, since: Optional[datetime]) -> Dict:
+        """Narrow ``params`` to articles published since ``since`` (all of the window when None)."""
+        if since is None:
+            return params
+        delta = {key: value for key, value in params.items() if key != 'to'}
+        delta['from'] = since.strftime('%Y-%m-%dT%H:%M:%S')
+        return delta
 
-            if data.get('status') != 'ok':
-                raise Exception(f"NewsAPI Error: {data.get('message', 'Unknown error')}")
+    def _request_news(self, params: Dict, cache_key: tuple, ticker: str) -> List[Dict]:
+        """
+        Call NewsAPI for what the store is missing, store it, and cache the
+        window's articles under ``cache_key``.
 
-            return data.get('articles', [])
+        If the upstream is unavailable (retries exhausted or circuit open),
+        the last successful response for the same key is returned instead.
+        """
+        try:
+            since = store.delta_since(params['q'], store.window_start(params['from']), params['pageSize'])
+            response = get_client().get(self.base_url, self._delta_params(params, since))
+            response.raise_for_status()
+            return self._store_news(response.json(), cache_key, params, ticker, since)
+        except requests.exceptions.RequestException as e:
+            return self._news_fallback(e, cache_key)
 
+    async def _request_news_async(self, params: Dict, cache_key: tuple, ticker: str) -> List[Dict]:
+        try:
+            since = await sync_to_async(store.delta_since)(
+                params['q'], store.window_start(params['from']), params['pageSize'])
+            response = await get_async_client().get(self.base_url, self._delta_params(params, since))
+            if response.is_error:
+                error = requests.exceptions.HTTPError(f"{response.status_code} Client Error for url: {response.url}")
+                error.response = response
+                raise error
+            return await sync_to_async(self._store_news)(response.json(), cache_key, params, ticker, since)
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Error fetching news: {str(e)}")
+            return self._news_fallback(e, cache_key)
+
+    def _store_news(self, data: Dict, cache_key: tuple, params: Dict, ticker: str,
+                    since: Optional[datetime] = None) -> List[Dict]:
+        if data.get('status') != 'ok':
+            raise Exception(f"NewsAPI Error: {data.get('message', 'Unknown error')}")
+
+        query, limit, start = params['q'], params['pageSize'], store.window_start(params['from'])
+        store.save_articles(query, ticker, data.get('articles', []), start, limit, since)
+        articles = store.read_articles(query, start, limit)
+        news_cache.set(cache_key, articles)
+        last_good_news.set(cache_key, articles)
+        return articles
+
+    def _news_fallback(self, error: Exception, cache_key: tuple) -> List[Dict]:
+        fallback = last_good_news.get(cache_key)
+        upstream_down = error.response is None or error.response.status_code >= 429
+        if fallback is not None and upstream_down:
+            return fallback
+        raise Exception(f"Error fetching news: {str(error)}")
+
+    @timed("sentiment_score")
+    def _article_sentiments(self, articles: List[Dict]) -> List[str]:
+        """
+        Score articles in one batch, reusing stored or cached results for
+        already seen URLs.
+        """
+        sentiments = [a.get('sentiment') or (article_sentiment_cache.get(a['url']) if a.get('url') else None)
+                      for a in articles]
+        pending = [i for i, sentiment in enumerate(sentiments) if sentiment is None]
+        texts = [store.article_text(articles[i]) for i in pending]
+        for i, sentiment in zip(pending, default_scorer.label_many(texts)):
+            sentiments[i] = sentiment
+            if articles[i].get('url'):
+                article_sentiment_cache.set(articles[i]['url'], sentiment)
+        return sentiments
 
     def analyze_sentiment(self,
                          ticker_or_company: str,
                          company_name: Optional[str] = None,
                          days_back: int = 7,
-                         max_articles: int = 10) -> Dict:
+                         max_articles: int = 10,
+                         include_articles: bool = True) -> Dict:
         """
         Analyze news sentiment for a ticker or company.
 
@@ -132,6 +227,7 @@ class NewsSentimentAnalyzer:
             company_name: Optional company name for better search results
             days_back: Number of days to look back for news (default: 7)
             max_articles: Maximum number of articles to analyze (default: 10)
+            include_articles: If False, only count sentiments and leave out ``articles``
 
         Returns:
             Dictionary containing:
@@ -140,52 +236,78 @@ class NewsSentimentAnalyzer:
             - articles: List of analyzed articles with full data
             - metadata: Additional information about the analysis
         """
-        # Create search query
+        raw_articles = self.fetch_articles(ticker_or_company, company_name, days_back, max_articles)
+        return self._build_result(raw_articles, ticker_or_company, company_name, days_back, max_articles,
+                                  include_articles=include_articles)
+
+    async def analyze_sentiment_async(self,
+                                      ticker_or_company: str,
+                                      company_name: Optional[str] = None,
+                                      days_back: int = 7,
+                                      max_articles: int = 10,
+                                      include_articles: bool = True) -> Dict:
+        """Non-blocking variant of ``analyze_sentiment`` for async views."""
+        raw_articles = await self.fetch_articles_async(ticker_or_company, company_name, days_back, max_articles)
+        return self._build_result(raw_articles, ticker_or_company, company_name, days_back, max_articles,
+                                  include_articles=include_articles)
+
+    def fetch_articles(self, ticker_or_company: str, company_name: Optional[str] = None,
+                       days_back: int = 7, max_articles: int = 10) -> List[Dict]:
+        """Raw NewsAPI articles for a ticker or company (stored, cached or fetched), newest first."""
+        search_query, _ = self._search_query(ticker_or_company, company_name)
+        return self._fetch_news(search_query, days_back, max_articles, ticker=ticker_or_company)
+
+    async def fetch_articles_async(self, ticker_or_company: str, company_name: Optional[str] = None,
+                                   days_back: int = 7, max_articles: int = 10) -> List[Dict]:
+        search_query, _ = self._search_query(ticker_or_company, company_name)
+        return await self._fetch_news_async(search_query, days_back, max_articles, ticker=ticker_or_company)
+
+    def _search_query(self, ticker_or_company: str, company_name: Optional[str]):
+        """Return the NewsAPI search query and the display name."""
         if company_name and company_name != ticker_or_company:
-            search_query = f'{ticker_or_company} OR "{company_name}"'
-            display_name = f"{ticker_or_company} ({company_name})"
-        else:
-            search_query = ticker_or_company
-            display_name = ticker_or_company
+            return f'{ticker_or_company} OR "{company_name}"', f"{ticker_or_company} ({company_name})"
+        return ticker_or_company, ticker_or_company
 
-        # Fetch articles
-        raw_articles = self._fetch_news(search_query, days_back, max_articles)
+    def _process_article(self, article: Dict, sentiment: str) -> Dict:
+        return {
+            "title": article.get('title', 'No title'),
+            "description": article.get('description', 'No description'),
+            "url": article.get('url', ''),
+            "image_url": article.get('urlToImage', ''),
+            "source": {
+                "name": article.get('source', {}).get('name', 'Unknown'),
+                "id": article.get('source', {}).get('id', '')
+            },
+            "author": article.get('author', 'Unknown'),
+            "published_date": self._format_date(article.get('publishedAt', '')),
+            "published_date_raw": article.get('publishedAt', ''),
+            "sentiment": sentiment,
+            "content_preview": article.get('content', '')[:200] + "..." if article.get('content') and len(article.get('content', '')) > 200 else article.get('content', '')
+        }
 
-        # Process articles
-        processed_articles = []
-        sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
+    def _build_result(self, raw_articles: List[Dict], ticker_or_company: str,
+                      company_name: Optional[str], days_back: int, max_articles: int,
+                      include_articles: bool = True, cursor: Optional[str] = None,
+                      page_size: Optional[int] = None) -> Dict:
+        """
+        Score fetched articles and assemble the analysis result.
 
-        for article in raw_articles:
-            # Skip articles without title or description
-            if not article.get('title') and not article.get('description'):
-                continue
-
-            # Analyze sentiment
-            text_for_analysis = f"{article.get('title', '')}. {article.get('description', '')}"
-            sentiment = self._sentiment_score(text_for_analysis)
-            sentiment_counts[sentiment] += 1
-
-            # Process article data
-            processed_article = {
-                "title": article.get('title', 'No title'),
-                "description": article.get('description', 'No description'),
-                "url": article.get('url', ''),
-                "image_url": article.get('urlToImage', ''),
-                "source": {
-                    "name": article.get('source', {}).get('name', 'Unknown'),
-                    "id": article.get('source', {}).get('id', '')
-                },
-                "author": article.get('author', 'Unknown'),
-                "published_date": self._format_date(article.get('publishedAt', '')),
-                "published_date_raw": article.get('publishedAt', ''),
-                "sentiment": sentiment,
-                "content_preview": article.get('content', '')[:200] + "..." if article.get('content') and len(article.get('content', '')) > 200 else article.get('content', '')
-            }
-
-            processed_articles.append(processed_article)
+        With ``include_articles=False`` sentiments are only counted. With a
+        ``cursor`` or ``page_size`` only one page of articles is built and a
+        ``pagination`` block with the ``next_cursor`` is added.
+        """
+        search_query, display_name = self._search_query(ticker_or_company, company_name)
+
+        # Skip articles without title or description
+        articles = [a for a in raw_articles if a.get('title') or a.get('description')]
+
+        # Analyze sentiment
+        sentiments = self._article_sentiments(articles)
+        sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
+        sentiment_counts.update(Counter(sentiments))
 
         # Calculate percentages
-        total_articles = len(processed_articles)
+        total_articles = len(articles)
         sentiment_percentages = {}
         if total_articles > 0:
             for sentiment, count in sentiment_counts.items():
@@ -207,13 +329,20 @@ class NewsSentimentAnalyzer:
                 "sentiment_percentages": sentiment_percentages,
                 "overall_sentiment": max(sentiment_counts, key=sentiment_counts.get) if total_articles > 0 else "neutral"
             },
-            "articles": processed_articles,
-            "metadata": {
-                "analysis_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
-                "days_analyzed": days_back,
-                "max_articles_requested": max_articles,
-                "api_source": "NewsAPI"
-            }
+        }
+
+        if include_articles:
+            pairs = list(zip(articles, sentiments))
+            if cursor or page_size:
+                pairs, next_cursor = paginate_articles(pairs, cursor, page_size or len(pairs))
+                result["pagination"] = {"page_size": page_size, "next_cursor": next_cursor}
+            result["articles"] = [self._process_article(article, sentiment) for article, sentiment in pairs]
+
+        result["metadata"] = {
+            "analysis_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
+            "days_analyzed": days_back,
+            "max_articles_requested": max_articles,
+            "api_source": "NewsAPI"
         }
 
         return result
@@ -229,34 +358,245 @@ class NewsSentimentAnalyzer:
         Returns:
             Dictionary with query info and sentiment summary only
         """
-        full_result = self.analyze_sentiment(ticker_or_company, company_name)
-        return {
-            "query_info": full_result["query_info"],
-            "sentiment_summary": full_result["sentiment_summary"],
-            "metadata": full_result["metadata"]
-        }
+        return self.analyze_sentiment(ticker_or_company, company_name, include_articles=False)
+
+def parse_sentiment_params(query_params):
+    """
+    Validate the analyze-sentiment query parameters.
+
+    Returns ``(kwargs, error)`` where ``error`` is a message for a 400 response.
+    """
+    ticker_or_company = query_params.get('ticker_or_company')
+    company_name = query_params.get('company_name')
+    days_back_str = query_params.get('days_back', '3')
+    max_articles_str = query_params.get('max_articles', '10')
+
+    try:
+        days_back = int(days_back_str)
+        max_articles = int(max_articles_str)
+    except ValueError:
+        return None, "'days_back' and 'max_articles' must be integers"
+
+    if not ticker_or_company:
+        return None, "Missing 'ticker_or_company' parameter"
+
+    return {
+        "ticker_or_company": ticker_or_company,
+        "company_name": company_name,
+        "days_back": days_back,
+        "max_articles": max_articles,
+    }, None
+
+RESULT_FIELDS = ("query_info", "sentiment_summary", "articles", "metadata")
+ARTICLE_FIELDS = ("title", "description", "url", "image_url", "source", "author",
+                  "published_date", "published_date_raw", "sentiment", "content_preview")
+SUMMARY_FIELDS = ("query_info", "sentiment_summary", "metadata")
+
+
+def _article_key(article: Dict):
+    return article.get('publishedAt') or '', article.get('url') or ''
+
+
+def encode_cursor(article: Dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(_article_key(article)).encode()).decode()
 
-class AnalyzeSentimentAPIView(APIView):
-    def get(self, request):
-        ticker_or_company = request.query_params.get('ticker_or_company')
-        company_name = request.query_params.get('company_name')
-        days_back_str = request.query_params.get('days_back', '3')
-        max_articles_str = request.query_params.get('max_articles', '10')
 
+def decode_cursor(cursor: str):
+    try:
+        published, url = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError("Invalid 'cursor'")
+    # Compared against article keys, which are strings
+    if not isinstance(published, str) or not isinstance(url, str):
+        raise ValueError("Invalid 'cursor'")
+    return published, url
+
+
+def paginate_articles(pairs: List, cursor: Optional[str], page_size: int):
+    """
+    One page of ``(article, sentiment)`` pairs, newest first, after ``cursor``
+    (the position of the last article of the previous page). Returns the page
+    and the cursor for the next one, or None on the last page.
+    """
+    pairs = sorted(pairs, key=lambda pair: _article_key(pair[0]), reverse=True)
+    if cursor:
+        after = decode_cursor(cursor)
+        pairs = [pair for pair in pairs if _article_key(pair[0]) < after]
+    page = pairs[:page_size]
+    return page, encode_cursor(page[-1][0]) if len(pairs) > page_size else None
+
+
+def parse_response_options(query_params):
+    """
+    Validate the response-shaping parameters of the analyze-sentiment view:
+    ``summary=true``, ``fields=`` (top-level keys and ``articles.<field>``),
+    ``page_size`` and ``cursor``.
+
+    Returns ``(options, error)`` where ``error`` is a message for a 400 response.
+    """
+    fields, article_fields = None, None
+    if query_params.get('summary', '').lower() == 'true':
+        fields = set(SUMMARY_FIELDS)
+    if query_params.get('fields'):
+        fields, article_fields = fields or set(), set()
+        for name in filter(None, (f.strip() for f in query_params['fields'].split(','))):
+            top, _, sub = name.partition('.')
+            if top not in RESULT_FIELDS or (sub and (top != 'articles' or sub not in ARTICLE_FIELDS)):
+                return None, f"Unknown field '{name}'; use {', '.join(RESULT_FIELDS)} or articles.<{'|'.join(ARTICLE_FIELDS)}>"
+            fields.add(top)
+            if sub:
+                article_fields.add(sub)
+    page_size = query_params.get('page_size')
+    if page_size is not None:
         try:
-            days_back = int(days_back_str)
-            max_articles = int(max_articles_str)
+            page_size = int(page_size)
         except ValueError:
-            return Response({"error": "'days_back' and 'max_articles' must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+            page_size = 0
+        if page_size < 1:
+            return None, "'page_size' must be a positive integer"
+    return {
+        "fields": sorted(fields) if fields is not None else None,
+        "article_fields": sorted(article_fields) if article_fields else None,
+        "page_size": page_size,
+        "cursor": query_params.get('cursor') or None,
+    }, None
+
+
+def build_response(analyzer, raw_articles: List[Dict], params: Dict, options: Dict) -> Dict:
+    """Analysis result with only the requested fields and page of articles."""
+    fields = options["fields"]
+    include_articles = fields is None or "articles" in fields
+    result = analyzer._build_result(raw_articles, params["ticker_or_company"], params["company_name"],
+                                    params["days_back"], params["max_articles"], include_articles=include_articles,
+                                    cursor=options["cursor"], page_size=options["page_size"])
+    if fields is not None:
+        result = {key: value for key, value in result.items() if key in fields or key == "pagination"}
+    if include_articles and options["article_fields"]:
+        result["articles"] = [{key: article[key] for key in options["article_fields"]} for article in result["articles"]]
+    return result
+
+
+def response_etag(params: Dict, options: Dict, raw_articles: List[Dict]) -> str:
+    """
+    Weak ETag for an analyze-sentiment response, derived from the request and
+    the identity of the articles it covers, so a repeated poll can be answered
+    with 304 before any result is built. ``analysis_date`` is ignored.
+    """
+    payload = json.dumps([params, options, [_article_key(a) for a in raw_articles]], sort_keys=True)
+    return f'W/"{hashlib.sha256(payload.encode()).hexdigest()[:32]}"'
+
+
+def not_modified(request, etag: str) -> Optional[HttpResponseNotModified]:
+    """A 304 response if the request's If-None-Match matches ``etag`` (weak comparison)."""
+    candidates = parse_etags(request.headers.get('If-None-Match', ''))
+    if '*' in candidates or etag.removeprefix('W/') in (c.removeprefix('W/') for c in candidates):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
+    return None
 
-        if not ticker_or_company:
-            return Response({"error": "Missing 'ticker_or_company' parameter"}, status=status.HTTP_400_BAD_REQUEST)
+
+class AnalyzeSentimentAPIView(APIView):
+    """
+    GET ?ticker_or_company=TCS. ``summary=true`` or ``fields=`` trims the
+    response (summaries skip building article dicts), ``page_size`` and
+    ``cursor`` page through articles, and responses carry an ETag so polls
+    with If-None-Match get 304.
+    """
+    def get(self, request):
+        params, error = parse_sentiment_params(request.query_params)
+        if not error:
+            options, error = parse_response_options(request.query_params)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
             analyzer = NewsSentimentAnalyzer()
-            result = analyzer.analyze_sentiment(ticker_or_company, company_name, days_back, max_articles)
-            return Response(result, status=status.HTTP_200_OK)
+            raw_articles = analyzer.fetch_articles(**params)
+            etag = response_etag(params, options, raw_articles)
+            cached = not_modified(request, etag)
+            if cached:
+                return cached
+            response = Response(build_response(analyzer, raw_articles, params, options), status=status.HTTP_200_OK)
+            response["ETag"] = etag
+            response["Cache-Control"] = "no-cache"
+            return response
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class SentimentTrendView(APIView):
+    """
+    GET ?ticker=TCS&window=1M: hourly (1D, 5D) or daily (1M, 3M) sentiment
+    counts, net score and moving average, read from the precomputed trend
+    buckets without calling NewsAPI.
+    """
+    def get(self, request):
+        ticker = request.query_params.get('ticker', '').strip().upper()
+        window = request.query_params.get('window', '1M').upper()
+        if not ticker:
+            return Response({"error": "Missing 'ticker' parameter"}, status=status.HTTP_400_BAD_REQUEST)
+        if window not in trends.WINDOWS:
+            return Response({"error": f"'window' must be one of: {', '.join(trends.WINDOWS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(trends.trend(ticker, window), status=status.HTTP_200_OK)
+
+class AsyncAnalyzeSentimentView(View):
+    """
+    Async variant of AnalyzeSentimentAPIView for ASGI deployments: the NewsAPI
+    round trip is awaited instead of holding a worker thread.
+    """
+    async def get(self, request):
+        params, error = parse_sentiment_params(request.GET)
+        if not error:
+            options, error = parse_response_options(request.GET)
+        if error:
+            return JsonResponse({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            analyzer = NewsSentimentAnalyzer()
+            raw_articles = await analyzer.fetch_articles_async(**params)
+            etag = response_etag(params, options, raw_articles)
+            cached = not_modified(request, etag)
+            if cached:
+                return cached
+            response = JsonResponse(build_response(analyzer, raw_articles, params, options), status=status.HTTP_200_OK)
+            response["ETag"] = etag
+            response["Cache-Control"] = "no-cache"
+            return response
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return JsonResponse({"error": f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class BatchSentimentAPIView(APIView):
+    """
+    POST {"items": [{"ticker_or_company": "TCS", "company_name": "Tata Consultancy"}, ...],
+    "days_back": 3, "max_articles": 10} (or "tickers": ["TCS", ...]) and receive
+    one NDJSON sentiment summary per item as soon as it is ready.
+    """
+    def post(self, request):
+        items = request.data.get('items')
+        tickers = request.data.get('tickers')
+        if items is None and isinstance(tickers, list):
+            items = [{"ticker_or_company": t} for t in tickers]
+
+        if (not isinstance(items, list) or not items
+                or not all(isinstance(i, dict) and isinstance(i.get('ticker_or_company'), str) and i['ticker_or_company'].strip() for i in items)):
+            return Response({"error": "Provide 'tickers' or 'items' with a 'ticker_or_company' for each entry"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.SENTIMENT_BATCH_MAX_ITEMS:
+            return Response({"error": f"At most {settings.SENTIMENT_BATCH_MAX_ITEMS} items per batch"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            days_back = int(request.data.get('days_back', 3))
+            max_articles = int(request.data.get('max_articles', 10))
+        except (TypeError, ValueError):
+            return Response({"error": "'days_back' and 'max_articles' must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            analyzer = NewsSentimentAnalyzer()
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return StreamingHttpResponse(iter_batch(analyzer, items, days_back, max_articles), content_type='application/x-ndjson')
@@ -19,12 +19,8 @@ const IpoCalendar = () => {
           withCredentials: true,
         });
 
-        // Sort by Open date in descending order
-        const sortedData = response.data.ipoData.sort((a, b) => {
-          return new Date(b.Open) - new Date(a.Open);
-        });
-
-        setIpoData(sortedData);
+        // The API returns IPOs sorted by Open date, newest first
+        setIpoData(response.data.ipoData);
         setLoading(false);
       } catch (err) {
         setError(err);
@@ -111,6 +107,10 @@ const IpoCalendar = () => {
   };
 
   const getRecommendation = (ipo) => {
+    if (ipo.Recommendation) {
+      return ipo.Recommendation;
+    }
+
     // Extract premium percentage from string like "14 (3.4%)"
     const premiumMatch = ipo.Premium.match(/\((\d+\.?\d*)%\)/);
     const premium = premiumMatch ? parseFloat(premiumMatch[1]) : parseFloat(ipo.Premium);
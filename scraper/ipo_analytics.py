@@ -0,0 +1,188 @@
+"""
+Derived IPO fields computed at ingest time.
+
+The scraper stores Premium and Price as display strings ("14 (3.4%)",
+"95 to 100"). ``enrich`` adds numeric and derived fields to each document so
+the API can filter and sort on them with indexes, and ``write_summary`` keeps
+one precomputed summary document for the IPO calendar.
+"""
+from pymongo import ASCENDING, DESCENDING
+from datetime import datetime
+import re
+
+SUMMARY_ID = "summary"
+TOP_N = 10
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_PERCENT = re.compile(r"\((-?\d+(?:\.\d+)?)\s*%\)")
+
+# Premium (%) above which an IPO is "Must Apply", and from which it is
+# "Apply" / "May Apply"; the IPO calendar's client-side thresholds, applied to
+# the same input it used (see ``recommendation_input``).
+THRESHOLDS = {
+    "mainboard": (40, 20, 10),
+    "sme": (40, 30, 20),
+}
+# Gain (%) that maps to a full recommendation score of 100
+SCORE_CEILING = 60.0
+# Derived from the date rather than the scraped row: left out of the row hash
+# and kept current by ``refresh_status`` instead
+TIME_RELATIVE_FIELDS = ("Status",)
+
+
+def parse_price(text):
+    """Upper end of the issue price band ("95 to 100" -> 100.0), or None."""
+    numbers = _NUMBER.findall((text or "").replace(",", ""))
+    return max(map(float, numbers)) if numbers else None
+
+
+def parse_premium(text):
+    """
+    Split a premium string like "14 (3.4%)" into ``(amount, percent)``.
+    Either part is None when absent.
+    """
+    text = (text or "").replace(",", "")
+    percent = _PERCENT.search(text)
+    amount = _NUMBER.search(_PERCENT.sub("", text))
+    return (float(amount.group()) if amount else None,
+            float(percent.group(1)) if percent else None)
+
+
+def is_sme(document):
+    return "SME" in document["Company Name"]
+
+
+def ipo_status(document, today):
+    if document["Open"] <= today <= document["Close"]:
+        return "open"
+    # Listed from the day after listing, as the IPO calendar shows it
+    if today > document["Listing Date"]:
+        return "listed"
+    if today > document["Close"]:
+        return "closed"
+    return "upcoming"
+
+
+def status_queries(today):
+    """``(status, filter)`` pairs matching the rows ``ipo_status`` would give each status on ``today``."""
+    rules = [
+        ("open", {"Open": {"$lte": today}, "Close": {"$gte": today}}),
+        ("listed", {"Listing Date": {"$lt": today}}),
+        ("closed", {"Close": {"$lt": today}}),
+        ("upcoming", {}),
+    ]
+    return [(status, {"$and": [rule, {"$nor": [earlier for _, earlier in rules[:i]]}]} if i else rule)
+            for i, (status, rule) in enumerate(rules)]
+
+
+def refresh_status(collection, today=None):
+    """
+    Move rows whose ``Status`` is out of date for ``today`` to the right one,
+    with one update_many per status, without touching their row hash.
+    Returns the number of rows changed.
+    """
+    today = today or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    changed = 0
+    for status, query in status_queries(today):
+        result = collection.update_many({"$and": [query, {"Status": {"$ne": status}}]}, {"$set": {"Status": status}})
+        changed += result.modified_count
+    return changed
+
+
+def recommendation_input(premium, percent):
+    """
+    The number the IPO calendar recommended on: the premium percent shown in
+    brackets, or the bare premium amount when the site gives no percent.
+    """
+    return percent if percent is not None else premium
+
+
+def recommend(gain, sme):
+    """Return ``(label, score)`` for a premium in percent (see ``recommendation_input``)."""
+    if gain is None:
+        return None, None
+    must_apply, apply, may_apply = THRESHOLDS["sme" if sme else "mainboard"]
+    if gain > must_apply:
+        label = "Must Apply"
+    elif gain >= apply:
+        label = "Apply"
+    elif gain >= may_apply:
+        label = "May Apply"
+    else:
+        label = "Not Apply"
+    # SME issues need 10 points more gain for the same recommendation
+    adjusted = gain - 10 if sme else gain
+    score = round(min(max(adjusted / SCORE_CEILING, 0.0), 1.0) * 100, 1)
+    return label, score
+
+
+def enrich(document, today=None):
+    """
+    Add numeric and derived fields to a scraped IPO document (in place) and
+    return it. ``Status`` is as of ``today``; day counts are left to the API,
+    which computes them when queried.
+
+    ``Expected Listing Gain`` is the premium percent from the site, or
+    premium / price when the site gives none. The recommendation keeps the
+    calendar's input instead, so it is unchanged for those rows.
+    """
+    today = today or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    price = parse_price(document.get("Price"))
+    premium, percent = parse_premium(document.get("Premium"))
+    gain = percent
+    if gain is None and premium is not None and price:
+        gain = premium / price * 100
+    sme = is_sme(document)
+    recommendation, score = recommend(recommendation_input(premium, percent), sme)
+
+    document.update({
+        "Premium Value": premium,
+        "Price Value": price,
+        "Expected Listing Gain": round(gain, 2) if gain is not None else None,
+        "Premium Price Ratio": round(premium / price, 4) if premium is not None and price else None,
+        "Status": ipo_status(document, today),
+        "Segment": "SME" if sme else "Mainboard",
+        "Recommendation": recommendation,
+        "Recommendation Score": score,
+    })
+    return document
+
+
+def ensure_indexes(collection):
+    """Indexes behind the IPO API's status/segment filters and sorts."""
+    collection.create_index([("Status", ASCENDING), ("Expected Listing Gain", DESCENDING)], name="status_gain")
+    collection.create_index([("Segment", ASCENDING), ("Open", DESCENDING)], name="segment_open")
+    collection.create_index([("Open", DESCENDING)], name="open_desc")
+
+
+def build_summary(collection, top_n=TOP_N):
+    """Counts by status, segment and recommendation, plus the top upcoming/open IPOs by expected gain."""
+    by_status, by_segment, by_recommendation = {}, {}, {}
+    projection = {"_id": 0, "Company Name": 1, "Status": 1, "Segment": 1, "Recommendation": 1,
+                  "Expected Listing Gain": 1, "Recommendation Score": 1, "Open": 1, "Close": 1}
+    candidates = []
+    for doc in collection.find({}, projection):
+        status = doc.get("Status")
+        by_status[status] = by_status.get(status, 0) + 1
+        by_segment[doc.get("Segment")] = by_segment.get(doc.get("Segment"), 0) + 1
+        if doc.get("Recommendation"):
+            by_recommendation[doc["Recommendation"]] = by_recommendation.get(doc["Recommendation"], 0) + 1
+        if status in ("upcoming", "open") and doc.get("Expected Listing Gain") is not None:
+            candidates.append(doc)
+
+    candidates.sort(key=lambda doc: doc["Expected Listing Gain"], reverse=True)
+    return {
+        "_id": SUMMARY_ID,
+        "generated_at": datetime.now(),
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_segment": by_segment,
+        "by_recommendation": by_recommendation,
+        "top_expected_gain": candidates[:top_n],
+    }
+
+
+def write_summary(collection, summary_collection, top_n=TOP_N):
+    summary = build_summary(collection, top_n)
+    summary_collection.replace_one({"_id": SUMMARY_ID}, summary, upsert=True)
+    return summary
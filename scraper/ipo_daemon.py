@@ -0,0 +1,211 @@
+"""
+Long-running IPO scraper.
+
+Keeps one MongoClient (with its connection pool), one HTTP session and, when
+the page has to be rendered, one warm headless Chrome for the life of the
+process, and refreshes the IPO collection on its own schedule. A small HTTP
+server on localhost lets the Node server ask for an immediate refresh and
+read the outcome of the last run:
+
+    POST /refresh   queue a refresh now (runs at most one at a time)
+    GET  /status    last run time, duration, success and counts
+
+Usage: python ipo_daemon.py [--interval 3600] [--port 5002]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from pymongo import MongoClient
+from datetime import datetime, timedelta, timezone
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+import ipo_data_scraper as scraper
+
+DAEMON_HOST = os.getenv("IPO_DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.getenv("IPO_DAEMON_PORT", "5002"))
+SCRAPE_INTERVAL = int(os.getenv("IPO_SCRAPE_INTERVAL", "3600"))
+# Page loads after which the warm browser is restarted to cap memory growth
+BROWSER_MAX_RUNS = int(os.getenv("IPO_BROWSER_MAX_RUNS", "50"))
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class IPOScraperDaemon:
+    def __init__(self, mongo_uri, interval=SCRAPE_INTERVAL, start=0, limit=scraper.MAX_ROWS):
+        self.interval = interval
+        self.start = start
+        self.limit = limit
+        self.client = MongoClient(mongo_uri)
+        self.collection = self.client.get_database(scraper.DB_NAME).ipo_data
+        self.session = scraper.new_session()
+        self._driver = None
+        self._driver_runs = 0
+        self._run_lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self._trigger = threading.Event()
+        self._stop = threading.Event()
+        self._status = {
+            "running": False,
+            "runs": 0,
+            "failures": 0,
+            "last_started_at": None,
+            "last_finished_at": None,
+            "last_duration_seconds": None,
+            "last_success": None,
+            "last_error": None,
+            "last_counts": None,
+            "next_run_at": None,
+        }
+
+    def _get_driver(self):
+        if self._driver is not None and self._driver_runs >= BROWSER_MAX_RUNS:
+            self._quit_driver()
+        if self._driver is None:
+            self._driver = webdriver.Chrome(options=scraper.chrome_options())
+        self._driver_runs += 1
+        return self._driver
+
+    def _quit_driver(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except WebDriverException:
+                pass
+        self._driver = None
+        self._driver_runs = 0
+
+    def _update(self, **fields):
+        with self._status_lock:
+            self._status.update(fields)
+
+    def status(self):
+        with self._status_lock:
+            return dict(self._status)
+
+    def refresh(self):
+        """Run one scrape-and-sync now; concurrent calls wait for the running one."""
+        with self._run_lock:
+            started = time.monotonic()
+            self._update(running=True, last_started_at=_now().isoformat())
+            counts, error = None, None
+            try:
+                counts = scraper.run_once(self.collection, self.start, self.limit,
+                                          session=self.session, get_driver=self._get_driver)
+                if counts is None:
+                    error = "IPO table not found"
+            except WebDriverException as e:
+                # The browser may have crashed; start a fresh one next time
+                self._quit_driver()
+                error = str(e)
+            except Exception as e:
+                error = str(e)
+            if error:
+                print(f"IPO refresh failed: {error}", file=sys.stderr)
+
+            status = self.status()
+            self._update(
+                running=False,
+                runs=status["runs"] + 1,
+                failures=status["failures"] + (error is not None),
+                last_finished_at=_now().isoformat(),
+                last_duration_seconds=round(time.monotonic() - started, 3),
+                last_success=error is None,
+                last_error=error,
+                last_counts=counts,
+            )
+            return error is None
+
+    def trigger(self):
+        self._trigger.set()
+
+    def stop(self):
+        self._stop.set()
+        self._trigger.set()
+
+    def run_forever(self):
+        scraper.ensure_indexes(self.collection)
+        while not self._stop.is_set():
+            self.refresh()
+            self._update(next_run_at=(_now() + timedelta(seconds=self.interval)).isoformat())
+            self._trigger.wait(self.interval)
+            self._trigger.clear()
+
+    def close(self):
+        self._quit_driver()
+        self.session.close()
+        self.client.close()
+
+
+def make_handler(daemon):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/status":
+                self._send(200, daemon.status())
+            else:
+                self._send(404, {"error": "Not found"})
+
+        def do_POST(self):
+            if self.path.rstrip("/") == "/refresh":
+                daemon.trigger()
+                self._send(202, {"queued": True, "running": daemon.status()["running"]})
+            else:
+                self._send(404, {"error": "Not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the IPO scraper on a schedule with a local refresh trigger.")
+    parser.add_argument("--interval", type=int, default=SCRAPE_INTERVAL,
+                        help=f"Seconds between scheduled refreshes (default: {SCRAPE_INTERVAL}).")
+    parser.add_argument("--host", default=DAEMON_HOST, help=f"Trigger server address (default: {DAEMON_HOST}).")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT, help=f"Trigger server port (default: {DAEMON_PORT}).")
+    parser.add_argument("--rows", type=int, default=scraper.MAX_ROWS,
+                        help=f"Number of newest IPOs to refresh each run (default: {scraper.MAX_ROWS}).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mongo_uri = os.getenv("MONGO_URI")
+    if not mongo_uri:
+        print("Error: MONGO_URI not found in environment variables.", file=sys.stderr)
+        return 1
+
+    daemon = IPOScraperDaemon(mongo_uri, interval=args.interval, limit=args.rows)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(daemon))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    print(f"IPO scraper daemon listening on http://{args.host}:{args.port} (every {args.interval}s)")
+
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        daemon.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,107 +1,385 @@
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-from pymongo import MongoClient, UpdateOne
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from bs4 import BeautifulSoup, SoupStrainer
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
 from dotenv import load_dotenv
+import argparse
+import hashlib
+import json
 import os
-import time
+import re
 from datetime import datetime
+from urllib.parse import urljoin
+import requests
 import sys
 
+import ipo_analytics
+import ipo_history
+
 # Load environment variables from .env file
 load_dotenv()
 
-# Setup Chrome in headless mode
-options = Options()
-options.add_argument('--headless')
-options.add_argument('--no-sandbox')
-options.add_argument('--disable-gpu')
+# Prefer the much faster lxml parser when it is installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+IPO_URL = os.getenv("IPO_URL", "https://ipopremium.in/")
+# JSON endpoint behind the DataTables table; discovered from the page when unset
+IPO_AJAX_URL = os.getenv("IPO_AJAX_URL")
+# Seconds to wait for table rows (browser) or an HTTP response
+IPO_WAIT_TIMEOUT = float(os.getenv("IPO_WAIT_TIMEOUT", "30"))
+# Rows requested per AJAX call while paging through a window
+IPO_PAGE_SIZE = int(os.getenv("IPO_PAGE_SIZE", "100"))
+DB_NAME = "financial-dashboard"  # You can change this to your preferred db name
+KEY_FIELD = "Company Name"
+# Stored with each document so the next run can tell whether the row changed
+HASH_FIELD = "_row_hash"
+# Numeric premium (see ipo_analytics); history samples are only taken when it moves
+PREMIUM_FIELD = "Premium Value"
+# Single precomputed document with counts and top IPOs (see ipo_analytics)
+SUMMARY_COLLECTION = "ipo_summary"
+# Default pagination window: the newest 50 IPOs
+MAX_ROWS = int(os.getenv("IPO_ROWS", "50"))
 
-# Get the MongoDB URI from environment variables
-mongo_uri = os.getenv("MONGO_URI")
-if not mongo_uri:
-    print("Error: MONGO_URI not found in environment variables.", file=sys.stderr)
-    sys.exit(1)
+# DataTables config in the page's scripts, e.g. `ajax: "/ipo/list"` or `ajax: {url: "..."}`
+_AJAX_CONFIG = re.compile(r"""["']?ajax["']?\s*:\s*(?:\{[^}]*?["']?url["']?\s*:\s*)?["']([^"']+)["']""")
 
-# Initialize driver and MongoDB client outside try-except for broader scope
-driver = None
-client = None
 
-try:
-    # Connect to MongoDB
-    client = MongoClient(mongo_uri)
-    db = client.get_database("financial-dashboard")  # You can change this to your preferred db name
-    collection = db.ipo_data
+def chrome_options():
+    # Setup Chrome in headless mode
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-gpu')
+    return options
+
+
+class _TableRowsLoaded:
+    """Wait condition: the IPO table has data rows (not DataTables' empty/loading row)."""
+
+    def __init__(self, minimum):
+        self.minimum = minimum
+
+    def __call__(self, driver):
+        if driver.find_elements(By.CSS_SELECTOR, "#table_ajax tbody td.dataTables_empty"):
+            return False
+        return len(driver.find_elements(By.CSS_SELECTOR, "#table_ajax tbody tr")) >= self.minimum
+
+
+def fetch_page_source(driver, start=0, limit=MAX_ROWS, timeout=IPO_WAIT_TIMEOUT):
+    """
+    Load the IPO page and return its HTML once the table has rows, instead of
+    sleeping for a fixed time. If the window needs more rows than the table
+    shows by default, DataTables is asked to draw every row first.
+    """
+    driver.get(IPO_URL)
+    WebDriverWait(driver, timeout).until(_TableRowsLoaded(1))
+    shown = len(driver.find_elements(By.CSS_SELECTOR, "#table_ajax tbody tr"))
+    if limit is None or start + limit > shown:
+        has_datatable = driver.execute_script(
+            "if (!window.jQuery || !jQuery.fn.dataTable) return false;"
+            "jQuery('#table_ajax').DataTable().page.len(-1).draw(); return true;"
+        )
+        if has_datatable:
+            try:
+                WebDriverWait(driver, timeout).until(_TableRowsLoaded(shown + 1))
+            except TimeoutException:
+                pass  # The table simply has no more rows
+    return driver.page_source
+
+
+def discover_ajax_url(html, base_url):
+    """Find the JSON endpoint the IPO table is loaded from, if the page exposes one."""
+    for script in BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("script")).find_all("script"):
+        text = script.string or ""
+        if "table_ajax" in text:
+            match = _AJAX_CONFIG.search(text)
+            if match:
+                return urljoin(base_url, match.group(1))
+    return None
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    text = str(value)
+    if "<" in text:
+        return BeautifulSoup(text, HTML_PARSER).get_text(strip=True)
+    return text.strip()
 
-    driver = webdriver.Chrome(options=options)
-    driver.get("https://ipopremium.in/")
 
-    # Wait for table to load
-    time.sleep(7)  # Adjust if your network is slow
+def fetch_json_rows(session, url, start=0, limit=MAX_ROWS, page_size=IPO_PAGE_SIZE, timeout=IPO_WAIT_TIMEOUT):
+    """
+    Page through a DataTables server-side endpoint and return rows as lists
+    of cell texts. ``limit=None`` reads until the endpoint runs out of rows.
+    """
+    rows = []
+    draw = 0
+    while limit is None or len(rows) < limit:
+        draw += 1
+        length = page_size if limit is None else min(page_size, limit - len(rows))
+        response = session.get(url, params={"draw": draw, "start": start + len(rows), "length": length},
+                               headers={"X-Requested-With": "XMLHttpRequest"}, timeout=timeout)
+        response.raise_for_status()
+        payload = response.json()
+        data = payload.get("data", payload.get("aaData", [])) if isinstance(payload, dict) else payload
+        if not data:
+            break
+        for record in data:
+            cells = record.values() if isinstance(record, dict) else record
+            rows.append([_cell_text(cell) for cell in cells])
+        total = payload.get("recordsFiltered", payload.get("recordsTotal")) if isinstance(payload, dict) else None
+        if len(data) < length or (total is not None and start + len(rows) >= int(total)):
+            break
+    return rows if limit is None else rows[:limit]
 
-    # Parse the page source with BeautifulSoup
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+
+def build_document(cells):
+    """Turn one row's cell texts into an IPO document, or None if the row is malformed."""
+    if len(cells) < 8:
+        print(f"Warning: Skipping row due to insufficient columns: {''.join(cells)}", file=sys.stderr)
+        return None
+
+    company_name = cells[0]
+
+    # Convert date strings to datetime objects for proper sorting
+    try:
+        open_date = datetime.strptime(cells[2], '%b %d, %Y')
+        close_date = datetime.strptime(cells[3], '%b %d, %Y')
+        allotment_date = datetime.strptime(cells[6], '%b %d, %Y')
+        listing_date = datetime.strptime(cells[7], '%b %d, %Y')
+    except ValueError as e:
+        print(f"Warning: Skipping row for '{company_name}' due to date parsing error: {e}", file=sys.stderr)
+        return None
+
+    return {
+        "Company Name": company_name,
+        "Premium": cells[1],
+        "Open": open_date,
+        "Close": close_date,
+        "Price": cells[4],
+        "Lot Size": cells[5],
+        "Allotment Date": allotment_date,
+        "Listing Date": listing_date
+    }
+
+
+def build_documents(rows):
+    return [doc for doc in map(build_document, rows) if doc is not None]
+
+
+def parse_ipo_rows(html, start=0, limit=MAX_ROWS):
+    """
+    Parse rows ``start`` to ``start + limit`` of the IPO table into documents
+    (``limit=None`` for all), skipping malformed rows. Returns None if the
+    table is missing.
+    """
+    # Parse only the IPO table instead of building a tree for the whole page
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("table", id="table_ajax"))
     table = soup.find("table", {"id": "table_ajax"})
+    if not table or not table.find("tbody"):
+        return None
+
+    end = None if limit is None else start + limit
+    rows = table.find("tbody").find_all("tr")[start:end]
+    return build_documents([[td.get_text(strip=True) for td in row.find_all("td")] for row in rows])
+
+
+def row_hash(document):
+    """
+    Stable SHA-256 of a parsed row (dates included as ISO strings). Fields
+    that only change with the date (see ipo_analytics) are left out, so a row
+    hashes the same every day until the site changes it.
+    """
+    document = {key: value for key, value in document.items() if key not in ipo_analytics.TIME_RELATIVE_FIELDS}
+    payload = json.dumps(document, sort_keys=True, default=lambda value: value.isoformat(), separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def ensure_indexes(collection):
+    """Create the unique "Company Name" index the upserts look rows up by, plus the API's query indexes."""
+    try:
+        collection.create_index([(KEY_FIELD, ASCENDING)], unique=True, name="company_name_unique")
+    except OperationFailure as e:
+        # Typically duplicates left by earlier runs; upserts still work, just without the index
+        print(f"Warning: Could not create unique index on '{KEY_FIELD}': {e}", file=sys.stderr)
+    ipo_analytics.ensure_indexes(collection)
+    ipo_history.ensure_indexes(history_collection(collection))
 
-    if not table:
-        print("Error: Could not find the IPO data table on the page.", file=sys.stderr)
-        sys.exit(1)
 
-    rows = table.find("tbody").find_all("tr")
-    
-    # Limit to 50 rows as per original script, but ensure we don't go out of bounds
-    rows_to_process = rows[:50] if len(rows) > 50 else rows
+def sync_ipo_data(collection, documents, history=None, now=None):
+    """
+    Upsert only new or changed rows.
 
+    Existing row hashes are read with one projection query and only rows whose
+    hash differs are sent, in a single unordered bulk_write. When ``history``
+    is given, the premium of every new row, and of every changed row whose
+    premium moved, is appended to its GMP history bucket in one more
+    unordered bulk_write (see ipo_history).
+    Returns counts of inserted, updated and unchanged rows.
+    """
+    now = now or datetime.now()
+    # Last occurrence wins if the page lists a company twice
+    rows = {doc[KEY_FIELD]: dict(doc, **{HASH_FIELD: row_hash(doc)}) for doc in documents}
+    existing = {
+        doc[KEY_FIELD]: doc
+        for doc in collection.find({KEY_FIELD: {"$in": list(rows)}},
+                                   {KEY_FIELD: 1, HASH_FIELD: 1, PREMIUM_FIELD: 1, "_id": 0})
+    }
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
     operations = []
-    for row in rows_to_process:
-        cols = row.find_all("td")
-        if len(cols) < 8:
-            print(f"Warning: Skipping row due to insufficient columns: {row.get_text(strip=True)}", file=sys.stderr)
+    samples = []
+    for name, doc in rows.items():
+        if name not in existing:
+            counts["inserted"] += 1
+        elif existing[name].get(HASH_FIELD) == doc[HASH_FIELD]:
+            counts["unchanged"] += 1
             continue
+        else:
+            counts["updated"] += 1
+        operations.append(UpdateOne({KEY_FIELD: name}, {"$set": doc}, upsert=True))
+        # Other columns (dates, lot size) changing is not a new GMP reading
+        premium_moved = name not in existing or existing[name].get(PREMIUM_FIELD) != doc.get(PREMIUM_FIELD)
+        sample = ipo_history.sample_operation(doc, now) if history is not None and premium_moved else None
+        if sample is not None:
+            samples.append(sample)
 
-        company_name = cols[0].get_text(strip=True)
-        
-        # Convert date strings to datetime objects for proper sorting
-        try:
-            open_date = datetime.strptime(cols[2].get_text(strip=True), '%b %d, %Y')
-            close_date = datetime.strptime(cols[3].get_text(strip=True), '%b %d, %Y')
-            allotment_date = datetime.strptime(cols[6].get_text(strip=True), '%b %d, %Y')
-            listing_date = datetime.strptime(cols[7].get_text(strip=True), '%b %d, %Y')
-        except ValueError as e:
-            print(f"Warning: Skipping row for '{company_name}' due to date parsing error: {e}", file=sys.stderr)
-            continue
-        except IndexError as e:
-            print(f"Warning: Skipping row for '{company_name}' due to missing date column: {e}", file=sys.stderr)
-            continue
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    if samples:
+        history.bulk_write(samples, ordered=False)
+    return counts
 
-        ipo_data = {
-            "Company Name": company_name,
-            "Premium": cols[1].get_text(strip=True),
-            "Open": open_date,
-            "Close": close_date,
-            "Price": cols[4].get_text(strip=True),
-            "Lot Size": cols[5].get_text(strip=True),
-            "Allotment Date": allotment_date,
-            "Listing Date": listing_date
-        }
-
-        # Use "Company Name" as the unique identifier for the upsert operation
-        operations.append(
-            UpdateOne({"Company Name": company_name}, {"$set": ipo_data}, upsert=True)
-        )
 
-    # Bulk write the operations to the database
-    if operations:
-        collection.bulk_write(operations)
-        print(f"Successfully upserted {len(operations)} IPO records.")
-    else:
+def new_session():
+    session = requests.Session()
+    session.headers["User-Agent"] = "Mozilla/5.0"
+    return session
+
+
+def scrape_ipo_documents(start=0, limit=MAX_ROWS, session=None, get_driver=None):
+    """
+    Return IPO documents for the requested window.
+
+    When the table's JSON endpoint is known (IPO_AJAX_URL) or can be found in
+    the page's scripts, it is paged through over plain HTTP and no browser is
+    started. Otherwise the page is rendered in headless Chrome. Returns None
+    if the table cannot be found.
+
+    Long-running callers pass their own ``session`` and a ``get_driver``
+    callable returning a warm browser, which is then left open; by default a
+    browser is started for this call and quit afterwards.
+    """
+    own_session = session is None
+    session = session or new_session()
+    try:
+        ajax_url = IPO_AJAX_URL
+        if not ajax_url:
+            try:
+                response = session.get(IPO_URL, timeout=IPO_WAIT_TIMEOUT)
+                response.raise_for_status()
+                ajax_url = discover_ajax_url(response.text, response.url)
+            except requests.RequestException as e:
+                print(f"Warning: Could not fetch {IPO_URL} directly: {e}", file=sys.stderr)
+        if ajax_url:
+            try:
+                return build_documents(fetch_json_rows(session, ajax_url, start, limit))
+            except (requests.RequestException, ValueError) as e:
+                print(f"Warning: IPO JSON endpoint failed, falling back to the browser: {e}", file=sys.stderr)
+    finally:
+        if own_session:
+            session.close()
+
+    driver = get_driver() if get_driver else webdriver.Chrome(options=chrome_options())
+    try:
+        html = fetch_page_source(driver, start, limit)
+    except TimeoutException:
+        print(f"Error: IPO table rows did not load within {IPO_WAIT_TIMEOUT:.0f}s.", file=sys.stderr)
+        return None
+    finally:
+        if not get_driver:
+            driver.quit()
+    return parse_ipo_rows(html, start, limit)
+
+
+def summary_collection(collection):
+    return collection.database[SUMMARY_COLLECTION]
+
+
+def history_collection(collection):
+    return collection.database[ipo_history.HISTORY_COLLECTION]
+
+
+def run_once(collection, start=0, limit=MAX_ROWS, **kwargs):
+    """
+    Scrape one window, add the derived analytics fields, sync it into
+    ``collection``, bring every row's status up to date and refresh the
+    summary document. Returns the sync counts, or None if the IPO table
+    could not be found.
+    """
+    documents = scrape_ipo_documents(start, limit, **kwargs)
+    if documents is None:
+        print("Error: Could not find the IPO data table on the page.", file=sys.stderr)
+        return None
+
+    if not documents:
         print("No IPO records to upsert.", file=sys.stderr)
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+    for document in documents:
+        ipo_analytics.enrich(document)
+    counts = sync_ipo_data(collection, documents, history=history_collection(collection))
+    print(f"IPO records: {counts['inserted']} inserted, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged.")
+    status_changes = ipo_analytics.refresh_status(collection)
+    if counts["inserted"] or counts["updated"] or status_changes:
+        ipo_analytics.write_summary(collection, summary_collection(collection))
+    return counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape IPO data from ipopremium.in into MongoDB.")
+    parser.add_argument("--start", type=int, default=0, help="Skip this many of the newest IPOs.")
+    parser.add_argument("--rows", type=int, default=MAX_ROWS,
+                        help=f"Number of IPOs to scrape (default: {MAX_ROWS}).")
+    parser.add_argument("--all", action="store_true", help="Backfill the full IPO history.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """One-shot CLI; see ipo_daemon.py for the long-running scheduler."""
+    args = parse_args(argv)
+    limit = None if args.all else args.rows
+
+    # Get the MongoDB URI from environment variables
+    mongo_uri = os.getenv("MONGO_URI")
+    if not mongo_uri:
+        print("Error: MONGO_URI not found in environment variables.", file=sys.stderr)
+        return 1
+
+    client = None
+    try:
+        # Connect to MongoDB
+        client = MongoClient(mongo_uri)
+        collection = client.get_database(DB_NAME).ipo_data
+        ensure_indexes(collection)
+
+        return 0 if run_once(collection, args.start, limit) is not None else 1
+
+    except Exception as e:
+        print(f"An unexpected error occurred during scraping: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if client:
+            client.close()
+
 
-except Exception as e:
-    print(f"An unexpected error occurred during scraping: {e}", file=sys.stderr)
-    sys.exit(1)
-finally:
-    if driver:
-        driver.quit()
-    if client:
-        client.close()
+if __name__ == "__main__":
+    sys.exit(main())
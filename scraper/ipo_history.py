@@ -0,0 +1,92 @@
+"""
+Grey-market premium (GMP) history per IPO.
+
+``ipo_data`` only holds the latest premium, so every change is also appended
+to ``ipo_gmp_history`` in per-IPO, per-day buckets: one document per company
+and day holding that day's samples plus first/last/min/max. Days expire
+through a TTL index, so the collection stays bounded at roughly
+(IPOs x retention days) documents however often the scraper runs.
+"""
+from pymongo import ASCENDING, UpdateOne
+from datetime import datetime, timedelta
+import os
+
+HISTORY_COLLECTION = "ipo_gmp_history"
+RETENTION_DAYS = int(os.getenv("IPO_GMP_RETENTION_DAYS", "365"))
+
+INTERVALS = {"1h": 3600, "6h": 6 * 3600, "1d": 86400, "1w": 7 * 86400}
+
+
+def ensure_indexes(history, retention_days=RETENTION_DAYS):
+    history.create_index([("company", ASCENDING), ("day", ASCENDING)], unique=True, name="company_day")
+    # Changing the retention later needs a collMod on this index
+    history.create_index([("day", ASCENDING)], expireAfterSeconds=retention_days * 86400, name="day_ttl")
+
+
+def sample_operation(document, now):
+    """
+    Upsert that appends the document's current premium to today's bucket, or
+    None if the row has no numeric premium.
+    """
+    premium = document.get("Premium Value")
+    if premium is None:
+        return None
+    day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return UpdateOne(
+        {"company": document["Company Name"], "day": day},
+        {
+            "$push": {"samples": {"t": now, "p": premium, "g": document.get("Expected Listing Gain")}},
+            "$setOnInsert": {"first": premium},
+            "$set": {"last": premium, "last_gain": document.get("Expected Listing Gain")},
+            "$min": {"min": premium},
+            "$max": {"max": premium},
+            "$inc": {"n": 1},
+        },
+        upsert=True,
+    )
+
+
+def _floor(t, seconds):
+    # Counted from a Monday midnight, so 1w buckets start on Mondays like the
+    # API's $dateTrunc (startOfWeek: "monday"); 1970-01-01 was a Thursday.
+    origin = datetime(1970, 1, 5, tzinfo=t.tzinfo)
+    return origin + timedelta(seconds=(t - origin).total_seconds() // seconds * seconds)
+
+
+def premium_curve(history, company, start=None, end=None, interval="1d"):
+    """
+    Downsampled premium curve for one IPO: one
+    ``{"t", "premium", "gain", "min", "max"}`` point per ``interval``
+    (``1h``, ``6h``, ``1d`` or ``1w``; weeks start on Monday) with data,
+    holding the interval's last premium and gain and its range. Daily and
+    weekly curves are built from the bucket summaries without reading
+    individual samples.
+    """
+    seconds = INTERVALS[interval]
+    daily = seconds >= 86400
+    query = {"company": company}
+    if start or end:
+        query["day"] = {}
+        if start:
+            query["day"]["$gte"] = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        if end:
+            query["day"]["$lte"] = end
+    projection = {"_id": 0, "day": 1, "last": 1, "last_gain": 1, "min": 1, "max": 1}
+    if not daily:
+        projection["samples"] = 1
+
+    points = {}
+    for bucket in history.find(query, projection).sort("day", ASCENDING):
+        if daily:
+            samples = [(bucket["day"], bucket["last"], bucket.get("last_gain"), bucket["min"], bucket["max"])]
+        else:
+            samples = [(s["t"], s["p"], s.get("g"), s["p"], s["p"]) for s in bucket["samples"]
+                       if (not start or s["t"] >= start) and (not end or s["t"] <= end)]
+        for t, premium, gain, low, high in samples:
+            slot = _floor(t, seconds)
+            point = points.get(slot)
+            if point is None:
+                points[slot] = {"t": slot, "premium": premium, "gain": gain, "min": low, "max": high}
+            else:
+                point.update(premium=premium, gain=gain, min=min(point["min"], low), max=max(point["max"], high))
+    return list(points.values())
@@ -0,0 +1,130 @@
+"""
+Sync tests against an in-memory MongoDB (mongomock). Run from this directory:
+    python -m unittest test_ipo_data_scraper
+"""
+from datetime import datetime, timedelta
+import unittest
+
+import ipo_analytics
+import ipo_history
+import ipo_data_scraper as scraper
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+
+def ipo_row(i, premium="20 (10.0%)"):
+    return [
+        f"Company {i} Limited" + (" SME" if i % 2 else ""),
+        premium,
+        f"Mar {1 + i:02d}, 2025",
+        f"Mar {3 + i:02d}, 2025",
+        "190 to 200",
+        "75",
+        f"Mar {4 + i:02d}, 2025",
+        f"Mar {7 + i:02d}, 2025",
+    ]
+
+
+def scraped(today, rows=None):
+    rows = rows or [ipo_row(i) for i in range(10)]
+    return [ipo_analytics.enrich(doc, today) for doc in scraper.build_documents(rows)]
+
+
+class EnrichTests(unittest.TestCase):
+    def enriched(self, premium, company="Company 0 Limited"):
+        row = ipo_row(0, premium)
+        row[0] = company
+        return ipo_analytics.enrich(scraper.build_documents([row])[0], datetime(2025, 3, 5))
+
+    def test_gain_and_recommendation(self):
+        # (premium, company, expected gain, expected recommendation); price band tops at 200
+        cases = [
+            ("50 (25.0%)", "Company 0 Limited", 25.0, "Apply"),
+            ("50 (25.0%)", "Company 0 Limited SME", 25.0, "May Apply"),
+            ("90 (45%)", "Company 0 Limited", 45.0, "Must Apply"),
+            # No percent: the gain is premium / price, the recommendation
+            # uses the bare premium as the calendar did
+            ("30", "Company 0 Limited", 15.0, "Apply"),
+            ("8", "Company 0 Limited", 4.0, "Not Apply"),
+            ("-", "Company 0 Limited", None, None),
+        ]
+        for premium, company, gain, recommendation in cases:
+            with self.subTest(premium=premium, company=company):
+                document = self.enriched(premium, company)
+                self.assertEqual(document["Expected Listing Gain"], gain)
+                self.assertEqual(document["Recommendation"], recommendation)
+
+
+@unittest.skipUnless(mongomock, "mongomock is not installed")
+class SyncIpoDataTests(unittest.TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().get_database(scraper.DB_NAME).ipo_data
+        self.history = scraper.history_collection(self.collection)
+        scraper.ensure_indexes(self.collection)
+
+    def sync(self, documents, now):
+        return scraper.sync_ipo_data(self.collection, documents, history=self.history, now=now)
+
+    def test_second_sync_same_day_is_unchanged(self):
+        today = datetime(2025, 3, 5)
+        self.assertEqual(self.sync(scraped(today), today), {"inserted": 10, "updated": 0, "unchanged": 0})
+        self.assertEqual(self.sync(scraped(today), today), {"inserted": 0, "updated": 0, "unchanged": 10})
+
+    def test_second_sync_on_a_later_day_is_unchanged(self):
+        self.sync(scraped(datetime(2025, 3, 1)), datetime(2025, 3, 1))
+        later = datetime(2025, 3, 12)
+        self.assertEqual(self.sync(scraped(later), later), {"inserted": 0, "updated": 0, "unchanged": 10})
+
+    def test_refresh_status_catches_up_without_rewriting_rows(self):
+        self.sync(scraped(datetime(2025, 3, 1)), datetime(2025, 3, 1))
+        hashes = {doc["Company Name"]: doc[scraper.HASH_FIELD] for doc in self.collection.find()}
+        later = datetime(2025, 3, 12)
+
+        self.assertGreater(ipo_analytics.refresh_status(self.collection, later), 0)
+        for doc in self.collection.find():
+            self.assertEqual(doc["Status"], ipo_analytics.ipo_status(doc, later))
+            self.assertEqual(doc[scraper.HASH_FIELD], hashes[doc["Company Name"]])
+        self.assertEqual(ipo_analytics.refresh_status(self.collection, later), 0)
+
+    def test_listed_only_after_listing_day(self):
+        self.sync(scraped(datetime(2025, 3, 1)), datetime(2025, 3, 1))
+        document = self.collection.find_one({"Company Name": "Company 0 Limited"})
+        listing_day = document["Listing Date"]
+        for today, expected in [(listing_day, "closed"), (listing_day.replace(day=listing_day.day + 1), "listed")]:
+            with self.subTest(today=today):
+                self.assertEqual(ipo_analytics.ipo_status(document, today), expected)
+                ipo_analytics.refresh_status(self.collection, today)
+                stored = self.collection.find_one({"Company Name": "Company 0 Limited"})
+                self.assertEqual(stored["Status"], expected)
+
+    def test_history_sampled_only_when_premium_changes(self):
+        # Recent enough that mongomock's TTL index keeps the buckets
+        now = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+        self.sync(scraped(now), now)
+        rows = [ipo_row(i) for i in range(10)]
+        rows[0][5] = "150"  # lot size only
+        rows[1][1] = "35 (17.5%)"
+
+        self.assertEqual(self.sync(scraped(now, rows), now.replace(hour=12))["updated"], 2)
+        samples = {doc["company"]: doc["n"] for doc in self.history.find()}
+        self.assertEqual(samples["Company 0 Limited"], 1)
+        self.assertEqual(samples["Company 1 Limited SME"], 2)
+
+    def test_weekly_curve_starts_on_monday(self):
+        # Recent enough that mongomock's TTL index keeps the buckets
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        monday = today - timedelta(days=today.weekday() + 7)
+        for day, premium in [(monday - timedelta(days=1), 10), (monday, 20), (monday + timedelta(days=6), 30)]:
+            self.history.insert_one({"company": "Company 0 Limited", "day": day, "last": premium,
+                                     "last_gain": None, "min": premium, "max": premium})
+        curve = ipo_history.premium_curve(self.history, "Company 0 Limited", interval="1w")
+        self.assertEqual([(point["t"], point["premium"]) for point in curve],
+                         [(monday - timedelta(days=7), 10), (monday, 30)])
+        self.assertEqual(curve[1]["min"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
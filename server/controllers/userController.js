@@ -11,6 +11,7 @@ import { config } from "dotenv";
 import mongoose from "mongoose";
 import { Stock } from "../models/stockModel.js";
 import { Portfolio } from "../models/portfolioModel.js";
+import { requestIpoRefresh, getIpoScraperStatus } from "../utils/ipoScraper.js";
 
 config();
 
@@ -523,11 +524,42 @@ export const verifyOtpForUpdate = catchAsyncError(async (req, res, next) => {
   });
 });
 
+const IPO_SORTS = {
+  open: { Open: -1 },
+  gain: { "Expected Listing Gain": -1 },
+  score: { "Recommendation Score": -1 },
+};
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Days from today (UTC midnight, as the scraper stores dates) to each IPO
+// date; computed per request so stored rows don't change every day.
+const withDayCounts = (ipo, today) => ({
+  ...ipo,
+  "Days To Open": Math.round((new Date(ipo.Open) - today) / DAY_MS),
+  "Days To Close": Math.round((new Date(ipo.Close) - today) / DAY_MS),
+  "Days To Listing": Math.round((new Date(ipo["Listing Date"]) - today) / DAY_MS),
+});
+
+// Optional filters (?status=upcoming&segment=SME&sort=gain&limit=20) use the
+// indexes created by the scraper; without them every IPO is returned.
 export const getIpoData = catchAsyncError(async (req, res, next) => {
   try {
+    const { status, segment, sort, limit } = req.query;
+    if (sort && !IPO_SORTS[sort]) {
+      return next(new ErrorHandler(`sort must be one of: ${Object.keys(IPO_SORTS).join(", ")}`, 400));
+    }
+    const filter = {};
+    if (status) filter.Status = status;
+    if (segment) filter.Segment = segment;
+
     const db = mongoose.connection.useDb("financial-dashboard");
     const collection = db.collection("ipo_data");
-    const ipoData = await collection.find({}).toArray();
+    let cursor = collection.find(filter, { projection: { _row_hash: 0 } }).sort(IPO_SORTS[sort || "open"]);
+    if (limit) cursor = cursor.limit(Math.min(parseInt(limit, 10) || 0, 500));
+    const today = new Date();
+    today.setUTCHours(0, 0, 0, 0);
+    const ipoData = (await cursor.toArray()).map((ipo) => withDayCounts(ipo, today));
     res.status(200).json({
       success: true,
       ipoData,
@@ -537,6 +569,105 @@ export const getIpoData = catchAsyncError(async (req, res, next) => {
   }
 });
 
+// Counts by status/segment/recommendation and top IPOs by expected gain,
+// precomputed by the scraper after each run.
+export const getIpoSummary = catchAsyncError(async (req, res, next) => {
+  try {
+    const db = mongoose.connection.useDb("financial-dashboard");
+    const summary = await db.collection("ipo_summary").findOne({ _id: "summary" });
+    res.status(200).json({
+      success: true,
+      summary,
+    });
+  } catch (error) {
+    return next(new ErrorHandler("Failed to fetch IPO summary.", 500));
+  }
+});
+
+const GMP_INTERVALS = {
+  "1h": { unit: "hour", binSize: 1 },
+  "6h": { unit: "hour", binSize: 6 },
+  "1d": { unit: "day", binSize: 1 },
+  // $dateTrunc weeks start on Sunday by default; scraper/ipo_history.py uses Monday.
+  "1w": { unit: "week", binSize: 1, startOfWeek: "monday" },
+};
+
+// Downsampled grey-market premium curve for one IPO from the per-day
+// buckets in ipo_gmp_history (see scraper/ipo_history.py). Daily and weekly
+// curves use the bucket summaries; hourly ones unwind the samples.
+export const getIpoGmpHistory = catchAsyncError(async (req, res, next) => {
+  const { company, interval = "1d" } = req.query;
+  if (!company) {
+    return next(new ErrorHandler("company is required.", 400));
+  }
+  const bin = GMP_INTERVALS[interval];
+  if (!bin) {
+    return next(new ErrorHandler(`interval must be one of: ${Object.keys(GMP_INTERVALS).join(", ")}`, 400));
+  }
+  try {
+    const db = mongoose.connection.useDb("financial-dashboard");
+    const pipeline = [{ $match: { company } }, { $sort: { day: 1 } }];
+    if (bin.unit === "hour") {
+      pipeline.push(
+        { $unwind: "$samples" },
+        {
+          $group: {
+            _id: { $dateTrunc: { date: "$samples.t", ...bin } },
+            premium: { $last: "$samples.p" },
+            gain: { $last: "$samples.g" },
+            min: { $min: "$samples.p" },
+            max: { $max: "$samples.p" },
+          },
+        }
+      );
+    } else {
+      pipeline.push({
+        $group: {
+          _id: { $dateTrunc: { date: "$day", ...bin } },
+          premium: { $last: "$last" },
+          gain: { $last: "$last_gain" },
+          min: { $min: "$min" },
+          max: { $max: "$max" },
+        },
+      });
+    }
+    pipeline.push({ $sort: { _id: 1 } }, { $project: { _id: 0, t: "$_id", premium: 1, gain: 1, min: 1, max: 1 } });
+    const history = await db.collection("ipo_gmp_history").aggregate(pipeline).toArray();
+    res.status(200).json({
+      success: true,
+      company,
+      interval,
+      history,
+    });
+  } catch (error) {
+    return next(new ErrorHandler("Failed to fetch GMP history.", 500));
+  }
+});
+
+export const refreshIpoData = catchAsyncError(async (req, res, next) => {
+  try {
+    const result = await requestIpoRefresh();
+    res.status(202).json({
+      success: true,
+      ...result,
+    });
+  } catch (error) {
+    return next(new ErrorHandler("IPO scraper is not reachable.", 503));
+  }
+});
+
+export const getIpoDataStatus = catchAsyncError(async (req, res, next) => {
+  try {
+    const status = await getIpoScraperStatus();
+    res.status(200).json({
+      success: true,
+      status,
+    });
+  } catch (error) {
+    return next(new ErrorHandler("IPO scraper is not reachable.", 503));
+  }
+});
+
 export const getListedCompanies = catchAsyncError(async (req, res, next) => {
   try {
     const { query } = req.query;
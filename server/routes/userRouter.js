@@ -12,6 +12,10 @@ import {
   verifyOtpForUpdate,
   updatePassword,
   getIpoData,
+  getIpoSummary,
+  getIpoGmpHistory,
+  refreshIpoData,
+  getIpoDataStatus,
   getListedCompanies,
   addPortfolioItem,
   getPortfolioItems,
@@ -35,6 +39,10 @@ router.post("/send-otp-for-update", isAuthenticated, sendOtpForUpdate);
 router.post("/verify-otp-for-update", isAuthenticated, verifyOtpForUpdate);
 router.put("/password/update", isAuthenticated, updatePassword);
 router.get("/ipo-data", getIpoData);
+router.get("/ipo-data/summary", getIpoSummary);
+router.get("/ipo-data/gmp-history", getIpoGmpHistory);
+router.post("/ipo-data/refresh", isAuthenticated, refreshIpoData);
+router.get("/ipo-data/status", getIpoDataStatus);
 router.get("/stocks/search", getListedCompanies);
 router.post("/portfolio/add", isAuthenticated, addPortfolioItem);
 router.get("/portfolio", isAuthenticated, getPortfolioItems);
@@ -0,0 +1,56 @@
+import { spawn } from "child_process";
+import path from "path";
+import { fileURLToPath } from "url";
+
+const scraperDir = path.resolve(path.dirname(fileURLToPath(import.meta.url)), "../../scraper");
+const daemonUrl = () =>
+  process.env.IPO_SCRAPER_URL || `http://127.0.0.1:${process.env.IPO_DAEMON_PORT || 5002}`;
+
+let daemon = null;
+let stopping = false;
+
+// Start the long-running IPO scraper (warm browser, pooled MongoDB client,
+// own hourly schedule) and restart it if it exits.
+export const startIpoScraperDaemon = () => {
+  if (process.env.IPO_SCRAPER_URL) {
+    // Managed elsewhere; just talk to it.
+    return;
+  }
+  const child = spawn(process.env.PYTHON || "python", ["ipo_daemon.py"], {
+    cwd: scraperDir,
+    stdio: "inherit",
+  });
+  daemon = child;
+  // A failed spawn (e.g. no `python` on PATH) emits "error" and may or may
+  // not emit "exit" too; restart once either way. Without an "error"
+  // listener Node would throw and take the whole server down.
+  let restarting = false;
+  const restart = (reason) => {
+    if (daemon === child) daemon = null;
+    if (stopping || restarting) return;
+    restarting = true;
+    console.error(`IPO scraper daemon ${reason}; restarting in 30s`);
+    setTimeout(startIpoScraperDaemon, 30000);
+  };
+  child.on("error", (error) => restart(`failed: ${error.message}`));
+  child.on("exit", (code) => restart(`exited with code ${code}`));
+};
+
+export const stopIpoScraperDaemon = () => {
+  stopping = true;
+  if (daemon) {
+    daemon.kill("SIGTERM");
+  }
+};
+
+// Ask the daemon to refresh now instead of waiting for its next scheduled run.
+export const requestIpoRefresh = async () => {
+  const response = await fetch(`${daemonUrl()}/refresh`, { method: "POST" });
+  return response.json();
+};
+
+// Last run time, duration, success and insert/update counts.
+export const getIpoScraperStatus = async () => {
+  const response = await fetch(`${daemonUrl()}/status`);
+  return response.json();
+};